@@ -328,17 +328,22 @@ class apidict( dotdict ):
     A specified timeout (required as first argument) is enforced after setattr, which is only
     shortened when another thread executes a getattr.
 
+    Threads awaiting I/O (eg. in select) may register a callback via _watch, which is invoked on each
+    setattr (and by _wake); this allows them to block indefinitely, but be awakened promptly to
+    getattr any newly assigned value (eg. using a network.wakeup's notify as the callback).
+
     Note that getting *any* attr on the apidict releases all threads blocked setting *any* attr!
     So, use index access to read the bulk of values, and finally a single getattr to access the last
     value, and indicate completion of access.
     """
-    __slots__ = ('_lck', '_cnd', '_tmo')
+    __slots__ = ('_lck', '_cnd', '_tmo', '_wch')
     def __init__( self, timeout, *args, **kwds ):
         assert isinstance( timeout, (float,int) ), \
             "First argument to apidict must be a numeric timeout"
         object.__setattr__( self, '_lck', threading.RLock() )
         object.__setattr__( self, '_cnd', threading.Condition( self._lck ))
         object.__setattr__( self, '_tmo', timeout )
+        object.__setattr__( self, '_wch', [] )
         super( apidict, self ).__init__( *args, **kwds )
 
     def __setitem__( self, key, value ):
@@ -348,8 +353,25 @@ class apidict( dotdict ):
     def __setattr__( self, key, value ):
         with self._cnd:
             super( apidict, self ).__setattr__( key, value )
+            self._wake()
             self._cnd.wait( self._tmo )
 
+    def _watch( self, callback ):
+        """Invoke callback() on every subsequent setattr, 'til _unwatch'ed."""
+        with self._cnd:
+            self._wch.append( callback )
+
+    def _unwatch( self, callback ):
+        with self._cnd:
+            if callback in self._wch:
+                self._wch.remove( callback )
+
+    def _wake( self ):
+        """Invoke all _watch callbacks (eg. to awaken threads to check for some change of state)."""
+        with self._cnd:
+            for callback in list( self._wch ):
+                callback()
+
     def __getitem__( self, key ):
         with self._cnd:
             return super( apidict, self ).__getitem__( key )
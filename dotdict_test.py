@@ -261,3 +261,16 @@ def test_apidict():
         #assert misc.near( dif, shorter if 'attr' in kwargs else latency, significance=significance )
         assert ad.noo == 3
         t.join()
+
+
+def test_apidict_watch():
+    # Any setattr (but not setitem) invokes each _watch callback, before awaiting release
+    ad = apidict( 0.1, something='a' )
+    woken = []
+    ad._watch( lambda: woken.append( ad['something'] ))
+    ad['something'] = 'b'
+    assert woken == []
+    ad.something = 'c'
+    assert woken == [ 'c' ]
+    ad._wake()
+    assert woken == [ 'c', 'c' ]
@@ -317,6 +317,102 @@ def magnitude( val, base = 10 ):
 def exponential_moving_average( current, sample, weight ):
     return sample if current is None else current + weight * ( sample - current )
 
+# 
+# token_bucket	-- rate limit events to an average rate, allowing bursts
+# 
+# The bucket holds up to 'burst' tokens (default: 1), and is refilled at 'rate' tokens per second.
+# Each event takes a token; if none is available, the token is borrowed (so events remain in order),
+# and take returns the number of seconds the caller must wait 'til it would have been available.
+# The rate and burst may be altered at any time (eg. by a web API).
+# 
+class token_bucket( object ):
+    def __init__( self, rate, burst=None, now=None ):
+        self.rate		= rate
+        self.burst		= burst or 1
+        self.tokens		= None		# Full, at the (possibly altered) burst size
+        self.last		= timer() if now is None else now
+
+    def take( self, tokens=1, now=None ):
+        """Take tokens, returning 0 if available, or the number of seconds to wait if not."""
+        now			= timer() if now is None else now
+        rate			= float( self.rate )
+        if rate <= 0:
+            return 0		# Unlimited
+        self.tokens		= min( float( self.burst ), float( self.burst ) if self.tokens is None
+                                       else self.tokens + ( now - self.last ) * rate )
+        self.last		= now
+        self.tokens	       -= tokens
+        return 0 if self.tokens >= 0 else -self.tokens / rate
+
+# 
+# histogram	-- a low-overhead latency distribution, w/ bounded relative error
+# 
+# Values (eg. latencies in seconds) are recorded in integer 'units' of 1/scale (default: 1us), into
+# log-linear buckets a la HdrHistogram: each power of 2 is divided into 16 sub-buckets, so any
+# percentile is reported within ~6% of the actual value, regardless of its magnitude.  Only occupied
+# buckets are stored.  Not thread-safe; the caller must serialize access.
+# 
+class histogram( object ):
+    SUB				= 16		# Sub-buckets per power of 2
+
+    def __init__( self, scale=1000000 ):
+        self.scale		= scale
+        self.reset()
+
+    def reset( self ):
+        self.counts		= {}
+        self.count		= 0
+        self.total		= 0.0
+        self.minimum		= None
+        self.maximum		= None
+
+    @classmethod
+    def bucket( cls, units ):
+        if units < 2 * cls.SUB:
+            return units
+        exponent		= units.bit_length() - ( 2 * cls.SUB - 1 ).bit_length()
+        return exponent * cls.SUB + ( units >> exponent )
+
+    @classmethod
+    def lowest( cls, index ):
+        """The lowest value (in units) recorded in the bucket at index."""
+        if index < 2 * cls.SUB:
+            return index
+        exponent		= index // cls.SUB - 1
+        return ( index - exponent * cls.SUB ) << exponent
+
+    def record( self, value ):
+        index			= self.bucket( max( 0, int( value * self.scale )))
+        self.counts[index]	= self.counts.get( index, 0 ) + 1
+        self.count	       += 1
+        self.total	       += value
+        if self.minimum is None or value < self.minimum:
+            self.minimum	= value
+        if self.maximum is None or value > self.maximum:
+            self.maximum	= value
+
+    def percentile( self, percent ):
+        """The highest value equivalent to the value at the given percentile (limited to the maximum
+        value recorded), or None if no values have been recorded."""
+        if not self.count:
+            return None
+        rank			= max( 1, int( math.ceil( self.count * percent / 100.0 )))
+        seen			= 0
+        for index in sorted( self.counts ):
+            seen	       += self.counts[index]
+            if seen >= rank:
+                break
+        return min( self.maximum, float( self.lowest( index + 1 )) / self.scale )
+
+    def summary( self, percentiles=( 50, 90, 99, 99.9 )):
+        result			= dict( count=self.count, total=self.total, minimum=self.minimum,
+                                        maximum=self.maximum,
+                                        mean=self.total / self.count if self.count else None )
+        for p in percentiles:
+            result['p%s' % ( '%g' % p ).replace( '.', '' )] \
+				= self.percentile( p )
+        return result
+
 # 
 # reprargs(args,kwds)	-- log args/kwds in sensible fashion
 # @logresult(prefix,log)-- decorator to log results/exception of function
@@ -4,7 +4,8 @@ from __future__ import division
 
 import threading
 
-from .misc import ( near, scale, magnitude, centeraxis, natural, change_function, mutexmethod )
+from .misc import ( near, scale, magnitude, centeraxis, natural, change_function, mutexmethod,
+                    token_bucket, histogram )
 
 def test_scale():
     assert near( scale(   0., ( 0., 100. ), ( 32., 212. )),  32. )
@@ -49,6 +50,38 @@ def test_magnitude():
     assert near( magnitude( 33., 2 ),  16. )
     assert near( magnitude( 50., 2 ),  32. )
 
+def test_token_bucket():
+    # A burst of 2 is immediately available; thereafter, each token is borrowed at 10/s
+    tb = token_bucket( 10, burst=2, now=0.0 )
+    assert tb.take( now=0.0 ) == 0
+    assert tb.take( now=0.0 ) == 0
+    assert near( tb.take( now=0.0 ), .1 )
+    assert near( tb.take( now=0.0 ), .2 )
+    assert near( tb.take( now=.25 ), .05 )
+    # Refills no more than the burst
+    assert tb.take( now=10.0 ) == 0
+    assert tb.take( now=10.0 ) == 0
+    assert tb.take( now=10.0 ) > 0
+    # A rate of 0 is unlimited
+    tb.rate = 0
+    assert tb.take( now=10.0 ) == 0
+
+def test_histogram():
+    # Each bucket's lowest value follows its predecessor's range, w/o gaps
+    for units in range( 100000 ):
+        index = histogram.bucket( units )
+        assert histogram.lowest( index ) <= units < histogram.lowest( index + 1 )
+    h = histogram()
+    assert h.percentile( 99 ) is None
+    for ms in range( 1, 1001 ): # 1ms to 1s
+        h.record( ms / 1000.0 )
+    assert h.count == 1000 and h.minimum == .001 and h.maximum == 1.0
+    for p,v in ( ( 50, .5 ), ( 90, .9 ), ( 99, .99 ), ( 100, 1.0 )):
+        assert v <= h.percentile( p ) <= v * 1.07
+    s = h.summary()
+    assert s['count'] == 1000 and near( s['mean'], .5005 )
+    assert s['p50'] == h.percentile( 50 ) and s['p999'] == h.percentile( 99.9 )
+
 def test_centeraxis():
     string='abc.123.xyz'
     assert centeraxis( string, 20 ) \
@@ -30,7 +30,10 @@ __license__                     = "Dual License: GPLv3 (or later) and Commercial
 
 __all__				= ['parse_int', 'parse_path', 'parse_path_elements', 'parse_path_component',
                                    'format_path', 'format_context', 'parse_context', 'CIP_TYPES', 'parse_operations',
-                                   'client', 'await', 'connector', 'recycle', 'main']
+                                   'fast_response',
+                                   'client', 'await', 'compiled', 'connector', 'adaptive', 'restorer', 'tag_types', 'multiplexer',
+                                   'connector_aio',
+                                   'recycle', 'main']
 
 """enip.client	-- EtherNet/IP client API and module entry point
 
@@ -50,11 +53,20 @@ import csv
 import itertools
 import json
 import logging
+import os
 import select
 import socket
+import struct
 import sys
+import threading
 import traceback
 
+# The asyncio module (Python 3.4+) is only required by connector_aio
+try:
+    import asyncio
+except ImportError:
+    asyncio			= None
+
 import cpppo
 from .. import network, enip
 from . import logix, device, parser
@@ -272,6 +284,100 @@ def parse_operations( tags, fragment=False, int_type=None, **kwds ):
         yield opr
 
 
+# 
+# fast_response
+# 
+#     Decode the common steady-state SendRRData replies (Read/Write Tag [Fragmented], and Multiple
+# Service Packets containing only those) directly using struct, instead of the EtherNet/IP, CIP and
+# Logix parsers.  The layout of these replies is fixed, except for the data; anything else (eg. an
+# extended status, a non-zero EtherNet/IP status, a STRING/SSTRING or unknown data type, a List
+# Identity) returns None, and is parsed by the dfa parsers as usual.
+# 
+FAST_HEADER			= struct.Struct( '<HHII8sI' )	# command, length, session_handle, status, sender_context, options
+FAST_SEND_DATA			= struct.Struct( '<IHHHHHH' )	# interface, timeout, count, type_id, length, type_id, length
+FAST_REPLY			= struct.Struct( '<BBBB' )	# service, reserved, status, status_ext.size
+FAST_TYPES			= dict( # { <tag_type>: (<struct format character>,<size>), ... }
+    ( t, ( c.struct_format.lstrip( '<' ), c.struct_calcsize ))
+    for t,c in parser.typed_data.TYPES_SUPPORTED.items() if hasattr( c, 'struct_format' ))
+
+
+def fast_reply( frame, beg, end, multiple=True ):
+    """Decode the Logix reply in frame[beg:end] into a dotdict equivalent to that produced by the
+    Logix parser (w/o the raw .input), or return None if not of a known shape."""
+    service,_,status,size	= FAST_REPLY.unpack_from( frame, beg )
+    if size:
+        return None
+    pos				= beg + FAST_REPLY.size
+    reply			= cpppo.dotdict()
+    reply.service		= service
+    reply.status		= status
+    reply.status_ext		= cpppo.dotdict( size=0 )
+    if service in ( 0xCC, 0xD2 ):		# Read Tag [Fragmented] reply
+        if status not in ( 0x00, 0x06 ) or end - pos <= 2:
+            return None
+        typ,			= struct.unpack_from( '<H', frame, pos )
+        fmt,siz			= FAST_TYPES.get( typ, (None,None) )
+        if fmt is None or ( end - pos - 2 ) % siz:
+            return None
+        data			= list( struct.unpack_from( '<%d%s' % ( ( end - pos - 2 ) // siz, fmt ), frame, pos + 2 ))
+        reply['read_tag' if service == 0xCC else 'read_frag'] = cpppo.dotdict( type=typ, data=data )
+    elif service in ( 0xCD, 0xD3 ):		# Write Tag [Fragmented] reply
+        if status or pos != end:
+            return None
+        reply['write_tag' if service == 0xCD else 'write_frag'] = True
+    elif service == 0x8A and multiple:	# Multiple Service Packet reply
+        if status:
+            return None
+        number,			= struct.unpack_from( '<H', frame, pos )
+        offsets			= list( struct.unpack_from( '<%dH' % number, frame, pos + 2 ))
+        request			= []
+        for off,nxt in zip( offsets, offsets[1:] + [ end - pos ] ):
+            if not pos + off < pos + nxt <= end:
+                return None
+            rpy			= fast_reply( frame, pos + off, pos + nxt, multiple=False )
+            if rpy is None:
+                return None
+            request.append( rpy )
+        reply.multiple		= cpppo.dotdict( number=number, offsets=offsets, request=request )
+    else:
+        return None
+    return reply
+
+
+def fast_response( frame, peer=None ):
+    """Decode a complete EtherNet/IP SendRRData frame carrying a Read/Write Tag [Fragmented] or
+    Multiple Service Packet reply, returning a dotdict equivalent to that produced by the dfa
+    parsers (w/o the raw .input of each encapsulation), or None if it is of any other shape."""
+    try:
+        command,length,session,status,context,options = FAST_HEADER.unpack_from( frame, 0 )
+        if command != 0x006F or status or FAST_HEADER.size + length != len( frame ):
+            return None
+        interface,timeout,count,typ0,len0,typ1,len1 = FAST_SEND_DATA.unpack_from( frame, FAST_HEADER.size )
+        beg			= FAST_HEADER.size + FAST_SEND_DATA.size
+        if count != 2 or typ0 or len0 or typ1 != 0xB2 or beg + len1 != len( frame ):
+            return None
+        request			= fast_reply( frame, beg, len( frame ))
+    except struct.error:
+        return None
+    if request is None:
+        return None
+    result			= cpppo.dotdict( peer=peer )
+    result.enip			= cpppo.dotdict()
+    result.enip.command		= command
+    result.enip.length		= length
+    result.enip.session_handle	= session
+    result.enip.status		= status
+    result.enip.options		= options
+    result.enip.sender_context	= cpppo.dotdict( input=bytearray( context ))
+    item			= cpppo.dotdict( type_id=typ1, length=len1 )
+    item.unconnected_send	= cpppo.dotdict( request=request )
+    result.enip.CIP		= cpppo.dotdict()
+    result.enip.CIP.send_data	= cpppo.dotdict( interface=interface, timeout=timeout )
+    result.enip.CIP.send_data.CPF = cpppo.dotdict( count=count, item=[
+        cpppo.dotdict( type_id=typ0, length=len0 ), item ] )
+    return result
+
+
 class client( object ):
     """Establish a connection (within timeout), and Transmit request(s), and yield replies as
     available.  The request will fail (raise exception) if it cannot be sent within the specified
@@ -292,9 +398,10 @@ class client( object ):
     """
     route_path_default		= enip.route_path_default
     send_path_default		= enip.send_path_default
+    fast			= True		# Decode common replies w/ fast_response (Logix dialect only)
 
     def __init__( self, host, port=None, timeout=None, dialect=None, profiler=None,
-                  udp=False, broadcast=False, source_address=None ):
+                  udp=False, broadcast=False, source_address=None, recv_size=None ):
         """Connect to the EtherNet/IP client, waiting up to 'timeout' for a connection.  Avoid using
         the host OS platform default if 'host' is empty; this will be different on Mac OS-X, Linux,
         Windows, ...  So, for an empty host, we'll default to 'localhost'; this should be IPv4/IPv6
@@ -313,6 +420,10 @@ class client( object ):
         If source_address "<address>[:<port>]" is specified, we'll attempt to bind to that
         interface, and send using the specified source address (and optionally port number).
 
+        Responses are received into a buffer of 'recv_size' bytes (default: network.receiver.size),
+        allocated once and reused for every receive.  Each receive can harvest many pipelined
+        responses at once; the data is parsed directly from the buffer, without copying.
+
         """
         # Bind to nothing by default (use default i'face as source address).  Otherwise, use the
         # specified interface (or the system default, specified by ''), and the specified port (or
@@ -377,9 +488,17 @@ class client( object ):
                 log.warning( "Couldn't set SO_KEEPALIVE on socket to EtherNet/IP server at %s:%s: %s",
                              self.addr[0], self.addr[1], exc )
 
+        self.receiver		= network.receiver( self.conn, size=recv_size )
+        self.selected		= False	# Set when self.conn is known to be readable
+        self.initialize( dialect=dialect, profiler=profiler )
+
+    def initialize( self, dialect=None, profiler=None ):
+        """Prepare the EtherNet/IP response parsers, and select the (global) dialect."""
         self.session		= None	# Not set w/in client class; set manually, or in derived class
         self.source		= cpppo.chainable()
         self.data		= None
+        self.decoded		= collections.deque() # Responses already decoded by fast_response
+        self.recording		= None	# A list receives each encoded request, instead of sending it
         # Parsers
         self.engine		= None # EtherNet/IP frame parsing in progress
         self.frame		= enip.enip_machine( terminal=True )
@@ -448,6 +567,10 @@ class client( object ):
         The response may not actually contain a payload, eg. if the EtherNet/IP header contains a
         non-zero status.
 
+        When input is received between frames, each complete frame at its start that fast_response
+        recognizes is decoded directly; the remainder (from the first unrecognized or incomplete
+        frame) is parsed as usual.
+
         """
         # Ensure that the caller has gained exclusive access to this client instance using:
         # 
@@ -457,6 +580,8 @@ class client( object ):
         # a response.  They may *only* safely release exclusive access between fully parsed
         # EtherNet/IP frames (checked in __exit__, above)
         self.frame.safe()
+        if self.decoded:
+            return self.decoded.popleft()
 
         # Harvest any input immediately available, if we're empty.  We may be coming back
         # here after already having issued a non-transition event from the existing EtherNet/IP
@@ -467,16 +592,22 @@ class client( object ):
                 self.profiler.disable()
             try:
                 rcvd,addr	= self.recvfrom( timeout=0 )
-                log.info(
-                    "EtherNet/IP-->%16s:%-5s rcvd %5d: %r",
-                    addr[0] if addr else None, addr[1] if addr else None,
-                    len( rcvd ) if rcvd is not None else 0, rcvd )
+                if log.isEnabledFor( logging.INFO ): # rcvd may be a memoryview; log its content
+                    log.info(
+                        "EtherNet/IP-->%16s:%-5s rcvd %5d: %r",
+                        addr[0] if addr else None, addr[1] if addr else None,
+                        len( rcvd ) if rcvd is not None else 0, bytes( rcvd ) if rcvd is not None else None )
                 if rcvd is not None:
                     # Some input (or EOF); source is empty; chain the input and drop back into 
                     # the framer engine.  It will detect a no-progress condition on EOF.  If we
                     # don't have an engine, we can signal completion right here.
                     if len( rcvd ):
-                        self.source.chain( rcvd )	# More input received
+                        if self.engine is None and self.fast and device.dialect is logix.Logix:
+                            rcvd	= self.decode( rcvd, addr )
+                        if len( rcvd ):
+                            self.source.chain( rcvd )	# More input received
+                        if self.decoded:
+                            return self.decoded.popleft()
                     else:
                         if self.engine is None:
                             raise StopIteration		# EOF between EtherNet/IP frames; Done.
@@ -552,13 +683,34 @@ class client( object ):
 
     next = __next__ # Python 2/3 compatibility
 
+    def decode( self, rcvd, addr ):
+        """Decode each complete frame at the start of rcvd recognized by fast_response onto
+        self.decoded, returning the remainder of rcvd."""
+        offset			= 0
+        while len( rcvd ) - offset >= FAST_HEADER.size:
+            length,		= struct.unpack_from( '<H', rcvd, offset + 2 )
+            end			= offset + FAST_HEADER.size + length
+            if end > len( rcvd ):
+                break
+            result		= fast_response( rcvd[offset:end], peer=addr )
+            if result is None:
+                break
+            log.info( "Returning result: %r", result )
+            self.decoded.append( result )
+            offset		= end
+        return rcvd[offset:] if offset else rcvd
+
     def recvfrom( self, timeout=None ):
-        """Receive data (if any) and source address, if available within timeout."""
+        """Receive data (if any) and source address, if available within timeout.  The data is a
+        memoryview into our reusable receive buffer, valid only 'til the next receive; copy it (eg.
+        via bytes( rcvd )) if it must be retained.  If readable has just reported data available, the
+        receive proceeds without another select."""
         addr			= self.addr
+        selected,self.selected	= self.selected,False
         if self.addr_connected:
-            rcvd		= network.recv( self.conn, timeout=timeout )
+            rcvd		= self.receiver.recv( timeout=timeout, selected=selected )
         else:
-            rcvd,addr		= network.recvfrom( self.conn, timeout=timeout )
+            rcvd,addr		= self.receiver.recvfrom( timeout=timeout, selected=selected )
         return rcvd,addr
 
     def send( self, request, timeout=None ):
@@ -593,7 +745,8 @@ class client( object ):
         finally:
             if self.profiler:
                 self.profiler.enable()
-        return len( r ) > 0
+        self.selected		= len( r ) > 0
+        return self.selected
 
     # Basic CIP Requests; sent immediately
     def register( self, timeout=None, sender_context=b'' ):
@@ -840,6 +993,9 @@ class client( object ):
                   len( data.input ) - len( data.enip.input ),
                   len( data.enip.input ), len( data.input ))
 
+        if self.recording is not None:	# Compiling; see connector.compile
+            self.recording.append( bytes( data.input ))
+            return data
         if self.profiler:
             self.profiler.disable()
         try:
@@ -850,6 +1006,54 @@ class client( object ):
         return data
 
 
+def response_replies( response ):
+    """Find the read/write/... replies in an EtherNet/IP CIP response; a single reply, or those of a
+    Multiple Service Packet.  Returns a list of (<reply>,<status>,<value>); see connector.collect.
+    Raises an Exception if the response indicates failure, or contains no recognized replies.
+
+    """
+    if 'enip.status' in response and response.enip.status != 0:
+        raise Exception( "Response EtherNet/IP status: %d" % ( response.enip.status ))
+    elif 'enip.CIP.send_data.CPF.item[1].unconnected_send.request.multiple.request' in response:
+        # Multiple Service Packet; request.multiple.request is an array of read/write_tag/frag
+        replies			= response.enip.CIP.send_data.CPF.item[1].unconnected_send.request.multiple.request
+    elif 'enip.CIP.send_data.CPF.item[1].unconnected_send.request' in response:
+        # Single request; request is a read/write_tag/frag
+        replies			= [ response.enip.CIP.send_data.CPF.item[1].unconnected_send.request ]
+    else:
+        raise Exception( "Response Unrecognized: %s" % ( enip.enip_format( response )))
+    assert replies, \
+        "Receive %2d (Context %10r): Mismatched; failed to locate replies in: %s" % (
+            len( replies ), parse_context( response.enip.sender_context.input ), enip.enip_format( response ))
+
+    results			= []
+    for reply in replies:
+        val			= None
+        sts			= reply.status			# sts = # or (#,[#...])
+        if reply.status in (0x00,0x06):		# Success or Partial Data; val is Truthy
+            if 'read_frag' in reply:
+                val		= reply.read_frag.data
+            elif 'read_tag' in reply:
+                val		= reply.read_tag.data
+            elif 'set_attribute_single' in reply:
+                val		= True
+            elif 'get_attribute_single' in reply:
+                val		= reply.get_attribute_single.data
+            elif 'get_attributes_all' in reply:
+                val		= reply.get_attributes_all.data
+            elif 'write_frag' in reply:
+                val		= True
+            elif 'write_tag' in reply:
+                val		= True
+            else:
+                raise Exception( "Reply Unrecognized: %s" % ( enip.enip_format( reply )))
+        else:						# Failure; val is Falsey
+            if 'status_ext' in reply and reply.status_ext.size:
+                sts		= (reply.status,reply.status_ext.data)
+        results.append( (reply,sts,val) )
+    return results
+
+
 def await( cli, timeout=None ):
     """Await a response on an iterable client() instance (for timeout seconds, or forever if None).
     Returns (response,elapsed).  A 'timeout' may be supplied, of:
@@ -884,6 +1088,19 @@ def await( cli, timeout=None ):
     return response,elapsed
 
 
+# 
+# compiled	-- An immutable plan of I/O operations, ready to issue repeatedly; see connector.compile
+# 
+compiled			= collections.namedtuple(
+    'compiled', [
+        'operations',	# ( <operation>, ... ) as parsed (before coalescing, planning, packing)
+        'packets',	# ( (<command>,<payload>,( (<descr>,<op>,<request>), ... )), ... ) issued
+        'order',	# ( <position>, ... ) of each op issued, if reordered by packing; else None
+        'covers',	# ( <covers>, ... ) of each op issued, if coalesced (see coalesce); else None
+        'plans',	# ( <plan>, ... ) of each op coalesced, if planned (see plan); else None
+    ] )
+
+
 class connector( client ):
     """Register a connection to an EtherNet/IP controller, storing the returned session_handle in
     self.session, ready for processing further requests.
@@ -932,7 +1149,74 @@ class connector( client ):
             log.normal( "Connect:  Success in %7.3fs/%7.3fs", cpppo.timer() - begun,
                         cpppo.inf if timeout is None else timeout )
 
-    def issue( self, operations, index=0, fragment=False, multiple=0, timeout=None ):
+    def prepare( self, op, fragment=False, multiple=0, timeout=None ):
+        """Prepare the request for an I/O operation (sending it immediately, unless collecting requests
+        for a 'multiple' Service Packet), returning (<method>,<descr>,<request>,<reqest>,<rpyest>,
+        <elapsed>); the estimated request and reply sizes are as described in issue, below.
+
+        """
+        descr			= "Multi. " if multiple else "Single "
+        begun			= cpppo.timer()
+        method			= op.pop( 'method', 'write' if 'data' in op else 'read' )
+        if method == 'write':
+            descr	       += "Write "
+            if 'offset' not in op:
+                op['offset']= 0 if fragment else None # Force Write Tag Fragmented
+            req			= self.write( timeout=timeout, send=not multiple, **op )
+            reqest		= 24 + parser.typed_data.datasize(
+                tag_type=op.get( 'tag_type' ) or enip.INT.tag_type, size=len( op['data'] ))
+            rpyest		= 4
+        elif method == 'read':
+            descr	       += "Read  "
+            if 'offset' not in op:
+                op['offset']= 0 if fragment else None # Force Read  Tag Fragmented
+            req			= self.read( timeout=timeout, send=not multiple, **op )
+            reqest		= 22
+            rpyest		= 4
+            if op.get( 'data_size' ):
+                rpyest         += op.get( 'data_size' )
+            else:
+                rpyest         += parser.typed_data.datasize(
+                    tag_type=op.get( 'tag_type' ) or enip.DINT.tag_type, size=op.get( 'elements', 1 ))
+        elif method == 'set_attribute_single':
+            descr	       += "S_A_S "
+            req			= self.set_attribute_single( timeout=timeout, send=not multiple, **op )
+            reqest		= 8 + parser.typed_data.datasize(
+                tag_type=op.get( 'tag_type' ) or enip.USINT.tag_type, size=len( op['data'] ))
+            rpyest		= 4
+        elif method == 'get_attribute_single':
+            descr	       += "G_A_S "
+            req			= self.get_attribute_single( timeout=timeout, send=not multiple, **op )
+            reqest		= 8
+            rpyest		= 0
+            if op.get( 'data_size' ):
+                rpyest         += op.get( 'data_size' )
+            elif op.get( 'tag_type' ): # a non-0/None tag_type defined; use it (assumes 1 element Attribute)
+                rpyest         += parser.typed_data.datasize(
+                    tag_type=op.get( 'tag_type' ) or enip.DINT.tag_type, size=op.get( 'elements', 1 ))
+            else:
+                rpyest		= multiple # Completely unknown; prevent merging...
+        elif method == 'get_attributes_all':
+            descr	       += "G_A_A "
+            req			= self.get_attributes_all( timeout=timeout, send=not multiple, **op )
+            reqest		= 8
+            rpyest		= 0
+            if op.get( 'data_size' ):
+                rpyest         += op.get( 'data_size' )
+            elif op.get( 'tag_type' ) and op.get( 'elements' ):
+                rpyest         += parser.typed_data.datasize(
+                    tag_type=op.get( 'tag_type' ) or enip.DINT.tag_type, size=op.get( 'elements', 1 ))
+            else:
+                rpyest		= multiple # Completely unknown; prevent merging...
+        else:
+            log.detail( "Unrecognized operation method %s: %r", method, op )
+        elapsed			= cpppo.timer() - begun
+        descr		       += '    ' if 'offset' not in op else 'Frag' if op['offset'] is not None else 'Tag '
+        descr		       += ' ' + format_path( op['path'], count=op.get( 'elements' ))
+        return method,descr,req,reqest,rpyest,elapsed
+
+    def issue( self, operations, index=0, fragment=False, multiple=0, timeout=None,
+               packing=0, order=None ):
         """Issue a sequence of I/O operations, returning the corresponding sequence of:
         (<index>,<context>,<descr>,<op>,<request>).  If a non-zero 'multiple' is provided, bundle
         requests 'til we exceed the specified multiple service packet request size limit.
@@ -963,7 +1247,24 @@ class connector( client ):
         is an average [S]STRING, and for Get Attributes All is the maximum Multiple Service Packet
         size (so it isn't merged, by default)
 
+        If a non-zero 'packing' is also provided, the operations are instead packed into Multiple
+        Service Packets using exact request sizes, and reply sizes computed from the supplied
+        tag_type and elements (or data_size); see issue_packed.
+
+        If 'operations' is a compiled plan, its pre-encoded requests are issued; see issue_compiled.
+
         """
+        if isinstance( operations, compiled ):
+            for iss in self.issue_compiled( operations, index=index, timeout=timeout, order=order ):
+                yield iss
+            return
+        if multiple and packing:
+            for iss in self.issue_packed( operations=operations, index=index, fragment=fragment,
+                                          multiple=multiple, timeout=timeout, packing=packing,
+                                          order=order ):
+                yield iss
+            return
+
         sender_context		= str( index ).encode( 'iso-8859-1' )
         reqsiz = reqmin		= 68
         rpysiz = rpymin		= 68
@@ -973,64 +1274,8 @@ class connector( client ):
             # Chunk up requests if using Multiple Service Request, otherwise send immediately.  Also
             # handle Get Attribute(s) Single/All, but don't include ...All in Multiple Service Packet.
             op['sender_context']= sender_context
-            descr		= "Multi. " if multiple else "Single "
-            begun		= cpppo.timer()
-            method		= op.pop( 'method', 'write' if 'data' in op else 'read' )
-            if method == 'write':
-                descr	       += "Write "
-                if 'offset' not in op:
-                    op['offset']= 0 if fragment else None # Force Write Tag Fragmented
-                req		= self.write( timeout=timeout, send=not multiple, **op )
-                reqest		= 24 + parser.typed_data.datasize(
-                    tag_type=op.get( 'tag_type' ) or enip.INT.tag_type, size=len( op['data'] ))
-                rpyest		= 4
-            elif method == 'read':
-                descr	       += "Read  "
-                if 'offset' not in op:
-                    op['offset']= 0 if fragment else None # Force Read  Tag Fragmented
-                req		= self.read( timeout=timeout, send=not multiple, **op )
-                reqest		= 22
-                rpyest		= 4
-                if op.get( 'data_size' ):
-                    rpyest     += op.get( 'data_size' )
-                else:
-                    rpyest     += parser.typed_data.datasize(
-                        tag_type=op.get( 'tag_type' ) or enip.DINT.tag_type, size=op.get( 'elements', 1 ))
-            elif method == 'set_attribute_single':
-                descr	       += "S_A_S "
-                req		= self.set_attribute_single( timeout=timeout, send=not multiple, **op )
-                reqest		= 8 + parser.typed_data.datasize(
-                    tag_type=op.get( 'tag_type' ) or enip.USINT.tag_type, size=len( op['data'] ))
-                rpyest		= 4
-            elif method == 'get_attribute_single':
-                descr	       += "G_A_S "
-                req		= self.get_attribute_single( timeout=timeout, send=not multiple, **op )
-                reqest		= 8
-                rpyest		= 0
-                if op.get( 'data_size' ):
-                    rpyest     += op.get( 'data_size' )
-                elif op.get( 'tag_type' ): # a non-0/None tag_type defined; use it (assumes 1 element Attribute)
-                    rpyest     += parser.typed_data.datasize(
-                        tag_type=op.get( 'tag_type' ) or enip.DINT.tag_type, size=op.get( 'elements', 1 ))
-                else:
-                    rpyest	= multiple # Completely unknown; prevent merging...
-            elif method == 'get_attributes_all':
-                descr	       += "G_A_A "
-                req		= self.get_attributes_all( timeout=timeout, send=not multiple, **op )
-                reqest		= 8
-                rpyest		= 0
-                if op.get( 'data_size' ):
-                    rpyest     += op.get( 'data_size' )
-                elif op.get( 'tag_type' ) and op.get( 'elements' ):
-                    rpyest     += parser.typed_data.datasize(
-                        tag_type=op.get( 'tag_type' ) or enip.DINT.tag_type, size=op.get( 'elements', 1 ))
-                else:
-                    rpyest	= multiple # Completely unknown; prevent merging...
-            else:
-                log.detail( "Unrecognized operation method %s: %r", method, op )
-            elapsed		= cpppo.timer() - begun
-            descr	       += '    ' if 'offset' not in op else 'Frag' if op['offset'] is not None else 'Tag '
-            descr	       += ' ' + format_path( op['path'], count=op.get( 'elements' ))
+            _,descr,req,reqest,rpyest,elapsed = self.prepare(
+                op, fragment=fragment, multiple=multiple, timeout=timeout )
 
             if multiple:
                 if (( not requests or max( reqsiz + reqest, rpysiz + rpyest ) < multiple )
@@ -1090,6 +1335,214 @@ class connector( client ):
             for d,o,r in requests:
                 yield index,sender_context,d,o,r
 
+    MULTIPLE_OVERHEAD		= 54	# EtherNet/IP ~24, CPF ~16, Unconnected Send ~14 bytes
+    MULTIPLE_REQUEST		= 8	# Multiple Service Packet request service, path and count
+    MULTIPLE_REPLY		= 6	#   "   reply service, status and count
+    PACKABLE			= ( 'read', 'get_attribute_single', 'get_attributes_all' )
+
+    def packed_size( self, method, op, req, multiple ):
+        """Compute the exact size of the request within a Multiple Service Packet (including its
+        offset), and of its reply if it can be computed.  The size of a read reply's data is known if
+        a data_size, or a fixed-size tag_type (and elements, default 1) is supplied; otherwise, it is
+        estimated (as 4-byte elements, or the tag_type's estimated size; eg. SSTRING), as in issue.  An Attribute's reply size is unknown without these; 'multiple' is
+        returned, preventing it from being merged with any other request.
+
+        """
+        reqsiz			= 2 + len( device.dialect.produce( req ))
+        if method in ( 'write', 'set_attribute_single' ):
+            return reqsiz,2 + 4
+        if op.get( 'data_size' ):
+            datsiz		= op['data_size']
+        elif op.get( 'tag_type' ) or method == 'read':
+            datsiz		= parser.typed_data.datasize(
+                tag_type=op.get( 'tag_type' ) or enip.DINT.tag_type, size=op.get( 'elements' ) or 1 )
+        else:
+            return reqsiz,multiple
+        if method == 'read':
+            datsiz	       += 2		# Read Tag [Fragmented] reply data is preceded by its type
+        return reqsiz,2 + 4 + datsiz
+
+    @staticmethod
+    def pack( sizes, reqmax, rpymax ):
+        """Pack the (<reqsiz>,<rpysiz>) items into as few bins as possible, neither of whose totals
+        exceeds reqmax/rpymax, returning a list of bins of item indices (each in ascending order).
+        Uses First-Fit Decreasing; an item too large for any bin is placed in a bin of its own."""
+        bins			= [] # [ [<reqtot>,<rpytot>,[<index>,...]], ... ]
+        for i in sorted( range( len( sizes )), key=lambda i: max( sizes[i] ), reverse=True ):
+            req,rpy		= sizes[i]
+            for b in bins:
+                if b[0] + req <= reqmax and b[1] + rpy <= rpymax:
+                    break
+            else:
+                b		= [ 0, 0, [] ]
+                bins.append( b )
+            b[0]	       += req
+            b[1]	       += rpy
+            b[2].append( i )
+        return sorted( sorted( b[2] ) for b in bins )
+
+    def issue_packed( self, operations, index=0, fragment=False, multiple=0, timeout=None,
+                      packing=1, order=None ):
+        """Issue the I/O operations in as few Multiple Service Packets as possible, each carrying a
+        request and reply of no more than 'multiple' bytes (including the EtherNet/IP, CPF and
+        Unconnected Send wrappers).  Yields (<index>,<context>,<descr>,<op>,<request>), as issue.
+
+        Requests are sized exactly (as encoded), and replies as computed by packed_size.  If
+        'packing' is 1, operations are issued in order (each packet filled 'til the next operation
+        won't fit).  If 'packing' exceeds 1, up to that many consecutive read operations (Read Tag,
+        Get Attribute(s) Single/All, with the same route/send_path) are collected, and bin-packed
+        (possibly out of order) into as few packets as possible.  Writes are never reordered, nor are
+        reads reordered past any write.  The original position of each operation yielded is
+        appended to 'order' (if supplied); use restorer to restore the original order of results
+        (as synchronous and pipeline do).
+
+        """
+        reqmax			= multiple - self.MULTIPLE_OVERHEAD - self.MULTIPLE_REQUEST
+        rpymax			= multiple - self.MULTIPLE_OVERHEAD - self.MULTIPLE_REPLY
+        def paths( op ):
+            return op.get( 'route_path' ),op.get( 'send_path' )
+
+        def flush( segment, reordering ):
+            """Pack the segment's requests into one (in order), or as few as possible packets."""
+            if not reordering:
+                return [ [ s[:-1] for s in segment ] ]
+            return [ [ segment[i][:-1] for i in b ]
+                     for b in self.pack( [ s[-1] for s in segment ], reqmax, rpymax ) ]
+
+        def packets():
+            """Yield each list of (<position>,<descr>,<op>,<request>) to issue in one packet."""
+            segment		= []		# [ (<position>,<descr>,<op>,<request>,(<reqsiz>,<rpysiz>)), ... ]
+            reordering		= False
+            for position,op in enumerate( operations ):
+                method,descr,req,_,_,_ = self.prepare(
+                    op, fragment=fragment, multiple=multiple, timeout=timeout )
+                size		= self.packed_size( method, op, req, multiple )
+                movable		= packing > 1 and method in self.PACKABLE
+                if segment and ( movable != reordering or paths( op ) != paths( segment[0][2] )
+                                 or movable and len( segment ) >= packing
+                                 or not movable and (
+                                     sum( s[-1][0] for s in segment ) + size[0] > reqmax
+                                     or sum( s[-1][1] for s in segment ) + size[1] > rpymax )):
+                    # This op can't join the segment collected so far; issue it
+                    for packet in flush( segment, reordering ):
+                        yield packet
+                    segment	= []
+                reordering	= movable
+                segment.append( (position,descr,op,req,size) )
+            if segment:
+                for packet in flush( segment, reordering ):
+                    yield packet
+
+        for packet in packets():
+            sender_context	= str( index ).encode( 'iso-8859-1' )
+            route_path,send_path = paths( packet[0][2] )
+            begun		= cpppo.timer()
+            mul			= self.multiple( request=[ r for p,d,o,r in packet ], timeout=timeout,
+                                                 sender_context=sender_context,
+                                                 route_path=route_path, send_path=send_path )
+            elapsed		= cpppo.timer() - begun
+            if log.isEnabledFor( logging.DETAIL ):
+                log.detail( "Sent %7.3f/%7.3fs: %s %s", elapsed,
+                            cpppo.inf if timeout is None else timeout, "Multiple Service Packet",
+                            enip.enip_format( mul ))
+            log.detail( "Sending %2d (Context %10r)", len( packet ), sender_context )
+            for p,d,o,r in packet:
+                o['sender_context'] = sender_context
+                if order is not None:
+                    order.append( p )
+                yield index,sender_context,d,o,r
+            index	       += 1
+
+    def compile( self, operations, fragment=False, multiple=0, packing=0, fragment_size=0,
+                 coalesce=0, tag_types=None, identity=None, **kwds ):
+        """Compile the operations (Tag strings and/or parsed operations; see parse_operations) once
+        into an immutable compiled plan, which may be supplied instead of operations to operate,
+        synchronous or pipeline, any number of times.  Each time, the plan's requests are issued
+        without parsing any Tags, coalescing, planning or packing the operations, or encoding any
+        requests; so, a steady-state poll does no more work than sending and harvesting the I/O.
+
+        The operations are coalesced (if 'coalesce'), planned into fragments (if 'fragment_size')
+        and grouped into Multiple Service Packets (if 'multiple'; bin-packed if 'packing'), as for
+        operate; any 'tag_types' known now for the device 'identity' are applied (and may still be
+        learned by operate).  Each request's EtherNet/IP CIP frame is encoded, and only its session
+        handle and sender_context are supplied as it is issued; so, a plan remains valid after the
+        session is re-registered.  Any additional keyword parameters are added to each operation
+        (eg. route_path=...).
+
+        No I/O is performed; but, as for operate, exclusive use of the connector is required (eg.
+        'with conn: plan = conn.compile( ... )').
+
+            plan		= conn.compile( [ "SCADA[0-9]", "TEMP" ], multiple=500 )
+            while True:
+                with conn:
+                    failures,values = conn.process( plan, depth=2 )
+
+        """
+        if isinstance( operations, cpppo.type_str_base ):
+            operations		= [ operations ]
+        parsed			= tuple( parse_operations( operations, fragment=fragment, **kwds ))
+        ops			= ( dict( op ) for op in parsed ) # issuing consumes each op's 'method'
+        order = covers = plans	= None
+        if tag_types is not None:
+            ops			= tag_types.apply( ops, identity=identity )
+        if coalesce:
+            covers		= []
+            ops			= self.coalesce( ops, reach=coalesce, limit=fragment_size, covers=covers )
+        if fragment_size:
+            plans		= []
+            ops			= self.plan( ops, fragment_size=fragment_size, plans=plans )
+        if multiple and packing > 1:
+            order		= []
+        assert self.recording is None, "Recursive compile of %s" % ( self, )
+        frames = self.recording	= [] # Each request encoded (w/ index from 0) is recorded, not sent
+        try:
+            issued		= list( self.issue( ops, fragment=fragment, multiple=multiple,
+                                                    packing=packing, order=order ))
+        finally:
+            self.recording	= None
+        packets			= []
+        for idx,ctx,dsc,op,req in issued:
+            if idx == len( packets ):
+                command		= FAST_HEADER.unpack_from( frames[idx] )[0]
+                packets.append( (command,frames[idx][FAST_HEADER.size:],[]) )
+            packets[idx][2].append( (dsc,op,req) )
+        assert len( packets ) == len( frames ), \
+            "Compiled %d requests, but encoded %d" % ( len( packets ), len( frames ))
+        log.detail( "Compiled %d operations into %d requests", len( parsed ), len( packets ))
+        return compiled(
+            operations		= parsed,
+            packets		= tuple( (c,p,tuple( r )) for c,p,r in packets ),
+            order		= None if order is None else tuple( order ),
+            covers		= None if covers is None else tuple( covers ),
+            plans		= None if plans is None else tuple( plans ))
+
+    def issue_compiled( self, plan, index=0, timeout=None, order=None ):
+        """Issue the pre-encoded requests of a compiled plan (see compile), yielding each
+        (<index>,<context>,<descr>,<op>,<request>), as issue.  Each request's frame is completed w/
+        the session handle, and a sender_context based on 'index'.  The original position of each
+        operation yielded is appended to 'order' (if supplied), as for issue_packed.
+
+        """
+        position		= 0
+        for command,payload,requests in plan.packets:
+            sender_context	= str( index ).encode( 'iso-8859-1' )
+            frame		= FAST_HEADER.pack( command, len( payload ), self.session or 0, 0,
+                                                    bytes( format_context( sender_context )), 0 ) + payload
+            if self.profiler:
+                self.profiler.disable()
+            try:
+                self.send( frame, timeout=timeout )
+            finally:
+                if self.profiler:
+                    self.profiler.enable()
+            log.detail( "Sending %2d (Context %10r)", len( requests ), sender_context )
+            for d,o,r in requests:
+                if order is not None:
+                    order.append( plan.order[position] if plan.order else position )
+                position       += 1
+                yield index,sender_context,d,o,r
+            index	       += 1
+
     def collect( self, timeout=None ):
         """Yield collected request replies 'til timeout expires or session terminates (raising
         StopIteration), or until a GeneratorExit is raised (no more responses expected, and
@@ -1128,45 +1581,10 @@ class connector( client ):
                     cpppo.inf if timeout is None else timeout ))
             elif not response:	# empty response indicates clean EOF
                 raise StopIteration( "Session terminated" )
-            elif 'enip.status' in response and response.enip.status != 0:
-                raise Exception( "Response EtherNet/IP status: %d" % ( response.enip.status ))
-            elif 'enip.CIP.send_data.CPF.item[1].unconnected_send.request.multiple.request' in response:
-                # Multiple Service Packet; request.multiple.request is an array of read/write_tag/frag
-                replies		= response.enip.CIP.send_data.CPF.item[1].unconnected_send.request.multiple.request
-            elif 'enip.CIP.send_data.CPF.item[1].unconnected_send.request' in response:
-                # Single request; request is a read/write_tag/frag
-                replies		= [ response.enip.CIP.send_data.CPF.item[1].unconnected_send.request ]
-            else:
-                raise Exception( "Response Unrecognized: %s" % ( enip.enip_format( response )))
             ctx			= parse_context( response.enip.sender_context.input )
+            replies		= response_replies( response )
             log.detail( "Receive %2d (Context %10r)", len( replies ), ctx )
-            assert replies, \
-                "Receive %2d (Context %10r): Mismatched; failed to locate replies in: %s" % (
-                    len( replies ), ctx, enip.enip_format( response ))
-
-            for reply in replies:
-                val	= None
-                sts	= reply.status			# sts = # or (#,[#...])
-                if reply.status in (0x00,0x06):		# Success or Partial Data; val is Truthy
-                    if 'read_frag' in reply:
-                        val	= reply.read_frag.data
-                    elif 'read_tag' in reply:
-                        val	= reply.read_tag.data
-                    elif 'set_attribute_single' in reply:
-                        val	= True
-                    elif 'get_attribute_single' in reply:
-                        val	= reply.get_attribute_single.data
-                    elif 'get_attributes_all' in reply:
-                        val	= reply.get_attributes_all.data
-                    elif 'write_frag' in reply:
-                        val	= True
-                    elif 'write_tag' in reply:
-                        val	= True
-                    else:
-                        raise Exception( "Reply Unrecognized: %s" % ( enip.enip_format( reply )))
-                else:					# Failure; val is Falsey
-                    if 'status_ext' in reply and reply.status_ext.size:
-                        sts	= (reply.status,reply.status_ext.data)
+            for reply,sts,val in replies:
                 yield ctx,reply,sts,val
 
     def harvest( self, issued, timeout=None ):
@@ -1207,20 +1625,30 @@ class connector( client ):
     # 
     #     Use validate to post-process these results, to fill in data for reads (from the request).
     # 
-    def synchronous( self, operations, index=0, fragment=False, multiple=0, timeout=None ):
-        """Issue the requested 'operations' synchronously.  Yield each harvested record.
+    def synchronous( self, operations, index=0, fragment=False, multiple=0, timeout=None, packing=0 ):
+        """Issue the requested 'operations' (or compiled plan) synchronously.  Yield each harvested
+        record (in the original order of the operations, even if 'packing' reorders them; see
+        issue_packed).
 
         """
+        order			= collections.deque() if packing > 1 or (
+            isinstance( operations, compiled ) and operations.order ) else None
+        restore			= restorer( order )
         for col in self.harvest(
                 issued=self.issue(
                     operations=operations, index=index, fragment=fragment, multiple=multiple,
-                    timeout=timeout ),
+                    timeout=timeout, packing=packing, order=order ),
                 timeout=timeout ):
-            yield col
+            for res in restore( col ):
+                yield res
 
-    def pipeline( self, operations, index=0, fragment=False, multiple=0, timeout=None, depth=1 ):
+    def pipeline( self, operations, index=0, fragment=False, multiple=0, timeout=None, depth=1,
+                  packing=0 ):
         """Issue the requested 'operations', allowing up to 'depth' outstanding requests to be in the
-        pipeline, before beginning to harvest results.  Yield each harvested record.
+        pipeline, before beginning to harvest results.  Yield each harvested record (in the original
+        order of the operations, even if 'packing' reorders them; see issue_packed).
+
+        If 'depth' is an adaptive instance, the depth is adjusted as each reply is harvested.
 
         """
         class drainable( collections.deque ):
@@ -1234,37 +1662,55 @@ class connector( client ):
                     raise StopIteration
             next = __next__ # Python 2/3 compatibility
         
+        order			= collections.deque() if packing > 1 or (
+            isinstance( operations, compiled ) and operations.order ) else None
+        restore			= restorer( order )
         issuer			= self.issue( operations=operations, index=index, fragment=fragment,
-                                              multiple=multiple, timeout=timeout )
+                                              multiple=multiple, timeout=timeout, packing=packing,
+                                              order=order )
         inflight		= drainable()	# We iterate over this as we append to it...
         harvester		= self.harvest( issued=iter( inflight ), timeout=timeout )
         requests		= 0
         complete		= 0
+        window			= depth if isinstance( depth, adaptive ) else None
+        if window:
+            window.forget()
 
         curr = last		= index - 1	# initial condition handles empty operations list
-        while issuer or inflight:
-            if issuer:
-                try:
-                    iss		= next( issuer )
-                    curr	= iss[0]
-                    requests   += 1
-                    inflight.append( iss )
-                    log.detail( "Issuing   %3d/%3d; curr: %3d - last: %3d == %3d depth",
-                                complete, requests, curr, last, curr - last )
-                except StopIteration:
-                    issuer	= None
-            if curr - last > depth or not issuer:
-                try:
-                    col		= next( harvester )
-                    last	= col[0]
-                    complete   += 1
-                    log.detail( "Completed %3d/%3d; curr: %3d - last: %3d == %3d depth",
-                                complete, requests, curr, last, curr - last )
-                    yield col
-                except StopIteration:
-                    break
-        log.detail( "Pipelined %3d/%3d; curr: %3d - last: %3d == %3d depth",
-                    complete, requests, curr, last, curr - last )
+        try:
+            while issuer or inflight:
+                if issuer:
+                    try:
+                        iss	= next( issuer )
+                        curr	= iss[0]
+                        requests += 1
+                        inflight.append( iss )
+                        if window:
+                            window.issued( curr )
+                        log.detail( "Issuing   %3d/%3d; curr: %3d - last: %3d == %3d depth",
+                                    complete, requests, curr, last, curr - last )
+                    except StopIteration:
+                        issuer	= None
+                if curr - last > ( window.depth if window else depth ) or not issuer:
+                    try:
+                        col	= next( harvester )
+                        last	= col[0]
+                        complete += 1
+                        if window:
+                            window.harvested( last )
+                        log.detail( "Completed %3d/%3d; curr: %3d - last: %3d == %3d depth",
+                                    complete, requests, curr, last, curr - last )
+                        for res in restore( col ):
+                            yield res
+                    except StopIteration:
+                        break
+            log.detail( "Pipelined %3d/%3d; curr: %3d - last: %3d == %3d depth",
+                        complete, requests, curr, last, curr - last )
+            if window and complete < requests:
+                window.timedout()
+        finally:
+            if window: # eg. the caller ceased harvesting early, or an exception was raised
+                window.forget()
         assert complete == requests, \
             "Communication ceased before harvesting all pipeline responses: %3d/%3d" % (
                 complete, requests )
@@ -1372,7 +1818,191 @@ class connector( client ):
     # sequences, and simply returns the number of (<failures>,<transactions>), optionally printing a
     # summary of I/O performed.
     # 
-    def operate( self, operations, depth=0, printing=False, validating=False, **kwds ):
+    FRAGMENT_SIZE		= 480	# Data bytes per planned fragment; within a Logix ~500 byte reply
+
+    def coalesce( self, operations, reach=1, limit=None, covers=None, hold=100 ):
+        """Merge reads of overlapping or adjacent (within 'reach') element ranges of the same Tag into
+        single reads, each transferring no more than 'limit' (default: FRAGMENT_SIZE) bytes of data
+        (assuming 4-byte elements, unless a tag_type is supplied); like plc_modbus.merge does for
+        Modbus registers.  A 'reach' > 1 allows merging across gaps of up to 'reach' - 1 elements
+        (reading data not requested).  Only runs of consecutive reads (w/ no explicit 'offset') are
+        merged; a read is never merged across any other operation (eg. a write).  A read within the
+        range of a (larger) read is always merged.  Each merged read is issued at the position of
+        the first operation it satisfies.  No more than 'hold' consecutive reads are held for merging
+        before they are issued, so an unbounded stream of reads is still issued as it arrives.
+
+        For each operation yielded, the (<position>,<element>,<count>) of each original operation it
+        satisfies is appended to 'covers' (if supplied), for uncoalesce.  The <element> is relative
+        to the first element read (or None, if not merged).
+
+        """
+        if not limit:
+            limit		= self.FRAGMENT_SIZE
+
+        def flush( segment ):
+            """Merge the segment's reads of each Tag, yielding (<covers>,<operation>) in order"""
+            groups		= collections.OrderedDict() # { <key>: [ (<elm>,<cnt>,<position>,<op>), ... ] }
+            for key,elm,cnt,position,op in segment:
+                groups.setdefault( key, [] ).append( (elm,cnt,position,op) )
+            merged		= [] # [ (<beg>,<end>,[ (<elm>,<cnt>,<position>,<op>), ... ]), ... ]
+            for key,reads in groups.items():
+                typ		= parser.typed_data.TYPES_SUPPORTED.get( reads[0][3].get( 'tag_type' ))
+                most		= max( 1, limit // ( getattr( typ, 'struct_calcsize', None ) or 4 ))
+                beg = end	= None
+                cover		= []
+                for elm,cnt,position,op in sorted( reads, key=lambda r: ( r[0] or 0, r[2] )):
+                    if cover and ( elm or 0 ) < end + reach \
+                       and max( end, ( elm or 0 ) + cnt ) - beg <= max( most, end - beg ):
+                        end	= max( end, ( elm or 0 ) + cnt )
+                    else:
+                        if cover:
+                            merged.append( (beg,end,cover) )
+                        beg,end,cover = elm or 0,( elm or 0 ) + cnt,[]
+                    cover.append( (elm,cnt,position,op) )
+                merged.append( (beg,end,cover) )
+
+            # Issue each merged read at the position of the first original operation it satisfies
+            for beg,end,cover in sorted( merged, key=lambda m: min( r[2] for r in m[2] )):
+                cover.sort( key=lambda r: r[2] )
+                elm,_,position,op = cover[0]
+                if len( cover ) == 1:
+                    yield [ (position,None,None) ],op
+                    continue
+                seg,_,_		= parse_path_elements( op['path'] )
+                op		= dict( op, elements=end - beg )
+                op['path']	= list( seg[:-1] if elm is not None else seg )
+                if elm is not None:
+                    op['path'].append( { 'element': beg } )
+                log.info( "Coalesced %d reads into %s", len( cover ), format_path( op['path'], count=end - beg ))
+                yield [ (p,( e or 0 ) - beg,c) for e,c,p,_ in cover ],op
+
+        segment			= []	# [ (<key>,<elm>,<cnt>,<position>,<op>), ... ]
+        for position,op in enumerate( operations ):
+            method		= op.get( 'method', 'write' if 'data' in op else 'read' )
+            if method == 'read' and 'offset' not in op:
+                seg,elm,cnt	= parse_path_elements( op['path'] )
+                if elm is None and seg and 'element' in seg[-1]:
+                    elm		= seg[-1]['element']
+                if cnt is None:
+                    cnt		= op.get( 'elements', 1 )
+                key		= ( json.dumps( list( seg[:-1] if elm is not None else seg ), sort_keys=True ),
+                                    elm is None, op.get( 'tag_type' ),
+                                    repr( op.get( 'route_path' )), repr( op.get( 'send_path' )))
+                segment.append( (key,elm,cnt,position,op) )
+                if len( segment ) < hold:
+                    continue
+                op		= None	# Segment full; issue it now, w/ no following operation
+            for cov,opr in flush( segment ):
+                if covers is not None:
+                    covers.append( cov )
+                yield opr
+            segment		= []
+            if op is None:
+                continue
+            if covers is not None:
+                covers.append( [ (position,None,None) ] )
+            yield op
+        for cov,opr in flush( segment ):
+            if covers is not None:
+                covers.append( cov )
+            yield opr
+
+    def uncoalesce( self, harvested, covers ):
+        """Split the harvested records of coalesced reads back out to each original operation (see
+        coalesce), yielding them in the original order.  Each receives its own range of the data
+        read; if the merged read failed (or didn't return all of an operation's data), so does it.
+
+        """
+        order			= collections.deque()
+        restore			= restorer( order )
+        for idx,dsc,req,rpy,sts,val in harvested:
+            for position,elm,cnt in covers.popleft():
+                if elm is None:
+                    res		= idx,dsc,req,rpy,sts,val
+                else:
+                    data	= val[elm:elm+cnt] if sts in ( 0x00, 0x06 ) and val else []
+                    res		= ( idx,dsc,req,rpy,0x00,data ) if len( data ) == cnt else \
+                                  ( idx,dsc,req,rpy,sts or 0x06,None )
+                order.append( position )
+                for r in restore( res ):
+                    yield r
+
+
+    def plan( self, operations, fragment_size=None, plans=None ):
+        """Split each large Read/Write Tag operation into Read/Write Tag Fragmented operations, each
+        transferring no more than 'fragment_size' (default: FRAGMENT_SIZE) bytes of data.  Only
+        operations of a known fixed-size 'tag_type' (and w/o an explicit 'offset') can be planned;
+        the byte offset of an element of a variable-length type (eg. SSTRING) can't be computed.
+        Each fragment reads/writes its own range of elements at its computed byte offset, so they may
+        all be pipelined (or even packed into Multiple Service Packets).  The plan for each operation
+        is appended to 'plans' (if supplied), for reassemble: None if unchanged, or the
+        (<fragments>,<elements>,<size>) of a planned read/write.
+
+        """
+        if not fragment_size:
+            fragment_size	= self.FRAGMENT_SIZE
+        for op in operations:
+            method		= op.get( 'method', 'write' if 'data' in op else 'read' )
+            _,size		= FAST_TYPES.get( op.get( 'tag_type' ), (None,None) )
+            elements		= len( op['data'] ) if method == 'write' else op.get( 'elements', 1 )
+            if ( method not in ( 'read', 'write' ) or not size or 'offset' in op
+                 or elements * size <= fragment_size ):
+                if plans is not None:
+                    plans.append( None )
+                yield op
+                continue
+            per			= max( 1, fragment_size // size )
+            count		= ( elements + per - 1 ) // per
+            log.info( "Planned %d %s fragments of %d elements: %s", count, method, per,
+                      format_path( op['path'], count=elements ))
+            if plans is not None:
+                plans.append( (count,elements,size) )
+            for beg in range( 0, elements, per ):
+                frag		= dict( op, offset=beg * size )
+                if method == 'write':
+                    frag['data'] = op['data'][beg:beg+per]
+                else:
+                    frag['elements'] = min( elements, beg + per ) # Read elements [beg,beg+per)
+                yield frag
+
+    def reassemble( self, harvested, plans ):
+        """Combine the harvested records of each operation's planned fragments into one (see plan).
+        The data read by each fragment is collected into one list (preallocated for all the
+        elements), and the last fragment's record is yielded w/ this value (True, for a write).  If
+        any fragment fails (or returns only partial data; the fragment_size exceeds the device's
+        capacity), the failing status and a None value are yielded.
+
+        """
+        harvested		= iter( harvested )
+        for idx,dsc,req,rpy,sts,val in harvested:
+            planned		= plans.popleft()
+            if planned is None:
+                yield idx,dsc,req,rpy,sts,val
+                continue
+            count,elements,size	= planned
+            data		= [ None ] * elements if 'read_frag' in req else True
+            failed		= None
+            for i in range( count ):
+                if i:
+                    try:
+                        idx,_,req,rpy,sts,val = next( harvested )
+                    except StopIteration:
+                        return	# Harvesting ceased (pipeline will report the failure)
+                if failed is not None:
+                    continue
+                if val is None or sts:
+                    failed	= sts or 0x06
+                    log.warning( "Planned fragment %d/%d failed w/ status %r: %s", i + 1, count, sts, dsc )
+                elif data is not True:
+                    beg		= req.read_frag.offset // size
+                    data[beg:beg+len( val )] = val
+            if failed is not None:
+                yield idx,dsc,req,rpy,failed,None
+            else:
+                yield idx,dsc,req,rpy,sts,data
+
+    def operate( self, operations, depth=0, printing=False, validating=False, fragment_size=0,
+                 coalesce=0, tag_types=None, identity=None, **kwds ):
         """Operate on a sequence of I/O operations, yielding the details.  If a non-zero 'depth' is
         specified, then pipeline the requests allowing 'depth' outstanding transactions to be
         in-flight; otherwise, we just issue the transactions synchronously.
@@ -1381,13 +2011,52 @@ class connector( client ):
         operations (and also fills in the yielded value written for successful Write Tag
         [Fragmented] requests, instead of just signalling success using True).
 
+        If a non-zero 'fragment_size' is supplied, large reads/writes are planned into Fragmented
+        requests of no more than that many bytes of data (see plan), and each operation's results
+        are reassembled.
+
+        If a non-zero 'coalesce' is supplied, reads of element ranges of the same Tag within that
+        reach of each other are merged (see coalesce), and the results split back out to each
+        original operation (in their original order).
+
+        If a 'tag_types' is supplied, the learned tag_type of each Tag is supplied to reads w/o one,
+        and the tag_type of each Tag read is learned from its reply (see tag_types), for the device
+        w/ the given 'identity' (default: the tag_types' identity).
+
+        If 'operations' is a compiled plan (see compile), it was already coalesced, planned and
+        packed when compiled; the fragment_size, coalesce, multiple and packing supplied are unused.
+
         Raises Exception on catastrophic failure of the connection.
 
         """
+        learning = covers = plans = None
+        if isinstance( operations, compiled ):
+            if tag_types is not None:
+                learning	= iter( operations.operations )
+            if operations.covers is not None:
+                covers		= collections.deque( operations.covers )
+            if operations.plans is not None:
+                plans		= collections.deque( operations.plans )
+        else:
+            if tag_types is not None:
+                operations,learning = itertools.tee( tag_types.apply( operations, identity=identity ))
+            if coalesce:
+                covers		= collections.deque()
+                operations	= self.coalesce( operations, reach=coalesce, limit=fragment_size,
+                                                 covers=covers )
+            if fragment_size:
+                plans		= collections.deque()
+                operations	= self.plan( operations, fragment_size=fragment_size, plans=plans )
         if depth:
             harvested		= self.pipeline( operations=operations, depth=depth, **kwds )
         else:
             harvested		= self.synchronous( operations=operations, **kwds )
+        if plans is not None:
+            harvested		= self.reassemble( harvested, plans )
+        if covers is not None:
+            harvested		= self.uncoalesce( harvested, covers )
+        if learning is not None:
+            harvested		= tag_types.learn( learning, harvested, identity=identity )
         if printing or validating:
             harvested		= self.validate( harvested=harvested, printing=printing )
         for idx,dsc,req,rpy,sts,val in harvested:
@@ -1408,6 +2077,632 @@ class connector( client ):
         return failures,transactions
 
 
+class adaptive( object ):
+    """An adaptive pipeline depth; supply an instance as the 'depth' to connector.pipeline/operate
+    (or to a get_attribute.proxy, multiplexer, ...), and retain it for use across transactions.
+
+    The round-trip time of each request (from issue 'til its reply is harvested) is measured, and
+    the smallest seen ('rtt_min') is taken as the RTT of a request that didn't queue at the device.
+    Like TCP Vegas, the expected throughput ( window / rtt_min ) is compared to the actual
+    throughput ( window / rtt ); the difference (times rtt_min) estimates how many requests are
+    queued at the device, rather than being usefully "on the wire".  While fewer than 'alpha' are
+    queued, the window grows additively (by about 1 request per window of replies harvested); if
+    more than 'beta' are queued, it shrinks multiplicatively by 'decrease' (at most once per RTT).
+    If replies cease (eg. a timeout), the window returns to its 'minimum'.  The window always
+    remains within [minimum, maximum].
+
+    So, a device with a high-latency link but able to process requests quickly will be driven with
+    a deep pipeline, while a device that processes requests serially won't have requests needlessly
+    queued.  The current depth, RTTs and throughput (replies/s) are available in .stats.
+
+    """
+    def __init__( self, depth=1, minimum=1, maximum=16, alpha=1.0, beta=3.0, decrease=.5,
+                  smoothing=.125 ):
+        assert 1 <= minimum <= maximum, \
+            "Invalid adaptive depth bounds [%r,%r]" % ( minimum, maximum )
+        self.minimum		= minimum
+        self.maximum		= maximum
+        self.alpha		= alpha
+        self.beta		= beta
+        self.decrease		= decrease
+        self.smoothing		= smoothing
+        self.window		= float( max( minimum, min( maximum, depth )))
+        self.rtt		= None		# Smoothed round-trip time
+        self.rtt_min		= None
+        self.interval		= None		# Smoothed time between harvested replies
+        self.harvest_last	= None
+        self.holdoff		= None		# No decrease 'til after this time
+        self.sent		= {}		# { <index>: <issued>, ... }
+        self.replies		= 0
+        self.increases		= 0
+        self.decreases		= 0
+        self.timeouts		= 0
+
+    @property
+    def depth( self ):
+        return max( self.minimum, min( self.maximum, int( self.window )))
+
+    @property
+    def throughput( self ):
+        return 1.0 / self.interval if self.interval else None
+
+    @property
+    def stats( self ):
+        return dict( depth=self.depth, window=self.window, rtt=self.rtt, rtt_min=self.rtt_min,
+                     throughput=self.throughput, replies=self.replies, increases=self.increases,
+                     decreases=self.decreases, timeouts=self.timeouts )
+
+    def __str__( self ):
+        return "depth %d (RTT %s, min %s; %s replies/s)" % (
+            self.depth,
+            "%7.3fs" % self.rtt if self.rtt is not None else "?",
+            "%7.3fs" % self.rtt_min if self.rtt_min is not None else "?",
+            "%7.1f" % self.throughput if self.throughput is not None else "?" )
+
+    def issued( self, index, now=None ):
+        """Request 'index' was issued (the first of a Multiple Service Packet's operations counts)."""
+        self.sent.setdefault( index, cpppo.timer() if now is None else now )
+
+    def harvested( self, index, now=None ):
+        """A reply to request 'index' was harvested; adjust the window."""
+        begun			= self.sent.pop( index, None )
+        if begun is None:
+            return		# Another reply to an already harvested Multiple Service Packet
+        if now is None:
+            now			= cpppo.timer()
+        rtt			= now - begun
+        self.replies	       += 1
+        if self.harvest_last is not None:
+            gap			= now - self.harvest_last
+            self.interval	= gap if self.interval is None else (
+                self.interval + self.smoothing * ( gap - self.interval ))
+        self.harvest_last	= now
+        self.rtt_min		= rtt if self.rtt_min is None else min( self.rtt_min, rtt )
+        self.rtt		= rtt if self.rtt is None else (
+            self.rtt + self.smoothing * ( rtt - self.rtt ))
+        queued			= self.window * ( 1 - self.rtt_min / self.rtt ) if self.rtt else 0
+        if queued < self.alpha:
+            if self.window < self.maximum:
+                self.window	= min( self.maximum, self.window + 1.0 / self.window )
+                self.increases += 1
+        elif queued > self.beta:
+            if self.window > self.minimum and ( self.holdoff is None or now >= self.holdoff ):
+                self.window	= max( self.minimum, self.window * self.decrease )
+                self.holdoff	= now + self.rtt
+                self.decreases += 1
+                log.detail( "Pipeline decreased to %s; %5.1f requests queued", self, queued )
+
+    def forget( self ):
+        """A pipeline began or ended; forget any requests issued but not harvested (their indices
+        will be re-used by the next pipeline)."""
+        self.sent.clear()
+
+    def timedout( self ):
+        """Replies ceased (eg. due to a timeout); return to the minimum depth."""
+        self.window		= float( self.minimum )
+        self.forget()
+        self.harvest_last	= None
+        self.timeouts	       += 1
+        log.normal( "Pipeline reset to %s after timeout", self )
+
+
+class restorer( object ):
+    """Restore the original order of records harvested from operations issued out of order.  The
+    'order' deque receives the original position of each operation as it is issued (see
+    connector.issue_packed); call with each harvested record (in issue order), to yield the records
+    now ready in original order.  With no 'order', each record is simply yielded."""
+    def __init__( self, order=None ):
+        self.order		= order
+        self.pending		= {}
+        self.position		= 0
+
+    def __call__( self, record ):
+        if self.order is None:
+            yield record
+            return
+        self.pending[self.order.popleft()] = record
+        while self.position in self.pending:
+            yield self.pending.pop( self.position )
+            self.position      += 1
+
+
+class tag_types( object ):
+    """Learn the CIP tag_type of each Tag from the first successful Read Tag [Fragmented] reply, and
+    supply it to subsequent reads of the Tag (so their reply sizes are known for packing into Multiple
+    Service Packets, and planning into Fragmented requests) instead of assuming 4-byte elements.  If a
+    'path' is supplied, the learned types are kept in a JSON file (updated as new types are learned),
+    shared by every device: { "<identity>": { "<Tag>": <tag_type>, ... }, ... }.
+
+    The types learned are specific to the device 'identity' (eg. a List Identity identity_object,
+    or a string), supplied to each apply and learn (default: the 'identity' supplied here); so, one
+    instance (or file) may be shared by the proxies of many devices (see get_attribute.proxy).  A
+    reply w/ a tag_type differing from that remembered (eg. the device's program was changed)
+    replaces it.  Only fixed-size types are learned; the size of a variable-length type's data (eg.
+    SSTRING) isn't known in advance, so it is of no use in packing or planning.
+
+        types			= tag_types( path="tags.json", identity="controller" )
+        for idx,dsc,req,rpy,sts,val in conn.operate( operations, tag_types=types, ... ):
+
+    """
+    saving			= threading.Lock() # Serializes every instance's save (of any path)
+
+    def __init__( self, path=None, identity=None ):
+        self.path		= path
+        self.identity		= self.identifier( identity )
+        self.lock		= threading.Lock()
+        self.devices		= {}		# { <identity>: { <Tag>: <tag_type>, ... }, ... }
+        self.unsaved		= {}		#   ... learned since the last save
+        if path and os.path.exists( path ):
+            try:
+                self.devices	= self.load()
+            except Exception as exc:
+                log.warning( "Ignoring unreadable Tag type cache %s: %s", path, exc )
+
+    def __str__( self ):
+        return "Tag types for %d devices" % ( len( self.devices ))
+
+    @staticmethod
+    def identifier( identity ):
+        """Deduce a "<vendor_id>/<product_code>/<serial_number>/<product_name>" string from a List
+        Identity identity_object; a string (or None) is used as-is."""
+        if identity is None or isinstance( identity, cpppo.type_str_base ):
+            return identity or ''
+        return '/'.join( str( getattr( identity, a, '' ))
+                         for a in ( 'vendor_id', 'product_code', 'serial_number', 'product_name' ))
+
+    def types( self, identity=None ):
+        """The { <Tag>: <tag_type>, ... } learned for the device w/ the given identity (default: the
+        instance's identity)."""
+        device			= self.identity if identity is None else self.identifier( identity )
+        with self.lock:
+            return self.devices.setdefault( device, {} )
+
+    @staticmethod
+    def key( op ):
+        """The Tag read by a Read Tag [Fragmented] operation (w/o its element index, and including
+        any non-default route_path/send_path), or None if not a Read Tag operation."""
+        if op.get( 'method', 'write' if 'data' in op else 'read' ) != 'read':
+            return None
+        seg,elm,cnt		= parse_path_elements( op['path'] )
+        if seg and 'element' in seg[-1]:
+            seg			= seg[:-1]
+        key			= format_path( seg )
+        if op.get( 'route_path' ) is not None or op.get( 'send_path' ) is not None:
+            key		       += ' ' + json.dumps( [ op.get( 'route_path' ), op.get( 'send_path' ) ],
+                                                    sort_keys=True )
+        return key
+
+    def apply( self, operations, identity=None ):
+        """Yield the operations, supplying the tag_type learned for the device w/ the given identity
+        to any Read Tag w/o one (if a fixed-size type; eg. not one saved by an earlier version)."""
+        types			= self.types( identity )
+        for op in operations:
+            if not op.get( 'tag_type' ):
+                typ		= types.get( self.key( op ))
+                if typ in FAST_TYPES:
+                    op		= dict( op, tag_type=typ )
+            yield op
+
+    def learn( self, operations, harvested, identity=None ):
+        """Yield the harvested records, learning the tag_type in each successful Read Tag reply to
+        the corresponding (original) operation, for the device w/ the given identity.  Saves any
+        newly learned types when complete."""
+        device			= self.identity if identity is None else self.identifier( identity )
+        types			= self.types( device )
+        learned			= 0
+        try:
+            for op,(idx,dsc,req,rpy,sts,val) in zip( operations, harvested ):
+                typ		= None
+                if sts in (0x00,0x06) and rpy:
+                    rtg		= rpy.get( 'read_frag' ) or rpy.get( 'read_tag' )
+                    typ		= rtg.get( 'type' ) if rtg else None
+                key		= typ in FAST_TYPES and self.key( op )
+                if key and types.get( key ) != typ:
+                    log.detail( "Learned %s Tag %s type: %r", device, key, typ )
+                    with self.lock:
+                        types[key] = typ
+                        self.unsaved.setdefault( device, {} )[key] = typ
+                    learned    += 1
+                yield idx,dsc,req,rpy,sts,val
+        finally:
+            if learned:
+                self.save()
+
+    def load( self ):
+        """Return the { <identity>: { <Tag>: <tag_type>, ... }, ... } in the JSON file."""
+        with open( self.path, 'r' ) as f:
+            return json.load( f )
+
+    def save( self ):
+        """Merge the types learned since the last save into the JSON file (if any), atomically
+        replacing it.  The file is re-loaded first, so the types saved meanwhile by any other
+        instance (eg. the proxy of another device) are retained, and are adopted by this one."""
+        if not self.path:
+            return
+        with tag_types.saving:
+            devices		= {}
+            if os.path.exists( self.path ):
+                try:
+                    devices	= self.load()
+                except Exception as exc:
+                    log.warning( "Replacing unreadable Tag type cache %s: %s", self.path, exc )
+            with self.lock:
+                unsaved,self.unsaved = self.unsaved,{}
+                for device,types in unsaved.items():
+                    devices.setdefault( device, {} ).update( types )
+                for device,types in devices.items():
+                    self.devices.setdefault( device, {} ).update( types )
+            temp		= "%s.%d.tmp" % ( self.path, os.getpid() )
+            with open( temp, 'w' ) as f:
+                json.dump( devices, f, indent=4, sort_keys=True )
+            os.rename( temp, self.path )
+        log.info( "Saved %s to %s", self, self.path )
+
+
+class multiplexed( object ):
+    """The eventual (<index>,<descr>,<request>,<reply>,<status>,<value>) result of one operation
+    submitted to a multiplexer, or the Exception that prevented its completion."""
+    __slots__			= ( 'done', 'result', 'error' )
+
+    def __init__( self ):
+        self.done		= threading.Event()
+        self.result		= None
+        self.error		= None
+
+    def complete( self, result=None, error=None ):
+        self.result		= result
+        self.error		= error
+        self.done.set()
+
+
+class multiplexer( object ):
+    """Multiplex the I/O operations submitted by many Threads over a single connector's session.
+
+    Each Thread's operations are queued (see submit); a single I/O Thread collects all operations
+    queued by every Thread, and performs them together using the connector's operate (pipelining
+    them to 'depth' requests in-flight, and packing them into Multiple Service Packets of up to
+    'multiple' bytes; optionally bin-packed, see connector.issue_packed).  Each reply is matched to
+    its request by sender_context (see connector.harvest), and its result is returned to the
+    submitting Thread.  While one collection of operations is in-flight, further operations
+    accumulate for the next; so, as the number of Threads increases, so does the number of
+    operations in each collection (instead of each Thread's transaction being serialized by the
+    connector's lock).
+
+        mux			= multiplexer( connector( host=... ), depth=2, multiple=500 )
+        for idx,dsc,req,rpy,sts,val in mux.operate( parse_operations( [ "SCADA[0-9]" ] )):
+            ...
+        mux.close()
+
+    If the connector fails, each outstanding and subsequent operation raises the Exception; the
+    multiplexer (and its connector) must be discarded.
+
+    """
+    def __init__( self, conn, depth=0, multiple=0, timeout=None, fragment=False, packing=0,
+                  fragment_size=0, coalesce=0, tag_types=None, identity=None ):
+        self.conn		= conn
+        self.depth		= depth
+        self.multiple		= multiple
+        self.packing		= packing
+        self.fragment_size	= fragment_size
+        self.coalesce		= coalesce
+        self.tag_types		= tag_types
+        self.identity		= identity
+        self.timeout		= timeout
+        self.fragment		= fragment
+        self.queue		= collections.deque() # [ (<operation>,<multiplexed>), ... ]
+        self.ready		= threading.Condition()
+        self.done		= False
+        self.error		= None
+        self.batches		= 0		# Collections of operations performed
+        self.thread		= threading.Thread( target=self.run, name="multiplexer %s" % ( conn, ))
+        self.thread.daemon	= True
+        self.thread.start()
+
+    def __str__( self ):
+        return "multiplexer over %s" % ( self.conn, )
+
+    def submit( self, operations ):
+        """Queue the operations for the I/O Thread; returns a list of their multiplexed results."""
+        pending			= []
+        with self.ready:
+            for op in operations:
+                res		= multiplexed()
+                if self.error is not None or self.done:
+                    res.complete( error=self.error or Exception( "%s closed" % ( self, )))
+                else:
+                    self.queue.append( (op,res) )
+                pending.append( res )
+            self.ready.notify()
+        return pending
+
+    def operate( self, operations, timeout=None ):
+        """Submit the operations, and yield each (<index>,<descr>,<request>,<reply>,<status>,<value>)
+        in order as it completes, raising an Exception if any cannot be completed w/in timeout
+        (default: the multiplexer's timeout)."""
+        if timeout is None:
+            timeout		= self.timeout
+        for res in self.submit( operations ):
+            if not res.done.wait( timeout ):
+                raise Exception( "%s: Response Not Received w/in %7.2fs" % (
+                    self, cpppo.inf if timeout is None else timeout ))
+            if res.error is not None:
+                raise res.error
+            yield res.result
+
+    def run( self ):
+        """Perform all queued operations (from every Thread) together, 'til closed or failed."""
+        while True:
+            with self.ready:
+                while not self.queue and not self.done:
+                    self.ready.wait()
+                if self.done:
+                    break
+                batch		= list( self.queue )
+                self.queue.clear()
+            log.detail( "%s: Operating on %d operations", self, len( batch ))
+            self.batches       += 1
+            complete		= 0
+            try:
+                with self.conn:
+                    for result in self.conn.operate(
+                            ( op for op,_ in batch ), depth=self.depth, multiple=self.multiple,
+                            timeout=self.timeout, fragment=self.fragment, packing=self.packing,
+                            fragment_size=self.fragment_size, coalesce=self.coalesce,
+                            tag_types=self.tag_types, identity=self.identity ):
+                        batch[complete][1].complete( result=result )
+                        complete       += 1
+                assert complete == len( batch ), \
+                    "Communication ceased before completing %d/%d operations" % ( complete, len( batch ))
+            except Exception as exc:
+                log.warning( "%s: Failed after %d/%d operations: %s", self, complete, len( batch ), exc )
+                with self.ready:
+                    self.error	= exc
+                    batch.extend( self.queue )
+                    self.queue.clear()
+                for _,res in batch[complete:]:
+                    res.complete( error=exc )
+                break
+        # Closed (or failed); fail anything remaining in the queue
+        with self.ready:
+            remains		= list( self.queue )
+            self.queue.clear()
+        for _,res in remains:
+            res.complete( error=self.error or Exception( "%s closed" % ( self, )))
+
+    def close( self ):
+        """Stop the I/O Thread (after any operations in-flight complete).  The connector remains
+        open; close it separately."""
+        with self.ready:
+            self.done		= True
+            self.ready.notify()
+        if self.thread is not threading.current_thread():
+            self.thread.join( self.timeout )
+
+
+class connector_aio( client, asyncio.Protocol if asyncio else object ):
+    """An EtherNet/IP CIP client session driven by an asyncio event loop (Python 3.4+).  Each request
+    is transmitted immediately, and returns an asyncio.Future of its result; any number may be
+    in-flight (pipelined) at once.  Each response is matched to its request by sender_context.  The
+    client's request construction (parse_path, Unconnected Send, Multiple Service Packet, ...) and
+    response parsers are used unchanged; so, one event loop may drive sessions to many devices.
+
+        conn			= yield from connector_aio.connect( host="10.0.1.2", timeout=5 )
+        value			= yield from conn.read( "SCADA[0-9]" )
+        values			= yield from asyncio.gather( *[ conn.read( "Tag%d" % i ) for i in range( 10 ) ])
+        ok,value		= yield from conn.multiple( [
+                                    conn.write( "SCADA[1]", data=[99], send=False ),
+                                    conn.read( "SCADA[0-9]", send=False ) ])
+        identity		= yield from conn.list_identity()
+        conn.close()
+
+    The read, write, get/set_attribute_single and get_attributes_all Futures yield the reply's
+    value (as per connector.collect: a list of data for reads, True for writes, None on failure);
+    multiple yields a list of each reply's value.  Supplying send=False returns the request (for a
+    Multiple Service Packet), as for client.  Any other request (eg. list_identity) yields the
+    complete EtherNet/IP response.  If no response is received within timeout, the Future raises
+    asyncio.TimeoutError.  If the session fails or closes, all outstanding Futures raise.
+
+    """
+    def __init__( self, host, port=None, timeout=None, dialect=None, loop=None ):
+        addr			= ( host if host is not None else enip.address[0],
+                                    port if port is not None else enip.address[1] )
+        self.addr		= ( str( addr[0] or 'localhost' ), int( addr[1] or 44818 ))
+        self.addr_connected	= True
+        self.conn		= None
+        self.udp		= False
+        self.ifce		= None
+        self.timeout		= timeout
+        self.loop		= loop or asyncio.get_event_loop()
+        self.transport		= None
+        self.pending		= {}		# { <sender_context>: <Future>, ... }
+        self.contexts		= itertools.count( 1 )
+        self.error		= None		# Exception that terminated the session
+        self.initialize( dialect=dialect )
+
+    @classmethod
+    def connect( cls, host, port=None, timeout=None, dialect=None, loop=None ):
+        """Return a Future of a new connector_aio session, connected and registered within timeout."""
+        self			= cls( host, port=port, timeout=timeout, dialect=dialect, loop=loop )
+        result			= asyncio.Future( loop=self.loop )
+        begun			= cpppo.timer()
+
+        def failed( exc ):
+            log.normal( "Connect:  Failure in %7.3fs/%7.3fs: %s", cpppo.timer() - begun,
+                        cpppo.inf if timeout is None else timeout, exc )
+            self.close()
+            if not result.done():
+                result.set_exception( exc )
+
+        def registered( fut ):
+            try:
+                rsp		= fut.result()
+                assert rsp.enip.status == 0, \
+                    "EtherNet/IP response indicates failure: %s" % rsp.enip.status
+                assert 'enip.CIP.register' in rsp, "Failed to receive Register response"
+                self.session	= rsp.enip.session_handle
+            except Exception as exc:
+                return failed( exc )
+            log.normal( "Connect:  Success in %7.3fs/%7.3fs", cpppo.timer() - begun,
+                        cpppo.inf if timeout is None else timeout )
+            if not result.done():
+                result.set_result( self )
+
+        def connected( fut ):
+            if fut.cancelled() or fut.exception():
+                return failed( fut.exception() or asyncio.TimeoutError( "Connect timed out" ))
+            self.register( timeout=None if timeout is None else max( 0, timeout - ( cpppo.timer() - begun ))
+                          ).add_done_callback( registered )
+
+        connecting		= asyncio.ensure_future( self.loop.create_connection(
+            lambda: self, self.addr[0], self.addr[1] ), loop=self.loop )
+        connecting.add_done_callback( connected )
+        if timeout is not None:
+            self.loop.call_later( timeout, lambda: connecting.done() or connecting.cancel() )
+        return result
+
+    # asyncio.Protocol interface
+    def connection_made( self, transport ):
+        self.transport		= transport
+        self.frame.__enter__()		# Only the event loop parses our responses; retain the lock
+        conn			= transport.get_extra_info( 'socket' )
+        try:
+            conn.setsockopt( socket.IPPROTO_TCP, socket.TCP_NODELAY, 1 )
+        except Exception as exc:
+            log.warning( "Couldn't set TCP_NODELAY on socket to EtherNet/IP server at %s:%s: %s",
+                         self.addr[0], self.addr[1], exc )
+
+    def data_received( self, data ):
+        if log.isEnabledFor( logging.INFO ): # data may be a memoryview; log its content
+            log.info( "EtherNet/IP-->%16s:%-5s rcvd %5d: %r", self.addr[0], self.addr[1], len( data ), bytes( data ))
+        if self.engine is None and self.source.peek() is None and self.fast and device.dialect is logix.Logix:
+            data		= self.decode( data, self.addr )
+        if len( data ):
+            self.source.chain( data )
+        try:
+            while True:
+                response	= next( self ) # parses from self.source; never receives
+                if response is None:
+                    break
+                ctx		= parse_context( response.enip.sender_context.input )
+                fut		= self.pending.pop( ctx, None )
+                if fut is None:
+                    log.warning( "Response (Context %10r) Mismatched; no request outstanding", ctx )
+                elif not fut.done():
+                    fut.set_result( response )
+        except Exception as exc:
+            self.terminate( exc )
+
+    def eof_received( self ):
+        self.terminate( Exception( "Session terminated" ))
+
+    def connection_lost( self, exc ):
+        self.terminate( exc or Exception( "Session terminated" ))
+        if self.frame.lock.locked():
+            self.frame.__exit__( None, None, None )
+
+    def terminate( self, exc ):
+        """Fail all outstanding requests, and close the session."""
+        if self.error is None:
+            self.error		= exc
+            log.normal( "EtherNet/IP   %16s:%-5d done: %s", self.addr[0], self.addr[1], exc )
+        pending,self.pending	= self.pending,{}
+        for fut in pending.values():
+            if not fut.done():
+                fut.set_exception( exc )
+        if self.transport is not None:
+            self.transport.close()
+
+    def close( self ):
+        if self.transport is not None:
+            self.transport.close()
+
+    # Response reception is driven by data_received; client.__next__ must never itself receive
+    def recvfrom( self, timeout=None ):
+        return None,self.addr
+
+    def send( self, request, timeout=None ):
+        assert self.transport is not None and self.error is None, \
+            "Session to %r not connected: %s" % ( self.addr, self.error )
+        self.transport.write( bytes( request ))
+        log.info( "EtherNet/IP-->%16s:%-5d send %5d: %r", self.addr[0], self.addr[1], len( request ), request )
+
+    def transact( self, method, *args, **kwds ):
+        """Issue a request using the client method, returning a Future of its EtherNet/IP response."""
+        if not kwds.get( 'sender_context' ):
+            kwds['sender_context'] = str( next( self.contexts ) % 100000000 ).encode( 'iso-8859-1' )
+        ctx			= kwds['sender_context']
+        timeout			= kwds.get( 'timeout' )
+        if timeout is None:
+            timeout		= self.timeout
+        fut			= asyncio.Future( loop=self.loop )
+        try:
+            self.pending[ctx]	= fut
+            method( self, *args, **kwds )
+        except Exception as exc:
+            self.pending.pop( ctx, None )
+            fut.set_exception( exc )
+            return fut
+        if timeout is not None:
+            def expired():
+                if self.pending.get( ctx ) is fut:
+                    del self.pending[ctx]
+                if not fut.done():
+                    fut.set_exception( asyncio.TimeoutError(
+                        "Response Not Received w/in %7.2fs" % ( timeout )))
+            timer		= self.loop.call_later( timeout, expired )
+            fut.add_done_callback( lambda f: timer.cancel() ) # eg. on response, or termination
+        return fut
+
+    def transact_values( self, method, *args, **kwds ):
+        """Issue a CIP request using the client method (or, if send=False, just return the request),
+        returning a Future of its value (or, if a Multiple Service Packet, a list of its values)."""
+        if not kwds.get( 'send', True ):
+            return method( self, *args, **kwds )
+        response		= self.transact( method, *args, **kwds )
+        result			= asyncio.Future( loop=self.loop )
+
+        def done( fut ):
+            if result.done():
+                return
+            try:
+                values		= [ val for rpy,sts,val in response_replies( fut.result() ) ]
+                result.set_result( values if method.__name__ == "multiple" else values[0] )
+            except Exception as exc:
+                result.set_exception( exc )
+        response.add_done_callback( done )
+        return result
+
+    def register( self, *args, **kwds ):
+        return self.transact( client.register, *args, **kwds )
+
+    def list_interfaces( self, *args, **kwds ):
+        return self.transact( client.list_interfaces, *args, **kwds )
+
+    def list_services( self, *args, **kwds ):
+        return self.transact( client.list_services, *args, **kwds )
+
+    def list_identity( self, *args, **kwds ):
+        return self.transact( client.list_identity, *args, **kwds )
+
+    def get_attributes_all( self, *args, **kwds ):
+        return self.transact_values( client.get_attributes_all, *args, **kwds )
+
+    def get_attribute_single( self, *args, **kwds ):
+        return self.transact_values( client.get_attribute_single, *args, **kwds )
+
+    def set_attribute_single( self, *args, **kwds ):
+        return self.transact_values( client.set_attribute_single, *args, **kwds )
+
+    def read( self, *args, **kwds ):
+        return self.transact_values( client.read, *args, **kwds )
+
+    def write( self, *args, **kwds ):
+        return self.transact_values( client.write, *args, **kwds )
+
+    def multiple( self, *args, **kwds ):
+        return self.transact_values( client.multiple, *args, **kwds )
+
+
 def recycle( iterable, times=None ):
     """Record and repeat an iterable x 'times'; forever if times is None (the default), not at all if
     times is 0.  Like itertools.cycle, but with an optional 'times' limit.
@@ -1502,10 +2797,18 @@ which is required to carry this Send/Route Path data. """ )
                      default=False, 
                      help="Use Multiple Service Packet request targeting ~500 bytes (default: False)" )
     ap.add_argument( '-d', '--depth', default=1,
-                     help="Pipeline requests to this depth (default: 1)" )
+                     help="Pipeline requests to this depth, or 'auto' to adapt it (default: 1)" )
+    ap.add_argument( '--packing', default=0,
+                     help="Bin-pack Multiple Service Packets, reordering up to this many reads (default: 0)" )
     ap.add_argument( '-f', '--fragment', dest='fragment', action='store_true',
                      default=False,
                      help="Always use Read/Write Tag Fragmented requests (default: False)" )
+    ap.add_argument( '--coalesce', default=0,
+                     help="Merge reads of Tag elements within this reach of each other (default: 0)" )
+    ap.add_argument( '--fragment-size', default=0,
+                     help="Plan large typed reads/writes into Fragmented requests of this many bytes (default: 0)" )
+    ap.add_argument( '--tag-types', default=None,
+                     help="Learn Tag types, keeping them in this JSON file for the --address (default: None)" )
     ap.add_argument( '-s', '--list-services', action='store_true',
                      default=False,
                      help="Perform a CIP List Services request upon connection (default: False)" )
@@ -1548,9 +2851,14 @@ which is required to carry this Send/Route Path data. """ )
                                     int( addr[1] ) if len( addr ) > 1 and addr[1] else enip.address[1] )
     timeout			= float( args.timeout )
     repeat			= int( args.repeat )
-    depth			= int( args.depth )
+    depth			= adaptive() if args.depth == 'auto' else int( args.depth )
     multiple			= 500 if args.multiple else 0
+    packing			= int( args.packing )
+    fragment_size		= int( args.fragment_size )
+    coalesce			= int( args.coalesce )
     fragment			= bool( args.fragment )
+    types			= tag_types( path=args.tag_types, identity="%s:%d" % addr ) \
+                                  if args.tag_types else None
     printing			= args.print
     # route_path may be None/0/False/'[]', send_path may be None/''/'@2/1'.  -S|--simple designates
     # '[]', '' respectively, appropriate for non-routing CIP devices, eg. MicroLogix, PowerFlex, ...
@@ -1626,13 +2934,16 @@ which is required to carry this Send/Route Path data. """ )
             operations		= parse_operations(
                 recycle( tags, times=repeat ), route_path=route_path, send_path=send_path )
             failed,transactions	= connection.process(
-                operations=operations, depth=depth, multiple=multiple,
-                fragment=fragment, printing=printing, timeout=timeout )
+                operations=operations, depth=depth, multiple=multiple, packing=packing,
+                fragment=fragment, fragment_size=fragment_size, coalesce=coalesce,
+                tag_types=types, printing=printing, timeout=timeout )
             failures	       += failed
             elapsed			= cpppo.timer() - begun
             if transactions: # May be [], if from stdin, and no operations provided
                 log.normal( "Client Tag I/O  Average %7.3f TPS (%7.3fs ea)." % (
                     len( transactions ) / elapsed, elapsed / len( transactions )))
+            if isinstance( depth, adaptive ):
+                log.normal( "Client Tag I/O  Pipeline %s", depth )
 
     if profiler:
         s			= StringIO.StringIO()
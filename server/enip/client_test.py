@@ -7,13 +7,16 @@ try:
 except ImportError:
     pass
 
+import collections
 import errno
+import itertools
 import logging
 import multiprocessing
-#import threading
+import threading
 import os
 import random
 import socket
+import struct
 import sys
 import time
 
@@ -28,9 +31,47 @@ if __name__ == "__main__":
 from ...dotdict import dotdict, apidict
 from ... import misc, tools
 from .. import enip, network
+from . import client, device
 
 log				= logging.getLogger( "cli.test" )
 
+
+class socketless( object ):
+    """Mix in ahead of a client.client (or connector), to use it w/o connecting any socket."""
+    def __init__( self, **kwds ):
+        self.conn		= None
+        self.addr		= ( 'localhost', 44818 )
+        self.initialize()
+
+
+class simulator( socketless, client.connector ):
+    """A socketless connector which records each request, and simulates each reply as a Logix
+    Controller would, where each element's value is its index."""
+    def __init__( self, **kwds ):
+        super( simulator, self ).__init__( **kwds )
+        self.session		= 0x1234
+        self.sent		= []
+
+    def close( self ):
+        pass
+
+    def send( self, request, timeout=None ):
+        self.sent.append( bytes( request ))
+
+    def harvest( self, issued, timeout=None ):
+        for idx,ctx,dsc,op,req in issued:
+            if 'write_tag' in req or 'write_frag' in req:
+                yield idx,dsc,req,None,0x00,True
+                continue
+            seg			= req.path.segment[-1]
+            elm			= seg.element if 'element' in seg else 0
+            if 'read_frag' in req:
+                beg		= req.read_frag.offset // 4
+                yield idx,dsc,req,None,0x00,list( range( elm + beg, elm + req.read_frag.elements ))
+            else:
+                yield idx,dsc,req,None,0x00,list( range( elm, elm + req.read_tag.elements ))
+
+
 def test_parse_path():
     """EPATH segment parsing, from strings."""
     # Version <= 3.9.2 functionality
@@ -113,6 +154,388 @@ def test_client_timeout():
         conn.terminate()
 
 
+def test_client_multiplexer():
+    """Operations submitted concurrently by many Threads are performed together over one connector."""
+
+    class fake_connector( object ):
+        """Performs each collection of operations after a delay, returning each op's 'data'."""
+        def __init__( self ):
+            self.lock		= threading.Lock()
+            self.batches	= []
+        def __enter__( self ):
+            self.lock.acquire()
+            return self
+        def __exit__( self, typ, val, tbk ):
+            self.lock.release()
+        def operate( self, operations, depth=0, multiple=0, timeout=None, fragment=False, **kwds ):
+            batch		= list( operations )
+            self.batches.append( len( batch ))
+            time.sleep( .1 )
+            for i,op in enumerate( batch ):
+                if op.get( 'fail' ):
+                    raise Exception( "Connection failed" )
+                yield i,"Single Read  ",op,None,0,op['data']
+
+    conn			= fake_connector()
+    mux				= client.multiplexer( conn, depth=2, multiple=500, timeout=5 )
+    results			= {}
+    def operator( n ):
+        results[n]		= [ val for idx,dsc,req,rpy,sts,val in mux.operate(
+            { 'data': [ n, i ] } for i in range( 3 )) ]
+    try:
+        list( mux.operate( [ { 'data': [ -1 ] } ] )) # The first collection is in-flight...
+        threads			= [ threading.Thread( target=operator, args=( n, )) for n in range( 10 ) ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        # ... each Thread received its own results, in order
+        assert results == dict( ( n, [ [ n, i ] for i in range( 3 ) ] ) for n in range( 10 ))
+        assert sum( conn.batches ) == 31
+        assert len( conn.batches ) < 11 # Many Threads' operations were performed together
+
+        # A failure is reported to all outstanding (and subsequent) operations
+        try:
+            list( mux.operate( [ { 'data': [ 0 ] }, { 'data': [ 1 ], 'fail': True } ] ))
+            assert False, "Should have failed"
+        except Exception as exc:
+            assert "Connection failed" in str( exc )
+        try:
+            list( mux.operate( [ { 'data': [ 0 ] } ] ))
+            assert False, "Should have failed"
+        except Exception as exc:
+            assert "Connection failed" in str( exc )
+    finally:
+        mux.close()
+
+
+def test_client_packing():
+    """Operations are bin-packed into as few Multiple Service Packets as possible, using exact sizes."""
+
+    class recorder( socketless, client.connector ):
+        """Records the size and number of requests in each Multiple Service Packet, w/o sending."""
+        def __init__( self ):
+            super( recorder, self ).__init__()
+            self.packets	= []
+        def multiple( self, request, **kwds ):
+            kwds.update( send=False )
+            mul			= super( recorder, self ).multiple( request, **kwds )
+            self.packets.append( ( len( request ), len( device.dialect.produce( mul ))))
+            return mul
+
+    def packets( tags, **kwds ):
+        conn			= recorder()
+        order			= []
+        issued			= list( conn.issue( client.parse_operations( tags ), multiple=500,
+                                                    order=order, **kwds ))
+        assert len( issued ) == len( tags )
+        assert all( siz <= 500 - conn.MULTIPLE_OVERHEAD for _,siz in conn.packets )
+        return [ num for num,_ in conn.packets ],order
+
+    # Exact sizes (and a known small tag type) fit many more reads into each packet than estimates
+    small			= [ "b%d" % i for i in range( 100 ) ]
+    estimated,_			= packets( small )
+    exact,order			= packets( [ dict( t, tag_type=enip.SINT.tag_type )
+                                             for t in client.parse_operations( small ) ], packing=1 )
+    assert len( estimated ) == 6 and len( exact ) == 3
+    assert order == list( range( 100 ))
+
+    # Reads may be reordered (but never past a write), and their original order restored
+    tags			= [ "A[0-59]", "B[0-59]", "C[0-44]", "D[0-44]" ]
+    assert packets( tags, packing=1 )[0] == [ 1, 2, 1 ]
+    counts,order		= packets( tags, packing=10 )
+    assert counts == [ 2, 2 ] and order == [ 0, 2, 1, 3 ]
+    assert packets( tags[:2] + [ "X=(DINT)1" ] + tags[2:], packing=10 )[0] == [ 1, 1, 1, 2 ]
+    restore			= client.restorer( collections.deque( order ))
+    assert [ r for rec in order for r in restore( rec ) ] == [ 0, 1, 2, 3 ]
+
+
+def test_client_plan():
+    """Large reads/writes of known type are planned into Fragmented requests, and reassembled."""
+    conn			= simulator()
+    tags			= [ "Tag[0-299]", "Tag[0-299]=(DINT)" + ",".join( map( str, range( 300 ))), "X" ]
+    operations			= [ dict( op, tag_type=enip.DINT.tag_type )
+                                    for op in client.parse_operations( tags ) ]
+    plans			= collections.deque()
+    planned			= list( conn.plan( operations, fragment_size=400, plans=plans ))
+    assert list( plans ) == [ (3,300,4), (3,300,4), None ]
+    assert [ ( op['offset'], op['elements'] ) for op in planned[:3] ] == [ (0,100), (400,200), (800,300) ]
+    assert [ ( op['offset'], op['data'][0], len( op['data'] )) for op in planned[3:6] ] \
+        == [ (0,0,100), (400,100,100), (800,200,100) ]
+    assert 'offset' not in planned[6]
+
+    # Operations of variable-length types (eg. SSTRING) are never planned
+    strings			= [ dict( op, tag_type=enip.SSTRING.tag_type ) for op in client.parse_operations(
+        [ "Names[0-9]", "Names[0-9]=(SSTRING)" + ",".join( "name%d" % i for i in range( 10 )) ] ) ]
+    unplanned			= collections.deque()
+    assert list( conn.plan( strings, fragment_size=100, plans=unplanned )) == strings
+    assert list( unplanned ) == [ None, None ]
+
+    def harvested( failing=None ):
+        """Simulate each fragment's reply, as a Logix Controller would (data from the byte offset)"""
+        for i,op in enumerate( planned ):
+            method,_,req,_,_,_	= conn.prepare( dict( op ), multiple=500 ) # (not sent)
+            if i == failing:
+                yield i,"Frag",req,None,0x06,None
+            elif method == 'write':
+                yield i,"Frag",req,None,0x00,True
+            elif 'offset' in op:
+                yield i,"Frag",req,None,0x00,list( range( op['offset'] // 4, op['elements'] ))
+            else:
+                yield i,"Read",req,None,0x00,[ 42 ]
+
+    results			= list( conn.reassemble( harvested(), collections.deque( plans )))
+    assert [ val for idx,dsc,req,rpy,sts,val in results ] == [ list( range( 300 )), True, [ 42 ] ]
+    results			= list( conn.reassemble( harvested( failing=1 ), collections.deque( plans )))
+    assert [ ( sts,val ) for idx,dsc,req,rpy,sts,val in results ] == [ (0x06,None), (0x00,True), (0x00,[ 42 ]) ]
+
+
+def test_client_coalesce():
+    """Reads of overlapping/adjacent element ranges of a Tag are merged, and their results split."""
+    conn			= simulator()
+    tags			= [ "Tag[0]", "Tag[1-9]", "Other[5]", "Tag[10]", "Tag[5-6]", "Tag[50]",
+                                    "Tag[0]=(DINT)1", "Tag[11]", "Scalar", "Scalar" ]
+    covers			= collections.deque()
+    coalesced			= list( conn.coalesce( client.parse_operations( tags ), covers=covers ))
+    assert [ client.format_path( op['path'], count=op.get( 'elements' )) for op in coalesced ] \
+        == [ "Tag[0-10]", "Other[5]", "Tag[50]", "Tag[0-0]", "Tag[11]", "Scalar" ]
+    assert list( covers )[0] == [ (0,0,1), (1,1,9), (3,10,1), (4,5,2) ]
+
+    # A larger reach merges across gaps; a small limit prevents merging (except of Tag[5-6], which
+    # is wholly satisfied by the preceding Tag[1-9])
+    assert len( list( conn.coalesce( client.parse_operations( tags[:6] ), reach=50 ))) == 2
+    assert len( list( conn.coalesce( client.parse_operations( tags[:6] ), limit=8 ))) == 5
+
+    # An unbounded stream of reads is issued in segments of no more than 'hold' reads
+    stream			= conn.coalesce( ( { 'path': [ { 'symbolic': 'Tag' }, { 'element': i } ] }
+                                           for i in itertools.count() ), hold=10 )
+    assert [ op.get( 'elements' ) for op in itertools.islice( stream, 3 ) ] == [ 10, 10, 10 ]
+
+    def harvested():
+        """Simulate each read's reply; each element's value is its index"""
+        for i,op in enumerate( coalesced ):
+            if 'data' in op:
+                yield i,"Write",None,None,0x00,True
+                continue
+            seg,elm,cnt		= client.parse_path_elements( op['path'] )
+            elm			= seg[-1].get( 'element', 0 )
+            yield i,"Read",None,None,0x00,list( range( elm, elm + op.get( 'elements', 1 )))
+
+    results			= list( conn.uncoalesce( harvested(), collections.deque( covers )))
+    assert [ val for idx,dsc,req,rpy,sts,val in results ] == [
+        [0], list( range( 1, 10 )), [5], [10], [5, 6], [50], True, [11], [0], [0] ]
+
+
+def test_client_tag_types( tmpdir ):
+    """The tag_type of each Tag read is learned from its reply, kept per device, and reused."""
+    class learner( socketless, client.connector ):
+        def __init__( self ):
+            super( learner, self ).__init__()
+            self.issued		= []
+        def synchronous( self, operations, **kwds ):
+            for i,op in enumerate( operations ):
+                self.issued.append( op.get( 'tag_type' ))
+                rpy		= dotdict()
+                rpy.read_tag	= dotdict( type=enip.REAL.tag_type if 'data' not in op else None )
+                yield i,"Read",op,rpy,0x00,[ 1.0 ] * op.get( 'elements', 1 )
+
+    path			= str( tmpdir.join( "tags.json" ))
+    conn			= learner()
+    types			= client.tag_types( path=path, identity="plc" )
+    tags			= [ "Tag[0]", "Tag[1-9]", "Other=(INT)1", "Tag" ]
+    list( conn.operate( client.parse_operations( tags ), tag_types=types ))
+    assert conn.issued == [ None, enip.REAL.tag_type, enip.INT.tag_type, enip.REAL.tag_type ]
+    assert types.types() == { "Tag": enip.REAL.tag_type }
+
+    # Once learned, reads of the Tag (any element range) are supplied its type, for packing/planning
+    del conn.issued[:]
+    list( conn.operate( client.parse_operations( tags ), tag_types=types ))
+    assert conn.issued == [ enip.REAL.tag_type, enip.REAL.tag_type, enip.INT.tag_type, enip.REAL.tag_type ]
+
+    # The types learned are persistent, and specific to the device's identity
+    identity			= dotdict( vendor_id=1, product_code=54, serial_number=123,
+                                           product_name="1756-L61/B LOGIX5561" )
+    assert client.tag_types( path=path, identity="plc" ).types() == { "Tag": enip.REAL.tag_type }
+    other			= client.tag_types( path=path, identity=identity )
+    assert other.identity == "1/54/123/1756-L61/B LOGIX5561"
+    assert other.types() == {}
+
+    # Instances sharing a file (eg. the proxies of different devices) retain each other's types
+    a,b				= client.tag_types( path=path, identity="plcA" ),client.tag_types( path=path, identity="plcB" )
+    list( conn.operate( client.parse_operations( [ "A" ] ), tag_types=a ))
+    list( conn.operate( client.parse_operations( [ "B" ] ), tag_types=b ))
+    saved			= client.tag_types( path=path )
+    assert sorted( saved.devices ) == [ "plc", "plcA", "plcB" ]
+    assert b.types( "plcA" ) == { "A": enip.REAL.tag_type }
+
+    # One instance may be shared by many devices; each operate supplies the identity to use
+    shared			= client.tag_types()
+    list( conn.operate( client.parse_operations( [ "X" ] ), tag_types=shared, identity="plcX" ))
+    del conn.issued[:]
+    list( conn.operate( client.parse_operations( [ "X" ] ), tag_types=shared, identity="plcY" ))
+    list( conn.operate( client.parse_operations( [ "X" ] ), tag_types=shared, identity=identity ))
+    list( conn.operate( client.parse_operations( [ "X" ] ), tag_types=shared, identity="plcX" ))
+    assert conn.issued == [ None, None, enip.REAL.tag_type ]
+    assert shared.types( identity ) == { "X": enip.REAL.tag_type }
+
+    # Variable-length types (eg. SSTRING) are neither learned, nor applied
+    rpy				= dotdict()
+    rpy.read_tag		= dotdict( type=enip.SSTRING.tag_type )
+    names			= list( client.parse_operations( [ "Names[0-1]" ] ))
+    list( shared.learn( names, [ (0,"Read",None,rpy,0x00,[ "a", "b" ]) ], identity="plcS" ))
+    assert shared.types( "plcS" ) == {}
+    shared.types( "plcS" )["Names"] = enip.SSTRING.tag_type
+    assert 'tag_type' not in next( shared.apply( names, identity="plcS" ))
+
+
+def test_client_compile():
+    """A compiled plan issues the same requests as its operations, without parsing or encoding them."""
+    tags			= [ "Tag[0-9]", "Other=(DINT)1,2,3", "Tag[10-14]", "Big[0-299]", "Tag[20]",
+                                    "Scalar", "Tag[5-6]" ]
+    def operations():
+        return [ dict( op, tag_type=enip.DINT.tag_type ) if 'data' not in op else op
+                 for op in client.parse_operations( tags ) ]
+    conn			= simulator()
+    for kwds in ( dict(), dict( multiple=500 ), dict( multiple=200, packing=4 ),
+                  dict( multiple=500, coalesce=1, fragment_size=400 ),
+                  dict( multiple=300, packing=8, coalesce=1, fragment_size=400 )):
+        expected		= list( conn.operate( operations(), **kwds ))
+        frames			= conn.sent[:]
+        del conn.sent[:]
+        plan			= conn.compile( operations(), **kwds )
+        assert conn.sent == []
+        for _ in range( 2 ):
+            results		= list( conn.operate( plan, **kwds ))
+            assert conn.sent == frames
+            assert [ ( sts,val ) for idx,dsc,req,rpy,sts,val in results ] \
+                == [ ( sts,val ) for idx,dsc,req,rpy,sts,val in expected ]
+            del conn.sent[:]
+        assert results[0][-1] == list( range( 10 )) and results[3][-1] == list( range( 300 ))
+
+    # Each request is completed w/ the current session and sender_context, as it is issued
+    plan			= conn.compile( "Tag[0-9]" )
+    conn.session		= 0x5678
+    list( conn.issue( plan, index=42 ))
+    command,length,session,status,context,options = client.FAST_HEADER.unpack_from( conn.sent[0] )
+    assert ( command,session,context ) == ( 0x006F, 0x5678, b'42\0\0\0\0\0\0' )
+    assert length == len( conn.sent[0] ) - client.FAST_HEADER.size
+    assert plan.operations[0]['path'] == next( client.parse_operations( [ "Tag[0-9]" ] ))['path']
+
+
+def test_client_fast_response():
+    """Common replies are decoded by fast_response exactly as by the dfa parsers; others fall back."""
+    def frame( payload, command=0x006F, status=0, ctx=b'fast' ):
+        cpf			= struct.pack( '<IHHHHHH', 0, 5, 2, 0, 0, 0xB2, len( payload )) + payload
+        return struct.pack( '<HHII8sI', command, len( cpf ), 0x1234, status,
+                            client.format_context( ctx ), 0 ) + cpf
+    def msp( *replies ):
+        offsets			= []
+        for r in replies:
+            offsets.append( 2 + 2 * len( replies ) + sum( len( o ) for o in replies[:len( offsets )] ))
+        return struct.pack( '<BBBBH%dH' % len( replies ), 0x8A, 0, 0, 0, len( replies ), *offsets ) \
+            + b''.join( replies )
+
+    read_int			= struct.pack( '<BBBBH3h', 0xCC, 0, 0, 0, enip.INT.tag_type, 1, -2, 3 )
+    read_real			= struct.pack( '<BBBBH2f', 0xD2, 0, 0x06, 0, enip.REAL.tag_type, 1.5, -2.25 )
+    read_bool			= struct.pack( '<BBBBHB', 0xCC, 0, 0, 0, enip.BOOL.tag_type, 255 )
+    write_tag			= struct.pack( '<BBBB', 0xCD, 0, 0, 0 )
+    write_frag			= struct.pack( '<BBBB', 0xD3, 0, 0, 0 )
+    read_fail			= struct.pack( '<BBBBH', 0xCC, 0, 0x05, 1, 0x1234 )
+    read_string			= struct.pack( '<BBBBHH3s', 0xCC, 0, 0, 0, enip.SSTRING.tag_type, 3, b'abc' )
+
+    class decoder( socketless, client.client ):
+        def __init__( self ):
+            super( decoder, self ).__init__()
+            self.received	= []
+        def recvfrom( self, timeout=None ):
+            return ( self.received.pop( 0 ) if self.received else None ),self.addr
+
+    cli				= decoder()
+    def parse( rcvd, fast ):
+        cli.fast		= fast
+        cli.received.append( rcvd )
+        results			= []
+        with cli:
+            while True:
+                res		= cli.next()
+                if res is None:
+                    break
+                results.append( dict( ( k,v ) for k,v in res.items()
+                                      if not k.endswith( 'input' ) and not k.endswith( 'request_data' )))
+        return results
+
+    for payload in [ read_int, read_real, read_bool, write_tag, write_frag,
+                     msp( read_int, write_tag, read_real, write_frag, read_bool ) ]:
+        assert client.fast_response( frame( payload )) is not None
+        assert parse( frame( payload ), fast=True ) == parse( frame( payload ), fast=False )
+
+    # Unusual replies fall back to the dfa parsers
+    for rcvd in [ frame( read_fail ), frame( read_string ), frame( msp( read_int, read_fail )),
+                  frame( write_tag, status=1 ), frame( b'', command=0x0063 ) ]:
+        assert client.fast_response( rcvd ) is None
+
+    # Several frames received at once; those recognized are decoded directly, the remainder (from
+    # the first unrecognized) is parsed by the dfa, and a partial frame awaits the rest of its input
+    rcvd			= frame( read_int ) + frame( write_tag ) + frame( read_fail ) \
+                                  + frame( read_real ) + frame( read_bool )
+    cli.fast			= True
+    cli.received		= [ rcvd[:-5], rcvd[-5:] ]
+    results			= []
+    with cli:
+        for _ in range( 10 ):
+            res			= cli.next()	# None, while awaiting the remainder of the partial frame
+            if res is not None:
+                results.append( res )
+    assert not cli.received and len( results ) == 5
+    replies			= [ client.response_replies( r )[0] for r in results ]
+    assert [ ( sts,val ) for rpy,sts,val in replies ] == [
+        ( 0, [ 1, -2, 3 ] ), ( 0, True ), ( (5,[0x1234]), None ), ( 6, [ 1.5, -2.25 ] ), ( 0, [ 255 ] ) ]
+    assert all( client.parse_context( r.enip.sender_context.input ) == b'fast' for r in results )
+
+
+def test_client_adaptive():
+    """The adaptive pipeline depth grows over a high-latency link, but not at a serial device."""
+    def simulate( latency, service, depth=1, rounds=100 ):
+        """Each round, 'depth' requests are issued; the device replies to each in turn."""
+        window			= client.adaptive( depth=depth, maximum=16 )
+        now,index		= 0.0,0
+        for _ in range( rounds ):
+            issued		= []
+            for _ in range( window.depth ):
+                window.issued( index, now=now )
+                issued.append( index )
+                index	       += 1
+            for i,idx in enumerate( issued ):
+                window.harvested( idx, now=now + latency + ( i + 1 ) * service )
+            now	       += latency + len( issued ) * service
+        return window
+
+    fast			= simulate( latency=.100, service=.001 )
+    assert fast.depth == 16
+    assert fast.throughput > 100
+    slow			= simulate( latency=.001, service=.010 )
+    assert slow.depth <= 5
+    slow			= simulate( latency=.001, service=.010, depth=16 )
+    assert slow.depth <= 5 and slow.decreases
+    assert set( slow.stats ) >= set( [ 'depth', 'rtt', 'rtt_min', 'throughput', 'timeouts' ] )
+
+    slow.timedout()
+    assert slow.depth == 1 and slow.stats['timeouts'] == 1
+    assert "depth 1" in str( slow )
+
+    # A pipeline abandoned early forgets its unharvested requests; the next one re-uses indices
+    conn			= simulator()
+    window			= client.adaptive( depth=4 )
+    pipe			= conn.pipeline( client.parse_operations( [ "Tag[%d]" % i for i in range( 10 ) ] ),
+                                         depth=window )
+    next( pipe )
+    assert window.sent
+    pipe.close()
+    assert not window.sent
+    assert len( list( conn.pipeline( client.parse_operations( [ "Tag" ] * 3 ), depth=window ))) == 3
+    assert window.rtt_min < 1.0 and window.rtt < 1.0
+
+
 def test_client_api():
     """Performance of executing an operation a number of times on a socket connected
     Logix simulator, within the same Python interpreter (ie. all on a single CPU
@@ -228,3 +651,99 @@ def test_client_api():
                                                  client_count	= clicount,
                                                  client_max	= clipool )
     assert failed == 0
+
+
+def test_client_aio():
+    """An asyncio event loop drives a connector_aio session, w/ pipelined requests."""
+    try:
+        import asyncio
+    except ImportError:
+        return # Python 3.4+ only
+
+    svraddr		        = ('localhost', 12397)
+    kwargs			= {
+        'argv': [
+            '--address',	'%s:%d' % svraddr,
+            'SCADA=INT[10]',
+        ],
+        'server': {
+            'control':	apidict( enip.timeout, {
+                'done': False
+            }),
+        },
+    }
+    server			= threading.Thread( target=enip.main, kwargs=kwargs )
+    server.daemon		= True
+    server.start()
+    loop			= asyncio.new_event_loop()
+    try:
+        time.sleep( .5 ) # Wait for server to be established
+        conn			= loop.run_until_complete(
+            client.connector_aio.connect( *svraddr, timeout=5, loop=loop ))
+        assert conn.session
+        # Many requests may be in-flight; each response is matched to its request
+        responses		= loop.run_until_complete( asyncio.gather(
+            *[ conn.list_identity() for _ in range( 5 ) ], loop=loop ))
+        assert len( responses ) == 5
+        for rsp in responses:
+            assert rsp.enip.status == 0
+            assert rsp.enip.CIP.list_identity.CPF.item[0].identity_object.product_name \
+                == "1756-L61/B LOGIX5561"
+        assert not conn.pending
+        # Requests for a Multiple Service Packet are just constructed (not sent) w/ send=False
+        req			= conn.read( "SCADA[1-3]", send=False )
+        assert req.read_frag.elements == 3 and not conn.pending
+        conn.close()
+        loop.run_until_complete( asyncio.sleep( .1, loop=loop ))
+        assert conn.error is not None
+        failed			= conn.list_identity()
+        assert failed.done() and failed.exception()
+    finally:
+        kwargs['server']['control'].done = True
+        server.join( 5.0 )
+        loop.close()
+
+
+def test_client_aio_values():
+    """The connector_aio read, write and multiple Futures yield the value(s) of their replies."""
+    try:
+        import asyncio
+    except ImportError:
+        return # Python 3.4+ only
+
+    svraddr		        = ('localhost', 12396)
+    kwargs			= {
+        'argv': [
+            '--address',	'%s:%d' % svraddr,
+            'SCADA=INT[10]',
+        ],
+        'server': {
+            'control':	apidict( enip.timeout, {
+                'done': False
+            }),
+        },
+    }
+    server			= threading.Thread( target=enip.main, kwargs=kwargs )
+    server.daemon		= True
+    server.start()
+    loop			= asyncio.new_event_loop()
+    try:
+        time.sleep( .5 ) # Wait for server to be established
+        conn			= loop.run_until_complete(
+            client.connector_aio.connect( *svraddr, timeout=5, loop=loop ))
+        assert loop.run_until_complete( conn.write( "SCADA[1-3]", data=[ 1, 2, 3 ] )) is True
+        assert loop.run_until_complete( conn.read( "SCADA[0-3]" )) == [ 0, 1, 2, 3 ]
+        assert loop.run_until_complete( conn.multiple( [
+            conn.write( "SCADA[0]", data=[ 99 ], send=False ),
+            conn.read( "SCADA[0-3]", send=False ) ] )) == [ True, [ 99, 1, 2, 3 ] ]
+        assert loop.run_until_complete( conn.read( "NONEXISTENT" )) is None
+        # Many in-flight requests are each matched to their own reply
+        values			= loop.run_until_complete( asyncio.gather(
+            *[ conn.read( "SCADA[%d]" % i ) for i in range( 4 ) ], loop=loop ))
+        assert values == [ [ 99 ], [ 1 ], [ 2 ], [ 3 ] ]
+        assert not conn.pending
+        conn.close()
+    finally:
+        kwargs['server']['control'].done = True
+        server.join( 5.0 )
+        loop.close()
@@ -33,7 +33,8 @@ __all__				= ['dialect', 'lookup_reset', 'lookup', 'resolve', 'resolve_element',
                                    'redirect_tag', 'resolve_tag', 
                                    'parse_int', 'parse_path', 'parse_path_elements', 'parse_path_component',
                                    'Object', 'Attribute',
-                                   'UCMM', 'Connection_Manager', 'Message_Router', 'Identity', 'TCPIP']
+                                   'UCMM', 'Connection_Manager', 'Message_Router', 'Identity', 'TCPIP',
+                                   'Assembly']
 
 import contextlib
 import json
@@ -51,6 +52,8 @@ from ... import automata, misc
 from .parser import ( UDINT, DWORD, INT, UINT, WORD, USINT,
                       EPATH, EPATH_padded, SSTRING, STRING, IFACEADDRS,
                       CIP, typed_data,
+                      forward_open, forward_open_reply, forward_close, forward_close_reply,
+                      connection_failure,
                       octets, octets_encode, octets_noop, octets_drop, move_if,
                       struct, enip_format, status )
 
@@ -394,10 +397,28 @@ class Attribute( object ):
     Therefore, for scalar types, it is important to ensure that the original default=... value supplied is
     of the correct type; eg. 'float' for REAL, 'int', for SINT/INT/DINT types, etc.
 
+    The class-level Attribute.generation changes whenever any Attribute value is set, so anything
+    derived from Attribute values (eg. an encoded List Identity reply) may be cached 'til it changes.
+    Each Attribute's .changed records the generation of its own most recent change, so anything
+    derived from only a few specific Attributes may be cached 'til one of them changes.  Thus, a
+    generation may serve as a cursor, eg. to find the Attributes changed since it was obtained;
+    Attribute.await_change may be used to await any subsequent change.  Only changes made by this
+    process are observed (eg. not those made to shared Tag values by other enip_server --workers).
+
+    Every change to an Attribute value is made while holding the (re-entrant) class-level
+    Attribute.lock; hold it to make several changes (and/or reads) without any other change
+    interleaving (eg. by an EtherNet/IP CIP write, or another Thread's batch).
+
     """
     MASK_GA_SNG			= 1 << 0
     MASK_GA_ALL			= 1 << 1
 
+    generation			= 0
+    changed			= 0
+    changes			= threading.Condition()	# Notified of each change, while any are waiting
+    lock			= threading.RLock()	# Held while changing any Attribute value
+    waiting			= 0
+
     def __init__( self, name, type_cls, default=0, error=0x00, mask=0 ):
         self.name		= name
         self.default	       	= default
@@ -412,7 +433,33 @@ class Attribute( object ):
     @value.setter
     def value( self, v ):
         assert self.scalar, "Scalar assignment to %s not supported" % type( self.default )
-        self.default		= type(self.default)( v )
+        with Attribute.lock:
+            self.default	= type(self.default)( v )
+            self._changed()
+
+    def _changed( self ):
+        with Attribute.changes:
+            Attribute.generation += 1
+            self.changed	= Attribute.generation
+            if Attribute.waiting:
+                Attribute.changes.notify_all()
+
+    @staticmethod
+    def await_change( since, timeout=None ):
+        """Wait 'til any Attribute has changed after generation 'since' (or the timeout expires), and
+        return the current generation."""
+        begun			= misc.timer()
+        with Attribute.changes:
+            Attribute.waiting += 1
+            try:
+                while Attribute.generation <= since:
+                    remains	= None if timeout is None else timeout - ( misc.timer() - begun )
+                    if remains is not None and remains <= 0:
+                        break
+                    Attribute.changes.wait( remains )
+            finally:
+                Attribute.waiting -= 1
+            return Attribute.generation
 
     def __str__( self ):
         return "%-24s %10s[%4d] == %r" % (
@@ -458,18 +505,23 @@ class Attribute( object ):
             log.info( "Setting %s %s %s[%r] to %r", "scalar" if self.scalar else "vector", type( self.value ),
                       ( repr if log.isEnabledFor( logging.DEBUG ) else misc.reprlib.repr )( self.value ),
                       key, value )
-        if self._validate_key( key ) is slice:
-            # Setting a slice of elements; always supplied an iterable; must confirm size
-            if self.scalar:
-                self.value	= next( iter( value ))
-            else:
-                self.value[key]	= value
-            return
-        # Setting a single indexed element; always supplied a scalar
-        if self.scalar:
-            self.value		= value
-        else:
-            self.value[key] 	= value
+        with Attribute.lock:
+            try:
+                # (A scalar's default is assigned directly; the value setter would also _changed)
+                if self._validate_key( key ) is slice:
+                    # Setting a slice of elements; always supplied an iterable; must confirm size
+                    if self.scalar:
+                        self.default = type(self.default)( next( iter( value )))
+                    else:
+                        self.value[key] = value
+                    return
+                # Setting a single indexed element; always supplied a scalar
+                if self.scalar:
+                    self.default = type(self.default)( value )
+                else:
+                    self.value[key] = value
+            finally:
+                self._changed()	# After the change; anything derived before is now stale
 
     def produce( self, start=0, stop=None ):
         """Output the binary rendering of the current value, using enip type_cls instance configured,
@@ -1110,6 +1162,113 @@ class TCPIP( Object ):
                 default=self.config_str(     'Host Name',			'' ))
 
 
+class Assembly_Data( Attribute ):
+    """The Data (Attribute 3) of an Assembly instance composed of several member Attributes (eg. tags),
+    presented as a USINT array containing the concatenation of each member's binary rendering.
+    Assigning (a slice of) the USINT data updates the value of each member whose data has changed,
+    parsed according to the member's own type.  Only members with fixed-size (struct-based) data
+    types may be assembled.
+
+    """
+    def __init__( self, name, members, **kwds ):
+        self.members		= list( members )
+        assert all( hasattr( m.parser, 'struct_format' ) for m in self.members ), \
+            "Assembly members must have fixed-size data types: %r" % ( self.members )
+        super( Assembly_Data, self ).__init__( name=name, type_cls=USINT, default=[], **kwds )
+
+    @property
+    def value( self ):
+        return list( bytearray( b''.join( m.produce() for m in self.members )))
+
+    def __setitem__( self, key, value ):
+        if log.isEnabledFor( logging.INFO ):
+            log.info( "Setting %s[%r] to %r", self.name, key, value )
+        old			= self.value
+        new			= list( old )
+        if self._validate_key( key ) is slice:
+            new[key]		= list( value )
+        else:
+            new[key]		= value
+        assert len( new ) == len( old ), \
+            "Assignment to %s[%r] may not change its length" % ( self.name, key )
+        old,new			= bytearray( old ),bytearray( new )
+        beg			= 0
+        for m in self.members:
+            siz			= m.parser.struct_calcsize
+            fmt			= m.parser.struct_format
+            end			= beg + siz * len( m )
+            if new[beg:end] != old[beg:end]:
+                m[:]		= [ struct.unpack( fmt, bytes( new[i:i+siz] ))[0]
+                                    for i in range( beg, end, siz ) ]
+            beg			= end
+
+
+class Assembly_Size( Attribute ):
+    """The Size (Attribute 4) of an Assembly instance's Data, in bytes; 0 until Attribute 3 exists."""
+    def __init__( self, name, type_cls, assembly=None, **kwds ):
+        assert assembly is not None
+        self.assembly		= assembly
+        super( Assembly_Size, self ).__init__( name=name, type_cls=type_cls, **kwds )
+
+    @property
+    def value( self ):
+        data			= self.assembly.attribute.get( '3' )
+        return len( data.produce() ) if data is not None else 0
+
+    def __setitem__( self, key, value ):
+        raise AssertionError("Cannot set value")
+
+
+class Assembly( Object ):
+    """The Assembly Object (Class 0x04) binds the data of one or more application Attributes into a
+    single block, which may be produced/consumed by implicit (Class 0/1) I/O connections established
+    by a Forward Open to one of its instances (the "Connection Point"), or accessed via Get/Set
+    Attribute Single on its Data.  See Volume 1: Common Industrial Protocol, Chapter 5-5.
+
+    | Attribute | Type    | Name | Description                                 |
+    |-----------+---------+------+---------------------------------------------|
+    |         3 | USINT[] | Data | The data produced and/or consumed           |
+    |         4 | UINT    | Size | Number of bytes in Attribute 3 (read only)  |
+
+    Supply a list of 'members' (eg. the Attributes of several tags) to assemble the Data from them.
+    Otherwise, any fixed-size Attribute may later be placed at Attribute 3, eg. a tag defined with
+    an address such as 'Output=SINT[8]@4/150/3' (see logix.setup).
+
+    """
+    class_id			= 0x04
+
+    def __init__( self, name=None, members=None, **kwds ):
+        super( Assembly, self ).__init__( name=name, **kwds )
+
+        if self.instance_id == 0:
+            # Extra Class-level Attributes
+            pass
+        else:
+            if members is not None:
+                self.attribute['3']= Assembly_Data( 'Data', members )
+            self.attribute['4']	= Assembly_Size( 'Size',		UINT,
+                                                 assembly=self )
+
+    def produce_data( self ):
+        """Return the current binary rendering of the Assembly's Data."""
+        return self.attribute['3'].produce()
+
+    def consume_data( self, buf ):
+        """Parse the supplied bytes (eg. the payload of a consumed O->T I/O packet) according to the type
+        of the Assembly's Data Attribute, and assign it.  Must supply exactly the number of bytes
+        required to fully populate the Attribute.
+
+        """
+        att			= self.attribute['3']
+        siz			= att.parser.struct_calcsize
+        fmt			= att.parser.struct_format
+        assert len( buf ) == siz * len( att ), \
+            "Expected %d bytes to satisfy %d x %d-byte %s values" % (
+                siz * len( att ), len( att ), siz, att.parser.__class__.__name__ )
+        att[:]			= [ struct.unpack( fmt, bytes( buf[i:i+siz] ))[0]
+                                    for i in range( 0, len( buf ), siz ) ]
+
+
 class UCMM( Object ):
     """Un-Connected Message Manager, handling Register/Unregister of connections, and sending
     Unconnected Send messages to either directly to a local object, or to the local Connection
@@ -1278,6 +1437,9 @@ class UCMM( Object ):
                     ids		= resolve( unc_send.path )
                     if ( ids[0] != 0x06 or ids[1] != 1 ):
                         log.warning( "Unconnected Send targeted Object other than Connection Manager: 0x%04x/%d", ids[0], ids[1] )
+                # Supply the client address, so any connection established (eg. by a Forward Open)
+                # knows its originator.
+                unc_send.addr	= data.addr
                 CM		= lookup( class_id=ids[0], instance_id=ids[1] )
                 CM.request( unc_send )
                 
@@ -1335,14 +1497,63 @@ class UCMM( Object ):
             log.info( "%s Response: %s", self, enip_format( data ))
         return proceed
 
+    # The List Interfaces, List Services, List Identity and Legacy 0x0001 replies depend only on a
+    # few Identity and TCPIP Object Attributes (if any), so they are precomputed: each is encoded
+    # once, and reused 'til one of its Attributes is changed (or replaced).  Each entry (keyed by
+    # UCMM class and CIP command) contains the key of the Attributes it was computed from, the
+    # CPF, and its encoding.  The CPF is shared by each reply it is used in, and must not be altered.
+    precomputed			= {}
+
+    @staticmethod
+    def precomputed_key( fields ):
+        """Return the Attributes at the 'fields' ids (None, where no ids or no such Attribute), and a
+        key identifying each one and its most recent change; any reply computed from these
+        Attributes remains valid while the key remains the same."""
+        atts			= [ lookup( *ids ) if ids else None for nam,dfl,ids,get in fields ]
+        return atts,tuple( ( id( att ), att.changed ) if att else None for att in atts )
+
+    def _precomputed( self, data, command, fields, compute ):
+        """Supply the data.enip.CIP.<command>.CPF and its encoded data.enip.input, computing them if
+        they've not yet been precomputed from the current values of the Attributes at the 'fields'
+        ids.  Each field is a ( name, default, ids, get ) tuple; compute( cpf, values ) is supplied a
+        dotdict of name: value, where each value is get( parsed ) of the Attribute at ids, or the
+        default (if no Attribute exists at ids, or no ids supplied).
+
+        """
+        atts,key		= self.precomputed_key( fields )
+        cached			= self.precomputed.get( ( self.__class__, command ))
+        if cached and cached[0] == key:
+            data.enip.CIP[command].CPF = cached[1]
+            data.enip.input	= bytearray( cached[2] )
+            return True
+
+        values			= dotdict()
+        for (nam,dfl,ids,get),att in zip( fields, atts ):
+            val			= dfl
+            if att:
+                raw		= att.produce( 0, 1 )
+                val		= dotdict()
+                with att.parser as mch:
+                    with contextlib.closing( mch.run( source=raw, data=val )) as eng:
+                        for m,s in eng:
+                            pass
+                        log.info( "Parsed using %r; %r from %r", mch, val, raw )
+                if get:
+                    val		= get( val )
+            values[nam]		= val
+        cpf			= data.enip.CIP[command].CPF
+        compute( cpf, values )
+        payload			= bytes( self.parser.produce( data.enip ))
+        self.precomputed[( self.__class__, command )] = ( key, cpf, payload )
+        data.enip.input		= bytearray( payload )
+        return True
+
     def list_interfaces( self, data ):
         """List Interfaces returns zero encapsulated CPF items."""
-        cpf			= data.enip.CIP.list_interfaces.CPF
-        cpf.count		= 0 # sufficient to produce a CPF encapsulation with zero entries
-
-        data.enip.input		= bytearray( self.parser.produce( data.enip ))
+        def compute( cpf, values ):
+            cpf.count		= 0 # sufficient to produce a CPF encapsulation with zero entries
 
-        return True
+        return self._precomputed( data, 'list_interfaces', [], compute )
 
     LISTSVCS_CIP_ENCAP		= 1 << 5
     LISTSVCS_CIP_UDP		= 1 << 8 # Transport Class 0 or 1 packets (no encapsulation header)
@@ -1351,19 +1562,32 @@ class UCMM( Object ):
         not support unencapsulated UDP data.
 
         """
-        cpf			= data.enip.CIP.list_services.CPF
-        cpf.item		= [ dotdict() ]
-        cpf.item[0].type_id	= 0x0100
-        cpf.item[0].communications_service \
+        def compute( cpf, values ):
+            cpf.item		= [ dotdict() ]
+            cpf.item[0].type_id	= 0x0100
+            cpf.item[0].communications_service \
 			= c_s	= dotdict()
-        c_s.version		= 1
-        c_s.capability		= self.LISTSVCS_CIP_ENCAP
-        c_s.service_name	= 'Communications'
-
-        data.enip.input		= bytearray( self.parser.produce( data.enip ))
-
-        return True
-
+            c_s.version		= 1
+            c_s.capability	= self.LISTSVCS_CIP_ENCAP
+            c_s.service_name	= 'Communications'
+
+        return self._precomputed( data, 'list_services', [], compute )
+
+    LISTIDENT_SOCKADDR		= [
+        ( 'sin_addr',		'127.0.0.1',	( TCPIP.class_id, 1, 5 ),	lambda d: d.IFACEADDRS.ip_address ),
+        ( 'sin_family',		2,		None,				None ),
+        ( 'sin_port',		44818, 		None,				None ),
+    ]
+    LISTIDENT_IDENTITY		= [
+        ( 'vendor_id',		0,		( Identity.class_id, 1, 1 ),	lambda d: d.INT ),
+        ( 'device_type',	0,		( Identity.class_id, 1, 2 ),	lambda d: d.INT ),
+        ( 'product_code',	0,		( Identity.class_id, 1, 3 ),	lambda d: d.INT ),
+        ( 'product_revision',	0,		( Identity.class_id, 1, 4 ),	lambda d: d.INT ),
+        ( 'status_word',	0,		( Identity.class_id, 1, 5 ),	lambda d: d.WORD ),
+        ( 'serial_number',	0,		( Identity.class_id, 1, 6 ),	lambda d: d.UDINT ),
+        ( 'product_name',	0,		( Identity.class_id, 1, 7 ),	lambda d: d.SSTRING ),
+        ( 'state',		0xff,		( Identity.class_id, 1, 8 ),	lambda d: d.USINT ),
+    ]
     def list_identity( self, data ):
         """The List Identity response consists of the IP address we're bound to from the TCP/IP Object,
         plus some Attribute data from the Identity object.  Look up these Objects at their
@@ -1372,47 +1596,21 @@ class UCMM( Object ):
 
         We'll get each Attribute to produce its serialized representation, and then parse itself, in
         order to satisfy any default values, and produce any complex structs (eg. IPADDR,
-        IFACEADDRS).  From this, we can extract the values we wish to return.
+        IFACEADDRS).  From this, we can extract the values we wish to return.  This is only done
+        when one of these Attributes has changed; otherwise, the precomputed response is used.
 
         """
-        cpf			= data.enip.CIP.list_identity.CPF
-        cpf.item		= [ dotdict() ]
-        cpf.item[0].type_id	= 0x000C
-        cpf.item[0].identity_object \
+        def compute( cpf, values ):
+            cpf.item		= [ dotdict() ]
+            cpf.item[0].type_id	= 0x000C
+            cpf.item[0].identity_object \
 			= ido	= dotdict()
-        ido.version		= 1
-
-        for nam,dfl,ids,get in [
-                ( 'sin_addr',		'127.0.0.1',	( TCPIP.class_id, 1, 5 ),	lambda d: d.IFACEADDRS.ip_address ),
-                ( 'sin_family',		2,		None,				None ),
-                ( 'sin_port',		44818, 		None,				None),
-                ( 'vendor_id',		0,		( Identity.class_id, 1, 1 ),	lambda d: d.INT ),
-                ( 'device_type',	0,		( Identity.class_id, 1, 2 ),	lambda d: d.INT ),
-                ( 'product_code',	0,		( Identity.class_id, 1, 3 ),	lambda d: d.INT ),
-                ( 'product_revision',	0,		( Identity.class_id, 1, 4 ),	lambda d: d.INT ),
-                ( 'status_word',	0,		( Identity.class_id, 1, 5 ),	lambda d: d.WORD ),
-                ( 'serial_number',	0,		( Identity.class_id, 1, 6 ),	lambda d: d.UDINT ),
-                ( 'product_name',	0,		( Identity.class_id, 1, 7 ),	lambda d: d.SSTRING ),
-                ( 'state',		0xff,		( Identity.class_id, 1, 8 ),	lambda d: d.USINT ),
-        ]:
-            val			= dfl
-            if ids:
-                att		= lookup( *ids )
-                if att:
-                    raw		= att.produce( 0, 1 )
-                    val		= dotdict()
-                    with att.parser as mch:
-                        with contextlib.closing( mch.run( source=raw, data=val )) as eng:
-                            for m,s in eng:
-                                pass
-                            log.info( "Parsed using %r; %r from %r", mch, val, raw )
-                    if get:
-                        val	= get( val )
-            ido[nam]		= val
-
-        data.enip.input		= bytearray( self.parser.produce( data.enip ))
+            ido.version		= 1
+            for nam,_,_,_ in self.LISTIDENT_SOCKADDR + self.LISTIDENT_IDENTITY:
+                ido[nam]	= values[nam]
 
-        return True
+        return self._precomputed( data, 'list_identity',
+                                  self.LISTIDENT_SOCKADDR + self.LISTIDENT_IDENTITY, compute )
 
     def legacy( self, data ):
         """A subset of undocumented EtherNet/IP CIP "Legacy" commands are supported."""
@@ -1423,35 +1621,15 @@ class UCMM( Object ):
             raise AssertionError( "Unimplemented EtherNet/IP CIP Legacy command: %r" % ( data ))
 
     def _legacy_0x0001( self, data ):
-        cpf			= data.enip.CIP.legacy.CPF
-        cpf.item		= [ dotdict() ]
-        cpf.item[0].type_id	= 0x0001
-        cpf.item[0].legacy_CPF_0x0001 \
+        def compute( cpf, values ):
+            cpf.item		= [ dotdict() ]
+            cpf.item[0].type_id	= 0x0001
+            cpf.item[0].legacy_CPF_0x0001 \
                         = leg   = dotdict()
+            for nam,_,_,_ in self.LISTIDENT_SOCKADDR:
+                leg[nam]	= values[nam]
 
-        for nam,dfl,ids,get in [
-                ( 'sin_addr',		'127.0.0.1',	( TCPIP.class_id, 1, 5 ),	lambda d: d.IFACEADDRS.ip_address ),
-                ( 'sin_family',		2,		None,				None ),
-                ( 'sin_port',		44818, 		None,				None),
-        ]:
-            val			= dfl
-            if ids:
-                att		= lookup( *ids )
-                if att:
-                    raw		= att.produce( 0, 1 )
-                    val		= dotdict()
-                    with att.parser as mch:
-                        with contextlib.closing( mch.run( source=raw, data=val )) as eng:
-                            for m,s in eng:
-                                pass
-                            log.info( "Parsed using %r; %r from %r", mch, val, raw )
-                    if get:
-                        val	= get( val )
-            leg[nam]		= val
-
-        data.enip.input		= bytearray( self.parser.produce( data.enip ))
-
-        return True
+        return self._precomputed( data, 'legacy', self.LISTIDENT_SOCKADDR, compute )
 
 
 class Message_Router( Object ):
@@ -1876,19 +2054,50 @@ class Connection_Manager( Object ):
     We assume that the Message Router will convert the .request to a Response and fill it its .input
     with the encoded response.
 
+    Forward Open (0x54) and Forward Close (0x4E) requests (eg. routed here by the Message Router)
+    establish and close implicit (Class 0/1) I/O connections to Assembly Object Connection Points.
+    Each established connection is recorded in the class-level .connections dict (indexed by its
+    O->T connection ID); the data is produced/consumed by an I/O server (see implicit.io_srv),
+    usually over UDP port 2222.
+
     """
     class_id			= 0x06
 
     UC_SND_REQ			= 0x52 		# Unconnected Send
-    FW_OPN_REQ			= 0x54		# Forward Open (unimplemented)
-    FW_CLS_REQ			= 0x4E		# Forward Close (unimplemented)
+    FW_OPN_NAM			= "Forward Open"
+    FW_OPN_CTX			= "forward_open"
+    FW_OPN_REQ			= 0x54
+    FW_OPN_RPY			= FW_OPN_REQ | 0x80
+    FW_CLS_NAM			= "Forward Close"
+    FW_CLS_CTX			= "forward_close"
+    FW_CLS_REQ			= 0x4E
+    FW_CLS_RPY			= FW_CLS_REQ | 0x80
+
+    # Each connection's size (from its Network Connection Parameters) includes the Class 1 sequence
+    # count, and any "Real time format" header; by convention, O->T data carries a 32-bit Run/Idle
+    # header, while T->O data is "modeless".  Connections inactive for longer than 10 seconds (or
+    # their timeout, if longer) after being established, or their timeout after the first O->T
+    # packet, are closed.
+    O_T_HEADER			= 4
+    T_O_HEADER			= 0
+    TIMEOUT_INITIAL		= 10.0
+
+    lock			= threading.Lock()
+    connections			= {}		# All established I/O connections, by O->T connection ID
 
     def request( self, data ):
         """
         Handles an unparsed request.input, parses it and processes the request with the Message Router.
-        
+        Any Forward Open/Close requests routed here are processed directly.
 
         """
+        if ( data.get( 'service' ) == self.FW_OPN_REQ
+             or self.FW_OPN_CTX in data and data.setdefault( 'service', self.FW_OPN_REQ ) == self.FW_OPN_REQ ):
+            return self.forward_open( data )
+        if ( data.get( 'service' ) == self.FW_CLS_REQ
+             or self.FW_CLS_CTX in data and data.setdefault( 'service', self.FW_CLS_REQ ) == self.FW_CLS_REQ ):
+            return self.forward_close( data )
+
         # We don't check for Unconnected Send 0x52, because replies (and some requests) don't
         # include the full wrapper, just the raw command.  This is quite confusing; especially since
         # some of the commands have the same code (eg. Read Tag Fragmented, 0x52).  Of course, their
@@ -1914,6 +2123,8 @@ class Connection_Manager( Object ):
                     #            repr( data ) if log.getEffectiveLevel() < logging.DETAIL else misc.reprlib.repr( data ))
 
             #log.info( "%s Executing: %s", self, enip_format( data.request ))
+            if 'addr' in data:
+                data.request.addr = data.addr
             MR.request( data.request )
         except:
             # Parsing failure.  We're done.  Suck out some remaining input to give us some context.
@@ -1930,3 +2141,205 @@ class Connection_Manager( Object ):
             log.info( "%s Response: %s", self, enip_format( data ))
         return True
 
+
+    def forward_open( self, data ):
+        """Establish an implicit I/O connection between the originator and the Assembly Connection Points
+        in the .forward_open.connection_path, eg. @4/<config>/<O_T point>/<T_O point>; if only one
+        Connection Point is supplied, it is used for both directions.  A direction whose connection
+        size provides no room for data (eg. a Null connection or an O->T "heartbeat") requires no
+        Assembly.  The target chooses the O->T connection ID; the originator's T->O connection ID is
+        used (both are point-to-point).  Only cyclic Class 0/1 connections are supported.
+
+        Produces a successful reply containing the connection IDs and actual packet intervals, or a
+        status 0x01 (Connection failure) reply w/ an extended status indicating the reason.
+
+        """
+        data.service	       |= 0x80
+        fo			= data.forward_open
+        try:
+            data.status		= 0x01			# Connection failure
+            ext			= 0x0103		# Transport class/trigger unsupported
+            transport		= fo.transport_class_triggers & 0x0F
+            assert transport in (0, 1) and ( fo.transport_class_triggers >> 4 ) & 0x07 == 0, \
+                "Transport class/trigger 0x%02x unsupported" % ( fo.transport_class_triggers )
+
+            ext			= 0x0100		# Connection in use or duplicate Forward Open
+            key			= ( fo.connection_serial, fo.O_vendor, fo.O_serial )
+            with self.lock:
+                assert not any( c.key == key for c in self.connections.values() ), \
+                    "Duplicate Forward Open for connection %r" % ( key, )
+
+            ext			= 0x0315		# Invalid segment in connection path
+            segment		= fo.connection_path.segment
+            cls			= next( ( s['class'] for s in segment if 'class' in s ), None )
+            points		= [ s['connection'] if 'connection' in s else s['instance']
+                                    for s in segment if 'connection' in s or 'instance' in s ]
+            assert cls == Assembly.class_id and 1 <= len( points ) <= 3, \
+                "Connection path must address Assembly Connection Points: %r" % ( segment )
+            if len( points ) == 1:
+                points		= points * 2
+            o_t_point,t_o_point	= points[-2:]
+
+            ext			= 0x0111		# Requested RPI not supported
+            assert fo.O_T.RPI and fo.T_O.RPI, "Requested Packet Intervals must be non-zero"
+
+            connection		= dotdict()
+            connection.key	= key
+            connection.transport= transport
+            connection.peer	= data.get( 'addr' )
+            for direction,point,header,ext_size in (
+                    ( 'O_T', o_t_point, self.O_T_HEADER, 0x0127 ),	# Invalid O->T size
+                    ( 'T_O', t_o_point, self.T_O_HEADER, 0x0128 )):	# Invalid T->O size
+                size		= fo[direction].NCP & 0x01FF
+                size	       -= header + ( 2 if transport == 1 else 0 )
+                assembly	= None
+                if size > 0:
+                    ext		= 0x0315
+                    assembly	= lookup( Assembly.class_id, point )
+                    assert isinstance( assembly, Assembly ) and '3' in assembly.attribute, \
+                        "Connection Point %d is not an Assembly with Data" % ( point )
+                    ext		= ext_size
+                    assert len( assembly.produce_data() ) == size, \
+                        "%s Connection Point %d size %d; %d expected" % (
+                            direction, point, len( assembly.produce_data() ), size )
+                connection[direction] = dotdict()
+                connection[direction].point	= point
+                connection[direction].RPI	= fo[direction].RPI / 1000000.0
+                connection[direction].size	= max( 0, size )
+                connection[direction].assembly	= assembly
+                connection[direction].sequence	= None		# Last 32-bit sequence number
+                connection[direction].count	= None		# Last Class 1 sequence count
+            connection.timeout	= connection.O_T.RPI * ( 4 << fo.connection_timeout_multiplier )
+
+            ext			= 0x0113		# Out of connections
+            with self.lock:
+                o_t_id		= random.randint( 1, 2**32-1 )
+                while o_t_id in self.connections:
+                    o_t_id	= random.randint( 1, 2**32-1 )
+                connection.O_T.connection_ID = o_t_id
+                connection.T_O.connection_ID = fo.T_O.connection_ID or random.randint( 1, 2**32-1 )
+                self.connections[o_t_id] = connection
+            log.normal( "%s Forward Open %r (Client %r): O->T 0x%08x @%7.3fs, T->O 0x%08x @%7.3fs, timeout %7.3fs",
+                        self, key, connection.peer,
+                        connection.O_T.connection_ID, connection.O_T.RPI,
+                        connection.T_O.connection_ID, connection.T_O.RPI, connection.timeout )
+
+            fo.O_T.connection_ID= connection.O_T.connection_ID
+            fo.T_O.connection_ID= connection.T_O.connection_ID
+            fo.O_T.API		= fo.O_T.RPI
+            fo.T_O.API		= fo.T_O.RPI
+            data.status		= 0x00
+            data.pop( 'status_ext', None )
+        except Exception as exc:
+            data.status_ext	= {'size': 1, 'data': [ext]}
+            log.normal( "%r Service 0x%02x %s failed with Exception: %s\nRequest: %s", self,
+                        data.service, self.FW_OPN_NAM, exc, enip_format( data ))
+        data.input		= bytearray( self.produce( data ))
+        return True
+
+    def forward_close( self, data ):
+        """Close the implicit I/O connection identified by the .forward_close connection serial number,
+        originator vendor ID and serial number.
+
+        """
+        data.service	       |= 0x80
+        fc			= data.forward_close
+        try:
+            data.status		= 0x01			# Connection failure
+            ext			= 0x0107		# Target connection not found
+            key			= ( fc.connection_serial, fc.O_vendor, fc.O_serial )
+            with self.lock:
+                o_t_id		= next( i for i,c in self.connections.items() if c.key == key )
+                connection	= self.connections.pop( o_t_id )
+            log.normal( "%s Forward Close %r (Client %r): O->T 0x%08x",
+                        self, key, data.get( 'addr' ), o_t_id )
+            data.status		= 0x00
+            data.pop( 'status_ext', None )
+        except Exception as exc:
+            data.status_ext	= {'size': 1, 'data': [ext]}
+            log.normal( "%r Service 0x%02x %s failed with Exception: %s\nRequest: %s", self,
+                        data.service, self.FW_CLS_NAM, exc, enip_format( data ))
+        data.input		= bytearray( self.produce( data ))
+        return True
+
+    @classmethod
+    def produce( cls, data ):
+        result			= b''
+        if ( data.get( 'service' ) == cls.FW_OPN_REQ
+             or cls.FW_OPN_CTX in data and data.setdefault( 'service', cls.FW_OPN_REQ ) == cls.FW_OPN_REQ ):
+            # Forward Open
+            result	       += USINT.produce(	data.service )
+            result	       += EPATH.produce(	data.path )
+            result	       += forward_open.produce( data.forward_open )
+        elif ( data.get( 'service' ) == cls.FW_CLS_REQ
+               or cls.FW_CLS_CTX in data and data.setdefault( 'service', cls.FW_CLS_REQ ) == cls.FW_CLS_REQ ):
+            # Forward Close
+            result	       += USINT.produce(	data.service )
+            result	       += EPATH.produce(	data.path )
+            result	       += forward_close.produce( data.forward_close )
+        elif data.get( 'service' ) in ( cls.FW_OPN_RPY, cls.FW_CLS_RPY ):
+            # Forward Open/Close Reply.  On failure, only the connection triplet is returned.
+            ctx,rpy		= ( ( cls.FW_OPN_CTX, forward_open_reply )
+                                    if data.service == cls.FW_OPN_RPY
+                                    else ( cls.FW_CLS_CTX, forward_close_reply ))
+            result	       += USINT.produce(	data.service )
+            result	       += b'\x00' # reserved
+            result	       += status.produce(	data )
+            if data.status == 0x00:
+                result	       += rpy.produce(		data[ctx] )
+            else:
+                result	       += connection_failure.produce( data[ctx] )
+        else:
+            result		= super( Connection_Manager, cls ).produce( data )
+        return result
+
+
+def __forward_open():
+    srvc			= USINT(		 	context='service' )
+    srvc[True]		= path	= EPATH(			context='path' )
+    path[True]			= forward_open(			terminal=True )
+    return srvc
+
+Connection_Manager.register_service_parser( number=Connection_Manager.FW_OPN_REQ,
+                                            name=Connection_Manager.FW_OPN_NAM,
+                                            short=Connection_Manager.FW_OPN_CTX, machine=__forward_open() )
+
+def __forward_open_reply():
+    srvc			= USINT(		 	context='service' )
+    srvc[True]	 	= rsvd	= octets_drop(	'reserved',	repeat=1 )
+    rsvd[True]		= stts	= status()
+    stts[None]			= automata.decide( 'ok',
+        predicate=lambda path=None, data=None, **kwds: data[path+'.status' if path else 'status'] == 0x00,
+                                state=forward_open_reply( 	terminal=True ))
+    stts[None]			= connection_failure(		context=Connection_Manager.FW_OPN_CTX,
+                                                terminal=True )
+    return srvc
+
+Connection_Manager.register_service_parser( number=Connection_Manager.FW_OPN_RPY,
+                                            name=Connection_Manager.FW_OPN_NAM + " Reply",
+                                            short=Connection_Manager.FW_OPN_CTX, machine=__forward_open_reply() )
+
+def __forward_close():
+    srvc			= USINT(		 	context='service' )
+    srvc[True]		= path	= EPATH(			context='path' )
+    path[True]			= forward_close(		terminal=True )
+    return srvc
+
+Connection_Manager.register_service_parser( number=Connection_Manager.FW_CLS_REQ,
+                                            name=Connection_Manager.FW_CLS_NAM,
+                                            short=Connection_Manager.FW_CLS_CTX, machine=__forward_close() )
+
+def __forward_close_reply():
+    srvc			= USINT(		 	context='service' )
+    srvc[True]	 	= rsvd	= octets_drop(	'reserved',	repeat=1 )
+    rsvd[True]		= stts	= status()
+    stts[None]			= automata.decide( 'ok',
+        predicate=lambda path=None, data=None, **kwds: data[path+'.status' if path else 'status'] == 0x00,
+                                state=forward_close_reply( 	terminal=True ))
+    stts[None]			= connection_failure(		context=Connection_Manager.FW_CLS_CTX,
+                                                terminal=True )
+    return srvc
+
+Connection_Manager.register_service_parser( number=Connection_Manager.FW_CLS_RPY,
+                                            name=Connection_Manager.FW_CLS_NAM + " Reply",
+                                            short=Connection_Manager.FW_CLS_CTX, machine=__forward_close_reply() )
@@ -0,0 +1,270 @@
+#! /usr/bin/env python3
+
+#
+# Cpppo -- Communication Protocol Python Parser and Originator
+#
+# Copyright (c) 2013, Hard Consulting Corporation.
+#
+# Cpppo is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.  See the LICENSE file at the top of the source tree.
+#
+# Cpppo is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+__author__                      = "Perry Kundert"
+__email__                       = "perry@hardconsulting.com"
+__copyright__                   = "Copyright (c) 2013 Hard Consulting Corporation"
+__license__                     = "Dual License: GPLv3 (or later) and Commercial (see LICENSE)"
+
+
+"""
+enip.discover	-- Discover EtherNet/IP CIP devices by sweeping address ranges w/ List Identity
+
+    $ python -m cpppo.server.enip.discover 10.0.0.0/22 192.168.1.10-192.168.1.20
+
+    A List Identity request is sent via UDP/IP to every address in each range (unicast; and also
+to each range's broadcast address, if --broadcast), all from one socket, without awaiting any
+replies; replies are collected as they arrive, until 'timeout' after the last request is sent.
+Each reply is parsed independently (so an invalid reply from one peer is logged and ignored,
+without affecting the replies of any other), and each peer's identity is yielded once, as soon as
+it is received.  Addresses that haven't replied may be retried.
+
+"""
+
+__all__				= ['addresses', 'request', 'scan', 'main']
+
+import argparse
+import collections
+import errno
+import json
+import logging
+import select
+import socket
+import struct
+import sys
+
+import cpppo
+from .. import network, enip
+from . import client
+
+log				= logging.getLogger( "enip.dsc" )
+
+
+def addresses( target, broadcast=False ):
+    """Yield each IPv4 address (dotted-quad) designated by 'target':
+
+        10.0.0.0/22		-- the hosts of a network (excl. network/broadcast addresses, unless /31 or /32)
+        10.0.0.1-10.0.0.50	-- an (inclusive) address range
+        10.0.0.1-50		--   ... w/ only the last octet of the end address
+        plc.example.com		-- a host name (or a single address)
+
+    If 'broadcast', also yield the broadcast address of a network.
+
+    """
+    def aton( a ):
+        return struct.unpack( '!L', socket.inet_aton( a ))[0]
+    def ntoa( n ):
+        return socket.inet_ntoa( struct.pack( '!L', n ))
+
+    if '/' in target:
+        net,bits		= target.split( '/', 1 )
+        bits			= int( bits )
+        assert 0 <= bits <= 32, "Invalid network prefix length: %r" % ( target, )
+        mask			= ( 0xFFFFFFFF << ( 32 - bits )) & 0xFFFFFFFF
+        beg			= aton( socket.gethostbyname( net )) & mask
+        end			= beg | ( ~mask & 0xFFFFFFFF )
+        if bits < 31:
+            for n in range( beg + 1, end ):
+                yield ntoa( n )
+            if broadcast:
+                yield ntoa( end )
+        else:
+            for n in range( beg, end + 1 ):
+                yield ntoa( n )
+    elif '-' in target and target.split( '-', 1 )[0].count( '.' ) == 3:
+        first,last		= target.split( '-', 1 )
+        if '.' not in last:
+            last		= first.rsplit( '.', 1 )[0] + '.' + last
+        for n in range( aton( first ), aton( last ) + 1 ):
+            yield ntoa( n )
+    else:
+        yield socket.gethostbyname( target )
+
+
+def request( sender_context=b'' ):
+    """Encode a List Identity request (as for client.list_identity)."""
+    data			= cpppo.dotdict()
+    data.enip			= {}
+    data.enip.session_handle	= 0
+    data.enip.options		= 0
+    data.enip.status		= 0
+    data.enip.sender_context	= {}
+    data.enip.sender_context.input = client.format_context( sender_context )
+    data.enip.CIP		= {}
+    data.enip.CIP.list_identity	= {}
+    data.enip.input		= bytearray( enip.CIP.produce( data.enip ))
+    return bytes( bytearray( enip.enip_encode( data.enip )))
+
+
+def scan( targets, port=None, timeout=1.0, retries=0, broadcast=False, source_address=None,
+          burst=64 ):
+    """Send a List Identity request to each address of each target (see addresses), yielding each
+    peer's (<address>,<port>),<identity> as its reply arrives.  The <identity> is the parsed
+    List Identity reply's identity_object (eg. .product_name, .vendor_id, .serial_number, ...).
+
+    All requests are sent from a single UDP/IP socket (bound to source_address "<address>[:<port>]",
+    if supplied), in bursts of up to 'burst' requests, receiving any replies between bursts.  The
+    sweep completes 'timeout' seconds after the last request is sent; then, up to 'retries' more
+    sweeps are made of the addresses which haven't yet replied.  Each peer is yielded only once.
+
+    """
+    port			= enip.address[1] if port is None else port
+    hosts			= []
+    for target in ( [ targets ] if isinstance( targets, cpppo.type_str_base ) else targets ):
+        hosts.extend( addresses( target, broadcast=broadcast ))
+    log.normal( "Scanning %d addresses for EtherNet/IP CIP devices", len( hosts ))
+
+    conn			= socket.socket( socket.AF_INET, socket.SOCK_DGRAM )
+    try:
+        conn.setsockopt( socket.SOL_SOCKET, socket.SO_BROADCAST, 1 )
+        if source_address:
+            ifce		= source_address.split( ':', 1 )
+            conn.bind( ( str( ifce[0] ), int( ifce[1] if len( ifce ) > 1 else 0 )) )
+        conn.setblocking( False )
+        receiver		= network.receiver( conn )
+        frame			= enip.enip_machine( terminal=True )
+        cip			= enip.CIP( terminal=True )
+        sent			= request()
+        found			= {}		# { (<address>,<port>): <identity>, ... }
+
+        def parse( msg, peer ):
+            """Parse one datagram containing a List Identity reply; returns its identity_objects."""
+            data		= cpppo.dotdict( peer=peer )
+            with frame as machine:
+                for m,s in machine.run( source=cpppo.peekable( msg ), data=data ):
+                    pass
+                assert machine.terminal, "Incomplete EtherNet/IP frame"
+            with cip as machine:
+                for m,s in machine.run( path='enip', source=cpppo.peekable( data.enip.input ), data=data ):
+                    pass
+                assert machine.terminal, "No CIP payload in the EtherNet/IP frame"
+            return [ item.identity_object for item in data.enip.CIP.list_identity.CPF.item
+                     if 'identity_object' in item ]
+
+        def harvest():
+            """Receive and parse every reply immediately available, yielding those of new peers."""
+            while True:
+                msg,peer	= receiver.recvfrom( timeout=0 )
+                if msg is None or peer is None:
+                    return
+                if not len( msg ):
+                    continue	# An empty datagram; not EOF, as on a stream
+                try:
+                    identities	= parse( msg.tobytes(), peer )
+                except Exception as exc:
+                    log.warning( "Ignoring invalid List Identity reply from %s:%s: %s", peer[0], peer[1], exc )
+                    continue
+                for identity in identities:
+                    if peer not in found:
+                        found[peer] = identity
+                        yield peer,identity
+
+        for sweep in range( 1 + retries ):
+            replied		= set( addr for addr,_ in found )
+            pending		= collections.deque( h for h in hosts if h not in replied )
+            if not pending:
+                break
+            if sweep:
+                log.normal( "Retrying %d addresses", len( pending ))
+            deadline		= None
+            while pending or cpppo.timer() < deadline:
+                wait		= None if pending else max( 0, deadline - cpppo.timer() )
+                r,w,_		= select.select( [ conn ], [ conn ] if pending else [], [], wait )
+                if r:
+                    for res in harvest():
+                        yield res
+                if w:
+                    for _ in range( burst ):
+                        if not pending:
+                            break
+                        try:
+                            conn.sendto( sent, ( pending[0], port ))
+                        except socket.error as exc:
+                            if exc.errno in ( errno.EAGAIN, errno.EWOULDBLOCK, errno.ENOBUFS ):
+                                break	# Output buffer full; await writability
+                            log.info( "Failed to send List Identity to %s: %s", pending[0], exc )
+                        pending.popleft()
+                    deadline	= cpppo.timer() + timeout
+        log.normal( "Found %d EtherNet/IP CIP devices", len( found ))
+    finally:
+        conn.close()
+
+
+def main( argv=None ):
+    """Discover EtherNet/IP CIP devices in the specified address ranges, printing each as it replies."""
+    ap				= argparse.ArgumentParser(
+        description = "Discover EtherNet/IP CIP devices using List Identity",
+        epilog = "" )
+    ap.add_argument( '-v', '--verbose', action="count",
+                     default=0,
+                     help="Display logging information." )
+    ap.add_argument( '-l', '--log',
+                     help="Log file, if desired" )
+    ap.add_argument( '-p', '--port', default=None,
+                     help="EtherNet/IP port (default: %d)" % ( enip.address[1], ))
+    ap.add_argument( '-S', '--source-address', default=None,
+                     help="Local network interface IP address[:port] to send from (default: None)" )
+    ap.add_argument( '-b', '--broadcast', action='store_true',
+                     default=False,
+                     help="Also send to the broadcast address of each network (default: False)" )
+    ap.add_argument( '-t', '--timeout', default=1.0,
+                     help="Await replies this long after the last request (default: 1.0s)" )
+    ap.add_argument( '-r', '--retries', default=0,
+                     help="Retry addresses not replying this many times (default: 0)" )
+    ap.add_argument( '-j', '--json', action='store_true',
+                     default=False,
+                     help="Print each identity as a line of JSON (default: False)" )
+    ap.add_argument( 'targets', nargs="+",
+                     help="Networks, address ranges or hosts, eg: 10.0.0.0/22 10.0.4.1-50 plc.example.com" )
+
+    args			= ap.parse_args( argv )
+
+    levelmap 			= {
+        0: logging.WARNING,
+        1: logging.NORMAL,
+        2: logging.DETAIL,
+        3: logging.INFO,
+        4: logging.DEBUG,
+        }
+    cpppo.log_cfg['level']	= ( levelmap[args.verbose]
+                                    if args.verbose in levelmap
+                                    else logging.DEBUG )
+    if args.log:
+        cpppo.log_cfg['filename'] = args.log
+    logging.basicConfig( **cpppo.log_cfg )
+
+    begun			= cpppo.timer()
+    found			= 0
+    for peer,identity in scan( args.targets, port=int( args.port ) if args.port else None,
+                               timeout=float( args.timeout ), retries=int( args.retries ),
+                               broadcast=args.broadcast, source_address=args.source_address ):
+        found		       += 1
+        if args.json:
+            print( json.dumps( dict( identity, peer="%s:%d" % peer ), sort_keys=True, default=str ))
+        else:
+            print( "%-21s %s" % ( "%s:%d" % peer, identity.product_name.strip() ))
+        sys.stdout.flush()
+    log.normal( "Discovered %d devices in %7.3fs", found, cpppo.timer() - begun )
+    return 0 if found else 1
+
+
+if __name__ == "__main__":
+    sys.exit( main() )
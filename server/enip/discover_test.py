@@ -0,0 +1,84 @@
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+import logging
+import socket
+import threading
+
+import cpppo
+from .. import enip
+from . import client, discover, logix
+
+log				= logging.getLogger( "enip.dsc" )
+
+
+def test_discover_addresses():
+    assert list( discover.addresses( "10.0.0.0/30" )) == [ '10.0.0.1', '10.0.0.2' ]
+    assert list( discover.addresses( "10.0.0.0/30", broadcast=True )) == [ '10.0.0.1', '10.0.0.2', '10.0.0.3' ]
+    assert list( discover.addresses( "10.0.0.5/32" )) == [ '10.0.0.5' ]
+    assert list( discover.addresses( "10.0.0.254-10.0.1.1" )) == [ '10.0.0.254', '10.0.0.255', '10.0.1.0', '10.0.1.1' ]
+    assert list( discover.addresses( "10.0.0.1-3" )) == [ '10.0.0.1', '10.0.0.2', '10.0.0.3' ]
+    assert len( list( discover.addresses( "10.0.0.0/22" ))) == 1022
+
+
+def test_discover_scan():
+    """Simulated devices on several loopback addresses are discovered; an invalid reply (or an empty
+    datagram) is ignored."""
+    ucmm			= logix.setup()
+    data			= cpppo.dotdict()
+    data.addr			= ( '127.0.0.1', 44818 )
+    data.enip			= cpppo.dotdict()
+    data.enip.command		= 0x0063
+    data.enip.session_handle	= 0
+    data.enip.options		= 0
+    data.enip.status		= 0
+    data.enip.sender_context	= cpppo.dotdict( input=client.format_context( b'' ))
+    data.enip.CIP		= cpppo.dotdict( list_identity=cpppo.dotdict( CPF=cpppo.dotdict() ))
+    assert ucmm.request( data )
+    reply			= bytes( enip.enip_encode( data.enip ))
+    product_name		= data.enip.CIP.list_identity.CPF.item[0].identity_object.product_name.string
+
+    done			= threading.Event()
+    def device( conn, rpy ):
+        """Reply to each List Identity request, 'til done."""
+        conn.settimeout( .05 )
+        while not done.is_set():
+            try:
+                msg,peer	= conn.recvfrom( 1024 )
+            except socket.timeout:
+                continue
+            for r in ( rpy if isinstance( rpy, tuple ) else ( rpy, )):
+                conn.sendto( r, peer )
+        conn.close()
+
+    # Simulated devices (w/ one invalid, one preceded by an empty datagram) on the same port, at
+    # various loopback addresses
+    socks			= []
+    port			= 0
+    for host in [ '127.0.0.2', '127.0.0.5', '127.0.0.7', '127.0.2.9' ]:
+        conn			= socket.socket( socket.AF_INET, socket.SOCK_DGRAM )
+        conn.bind( ( host, port ))
+        port			= conn.getsockname()[1]
+        socks.append( conn )
+    threads			= [ threading.Thread( target=device, args=( c, b'\x63\x00garbage' if i == 1
+                                                          else ( b'', reply ) if i == 2 else reply ))
+                                    for i,c in enumerate( socks ) ]
+    for t in threads:
+        t.start()
+    try:
+        found			= list( discover.scan( [ "127.0.0.1-8" ], port=port, timeout=.5 ))
+        assert sorted( peer for peer,_ in found ) == [ ( '127.0.0.2', port ), ( '127.0.0.7', port ) ]
+        assert all( identity.product_name == product_name for _,identity in found )
+
+        # A sweep of a /22 (w/ a retry) completes in about timeout per sweep
+        begun			= cpppo.timer()
+        found			= list( discover.scan( "127.0.0.0/22", port=port, timeout=.5, retries=1 ))
+        elapsed			= cpppo.timer() - begun
+        assert sorted( peer for peer,_ in found ) == [
+            ( '127.0.0.2', port ), ( '127.0.0.7', port ), ( '127.0.2.9', port ) ]
+        assert elapsed < 5.0, "Sweep took %.3fs" % ( elapsed )
+    finally:
+        done.set()
+        for t in threads:
+            t.join()
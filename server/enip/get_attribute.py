@@ -195,7 +195,7 @@ class proxy( object ):
     }
 
     # 
-    # parameter		-- An attribute address, its underlying type(s) and units
+    # parameter		-- An attribute address, its underlying type(s), units and (optional) cache TTL
     # PARAMETERS	-- Transformations from parameter "bare name" ==> parameter( attribute, types, units )
     # parameter_substitution -- perform parameter name to ( attribute, types, units ) transformations
     # 
@@ -206,7 +206,9 @@ class proxy( object ):
             'attribute',	# eg. "@0x93/3/10"
             'types',		# eg. "REAL" or ("UINT",...,"SSTRING")
             'units',		# eg. "Hz" or None
+            'ttl',		# eg. 60.0 (seconds a value read may be reused; see read_details), or None
         ] )
+    parameter.__new__.__defaults__ = ( None, ) # ttl is optional
 
     PARAMETERS			= dict( # { 'Parameter Name': parameter(...), }
         product_name	= parameter( "@1/1/7", "SSTRING", None ),
@@ -248,7 +250,7 @@ class proxy( object ):
                 val		= tag.split( '=', 1 )[1] if '=' in tag else None
                 prm 		= tag.split( '=', 1 )[0].strip().lower().replace( ' ', '_' )
                 if prm in parameters:
-                    att,typ,uni	= parameters[prm]
+                    att,typ,uni	= parameters[prm][:3]
                     if val is not None:
                         att    += '=' + val		# restore written value
                     log.info( "Parameter %r (%s) --> %r", tag, uni, (att,typ) )
@@ -260,7 +262,9 @@ class proxy( object ):
     
     def __init__( self, host, port=44818, timeout=None, depth=None, multiple=None,
                   gateway_class=client.connector, route_path=None, send_path=None,
-                  identity_default=None, **gateway_kwds ):
+                  identity_default=None, cache_ttl=None, multiplex=None, packing=None,
+                  fragment_size=None, coalesce=None, write_interval=None, tag_types=None,
+                  **gateway_kwds ):
         """Capture the desired I/O parameters for the target CIP Device.
 
         By default, the CIP Device will be identified using a List Identity request each time a CIP
@@ -268,23 +272,71 @@ class proxy( object ):
         product_name == 'Some Product Name', to avoid this initial List Identity request
         (self.identity it will still be updated if .list_identity is invoked successfully).
 
+        If a cache_ttl (seconds) is supplied, successfully read values are reused for that long by
+        default (see read_details); otherwise, only PARAMETERS w/ a ttl (or reads supplying a ttl)
+        are cached.
+
+        If multiplex is True, the I/O of all Threads' concurrent reads/writes are performed together
+        by a client.multiplexer (pipelined to depth, in Multiple Service Packets if multiple),
+        instead of each Thread's transaction awaiting exclusive use of the gateway.
+
+        The depth may be a client.adaptive instance, to adapt the pipeline depth to the device's
+        round-trip time and throughput (see its .stats).
+
+        If packing is non-zero (and multiple), requests are bin-packed into as few Multiple Service
+        Packets as possible, using each parameter's type to compute its reply size (see
+        client.connector.issue_packed).
+
+        Large array reads/writes of known type are planned into pipelined Read/Write Tag Fragmented
+        requests of up to fragment_size (default: client.connector.FRAGMENT_SIZE) bytes of data, and
+        reassembled (see client.connector.plan); supply a fragment_size of 0 to disable this.
+
+        If coalesce is non-zero, reads of element ranges of the same Tag within that reach of each
+        other (including other Threads' reads, if multiplexed) are merged into single reads (see
+        client.connector.coalesce).
+
+        Writes queued via write_behind are performed by .flush; if a write_interval (seconds) is
+        supplied, a Thread flushes them that long after the first write is queued.
+
+        If tag_types is supplied (a client.tag_types, or the path of its JSON file), the CIP type of
+        each Tag read w/o a type is learned from its first reply (for the device's identity), and is
+        used to compute the reply size of subsequent reads for packing and fragment planning.  The
+        same client.tag_types (or file) may be shared by the proxies of many devices.
+
         """
         self.host		= host
         self.port		= port
         self.timeout		= 5 if timeout is None else timeout
         self.depth		= 2 if depth is None else depth
         self.multiple		= 0 if multiple is None else multiple
+        self.packing		= 0 if packing is None else packing
+        self.fragment_size	= client.connector.FRAGMENT_SIZE if fragment_size is None else fragment_size
+        self.coalesce		= 0 if coalesce is None else coalesce
+        if isinstance( tag_types, cpppo.type_str_base ):
+            tag_types		= client.tag_types( path=tag_types )
+        self.tag_types		= tag_types
         self.route_path		= route_path
         self.send_path		= send_path
         self.gateway_kwds	= gateway_kwds	# Any additional args to gateway
         self.gateway_class	= gateway_class
         self.gateway		= None
         self.gateway_lock	= threading.Lock()
+        self.multiplex		= bool( multiplex )
+        self.multiplexer	= None
         if isinstance( identity_default, cpppo.type_str_base ):
             identity_default	= cpppo.dotdict( product_name = identity_default )
         assert not identity_default or hasattr( identity_default, 'product_name' )
         self.identity_default	= identity_default
         self.identity		= identity_default
+        self.cache_ttl		= cache_ttl
+        self.cache		= {}		# { (<address>,<types>): <entry>, ... }; see read_cached
+        self.cache_lock		= threading.Lock()
+        self.cache_stats	= dict( hits=0, misses=0, coalesced=0 )
+        self.write_interval	= write_interval
+        self.pending		= collections.OrderedDict() # { (<address>,<types>): (<request>,[<callback>,...]), ... }
+        self.pending_lock	= threading.Lock()
+        self.flusher		= None
+        self.write_stats	= dict( queued=0, superseded=0, written=0, failed=0 )
 
     def __str__( self ):
         return "%s at %s" % ( self.identity.product_name if self.identity else None, self.gateway )
@@ -303,6 +355,9 @@ class proxy( object ):
     def close_gateway( self, exc=None ):
         """Discard gateway; also forces re-reading of identity value upon next gateway connection"""
         if self.gateway is not None:
+            if self.multiplexer is not None:
+                self.multiplexer.close()
+                self.multiplexer= None
             self.gateway.close()
             ( log.warning if exc else log.normal )(
                 "Closed EtherNet/IP CIP gateway %s due to: %s%s",
@@ -328,6 +383,12 @@ class proxy( object ):
                     except Exception as exc:
                         self.close_gateway( exc )
                         raise
+                if self.multiplex:
+                    self.multiplexer = client.multiplexer(
+                        self.gateway, depth=self.depth, multiple=self.multiple, timeout=self.timeout,
+                        packing=self.packing, fragment_size=self.fragment_size,
+                        coalesce=self.coalesce, tag_types=self.tag_types,
+                        identity=self.identity or self.host )
                 log.normal( "Opened EtherNet/IP CIP gateway %s", self )
 
     def maintain_gateway( function ):
@@ -405,8 +466,86 @@ class proxy( object ):
                         return True
         return False
 
+    def parse_attributes( self, attributes ):
+        """Generate sequence containing the enip.client operation, and the original attribute
+        specified, its type(s) (if any), and any description, for each of the 'attributes'.  Augment
+        produced operation with data type (if known), to allow estimation of reply sizes (and hence,
+        Multiple Service Packet use); requires cpppo>=3.8.1.
+
+        Yields: (opp,(att,typ,dsc))
+
+        """
+        for a in attributes:
+            assert self.is_request( a ), \
+                "Not a valid read/write target: %r" % ( a, )
+            try:
+                # The attribute description is either a plain Tag, an (address, type), or an
+                # (address, type, description)
+                if is_listlike( a ):
+                    att,typ,uni = a if len( a ) == 3 else a+(None,)
+                else:
+                    att,typ,uni = a,None,None
+                # No conversion of data type if None; use a Read Tag [Fragmented]; works only
+                # for [S]STRING/SINT/INT/DINT/REAL/BOOL.  Otherwise, conversion of data type
+                # desired; get raw data using Get Attribute Single.
+                parser		= client.parse_operations if typ is None else attribute_operations
+                opp,		= parser( ( att, ), route_path=self.route_path, send_path=self.send_path )
+            except Exception as exc:
+                log.warning( "Failed to parse attribute %r; %s", att, exc )
+                raise
+            # For read_tag.../get_attribute..., tag_type is never required; but, it is used (if
+            # provided) to estimate data sizes for Multiple Service Packets.  For
+            # write_tag.../set_attribute..., the data has specified its data type, if not the
+            # default (INT for write_tag, SINT for set_attribute).
+            if typ is not None and not is_listlike( typ ) and 'tag_type' not in opp:
+                t		= typ
+                if isinstance( typ, cpppo.type_str_base ):
+                    td		= self.CIP_TYPES.get( t.strip().lower() )
+                    if td is not None:
+                        t,d	= td
+                if hasattr( t, 'tag_type' ):
+                    opp['tag_type'] = t.tag_type
+
+            log.detail( "Parsed attribute %r (type %r) into operation: %r", att, typ, opp )
+            yield opp,(att,typ,uni)
+
+    # 
+    # compiled		-- Attributes parsed once, for repeated read/write; see compile
+    # 
+    compiled			= collections.namedtuple(
+        'compiled', [
+            'requests',		# ( (<operation>,(<attribute>,<types>,<units>)), ... )
+            'plan',		# client.compiled plan of the operations, or None (if multiplexed)
+        ] )
+
     @maintain_gateway
-    def read( self, attributes, printing=False, checking=False ):
+    def compile( self, attributes ):
+        """Parse the attributes (as for read/write) once, returning a compiled instance that may be
+        supplied to read/write (and read_details) instead of 'attributes', for each subsequent poll.
+        Unless multiplexed (or caching reads; see read_details), the requests are issued from a
+        client.compiled plan (see client.connector.compile), w/ this proxy's multiple, packing,
+        fragment_size, coalesce and tag_types; so, no Tag parsing, request encoding or Multiple
+        Service Packet grouping is repeated.  The plan remains valid if the gateway is re-opened.
+
+            plan		= via.compile( via.parameter_substitution( [ "Output Frequency" ] ))
+            with via:
+                freq,		= via.read( plan )
+
+        """
+        if isinstance( attributes, cpppo.type_str_base ):
+            attributes		= [ attributes ]
+        requests		= tuple( self.parse_attributes( attributes ))
+        plan			= None
+        if not self.multiplex:
+            with self.gateway as connection:
+                plan		= connection.compile(
+                    ( opp for opp,_ in requests ), multiple=self.multiple, packing=self.packing,
+                    fragment_size=self.fragment_size, coalesce=self.coalesce, tag_types=self.tag_types,
+                    identity=self.identity or self.host )
+        return self.compiled( requests=requests, plan=plan )
+
+    @maintain_gateway
+    def read( self, attributes, printing=False, checking=False, ttl=None ):
         """Yields all values, raising Exception at end if any failed.  This is the main external API;
         maintains self.gateway before operating.
 
@@ -426,7 +565,7 @@ class proxy( object ):
 
         """
         bad			= []
-        with contextlib.closing( self.read_details( attributes )) as reader:
+        with contextlib.closing( self.read_details( attributes, ttl=ttl )) as reader:
             # PyPy compatibility; avoid deferred destruction of generators
             for val,(sts,(att,typ,uni)) in reader:
                 if printing:
@@ -441,7 +580,7 @@ class proxy( object ):
             assert len( bad ) == 0, \
                 "read failed to access %d attributes: %s" % ( len( bad ), ', '.join( bad ))
 
-    def read_details( self, attributes ):
+    def read_details( self, attributes, ttl=None ):
         """Assumes that self.gateway has been established; does not close_gateway on Exception.  If you
         use this interface, ensure that you maintain the gateway (eg. ):
 
@@ -479,6 +618,8 @@ class proxy( object ):
         supplied 'attributes' iterable.  Each individual request may succeed or fail with a non-zero
         status code (remember: status code 0x06 indicates successful return of a partial result).
 
+        The 'attributes' may also be a compiled instance (see compile), parsed once for repeated use.
+
         Upon successful I/O, a tuple containing the result value and details about the result (a
         status, and the attribute's details (address, type, and units)) corresponding to each of the
         supplied 'attributes' elements is yielded as a sequence.  Each result value is always a list
@@ -499,6 +640,13 @@ class proxy( object ):
                         enip.INT, enip.DINT, enip.STRING, enip.USINT ], "Identity" ))),
             )
 
+        A successful read of an attribute may be reused by subsequent reads (by any Thread) of the
+        same attribute and type(s) for a time-to-live: the 'ttl' supplied (if not None), else the
+        ttl of the PARAMETERS entry w/ that attribute address (if any), else the proxy's cache_ttl.
+        If another Thread is already reading the attribute, its result is awaited instead of
+        issuing another request.  Any write to an attribute address discards its cached values.
+        See self.cache_stats for the count of cache hits, misses and coalesced reads.
+
         The read_details API raises exception on failure to parse request, or result data type
         conversion problem.  The simple 'read' API also raises an Exception on attribute access
         error, the return of failure status code.  Not all of these strictly necessitate a closure
@@ -526,55 +674,12 @@ class proxy( object ):
         if isinstance( attributes, cpppo.type_str_base ):
             attributes		= [ attributes ]
 
-        def opp__att_typ_uni( i ):
-            """Generate sequence containing the enip.client operation, and the original attribute
-            specified, its type(s) (if any), and any description.  Augment produced operation with
-            data type (if known), to allow estimation of reply sizes (and hence, Multiple Service
-            Packet use); requires cpppo>=3.8.1.
-
-            Yields: (opp,(att,typ,dsc))
-
-            """
-            for a in i:
-                assert self.is_request( a ), \
-                    "Not a valid read/write target: %r" % ( a, )
-                try:
-                    # The attribute description is either a plain Tag, an (address, type), or an
-                    # (address, type, description)
-                    if is_listlike( a ):
-                        att,typ,uni = a if len( a ) == 3 else a+(None,)
-                    else:
-                        att,typ,uni = a,None,None
-                    # No conversion of data type if None; use a Read Tag [Fragmented]; works only
-                    # for [S]STRING/SINT/INT/DINT/REAL/BOOL.  Otherwise, conversion of data type
-                    # desired; get raw data using Get Attribute Single.
-                    parser	= client.parse_operations if typ is None else attribute_operations
-                    opp,	= parser( ( att, ), route_path=self.route_path, send_path=self.send_path )
-                except Exception as exc:
-                    log.warning( "Failed to parse attribute %r; %s", att, exc )
-                    raise
-                # For read_tag.../get_attribute..., tag_type is never required; but, it is used (if
-                # provided) to estimate data sizes for Multiple Service Packets.  For
-                # write_tag.../set_attribute..., the data has specified its data type, if not the
-                # default (INT for write_tag, SINT for set_attribute).
-                if typ is not None and not is_listlike( typ ) and 'tag_type' not in opp:
-                    t		= typ
-                    if isinstance( typ, cpppo.type_str_base ):
-                        td	= self.CIP_TYPES.get( t.strip().lower() )
-                        if td is not None:
-                            t,d	= td
-                    if hasattr( t, 'tag_type' ):
-                        opp['tag_type'] = t.tag_type
-
-                log.detail( "Parsed attribute %r (type %r) into operation: %r", att, typ, opp )
-                yield opp,(att,typ,uni)
-
         def types_decode( types ):
             """Produce a sequence of type class,data-path, eg. (enip.REAL,"SSTRING.string").  If a
             user-supplied type (or None) is provided, data-path is None, and the type is passed.
 
             """
-            for t in typ if is_listlike( typ ) else [ typ ]:
+            for t in types if is_listlike( types ) else [ types ]:
                 d		= None 		# No data-path, if user-supplied type
                 if isinstance( t, cpppo.type_str_base ):
                     td		= self.CIP_TYPES.get( t.strip().lower() )
@@ -584,26 +689,41 @@ class proxy( object ):
                     "Expected None or CIP type class, not %r" % ( t, )
                 yield t,d
 
-        # Get duplicate streams; one to feed the the enip.client's connector.operate, and one for
-        # post-processing based on the declared type(s).
-        operations,attrtypes	= itertools.tee( opp__att_typ_uni( attributes ))
-
-        # Process all requests w/ the specified pipeline depth, Multiple Service Packet
-        # configuration.  The 'idx' is the EtherNet/IP CIP request packet index; 'i' is the
-        # individual I/O request index (for indexing att/typ/operations).
-        # 
-        # This Thread may block here attempting to gain exclusive access to the cpppo.dfa used
-        # by the cpppo.server.enip.client connector.  This uses a threading.Lock, which will raise
-        # an exception on recursive use, but block appropriately on multi-Thread contention.
-        # 
-        # assert not self.gateway.frame.lock.locked(), \
-        #     "Attempting recursive read on %r" % ( self.gateway.frame, )
-        log.info( "Acquiring gateway connection: %s",
-                      "locked" if self.gateway.frame.lock.locked() else "available" )
-        with self.gateway as connection: # waits 'til any Thread's txn. completes
-            for i,(idx,dsc,req,rpy,sts,val) in enumerate( connection.operate(
-                    ( opr for opr,_ in operations ),
-                    depth=self.depth, multiple=self.multiple, timeout=self.timeout )):
+        def operate( requests, plan=None ):
+            """Perform the I/O for the (opp,(att,typ,uni)) requests (using their compiled plan, if
+            supplied), yielding val,(sts,(att,typ,uni))"""
+            # Get duplicate streams; one to feed the the enip.client's connector.operate, and one for
+            # post-processing based on the declared type(s).
+            operations,attrtypes	= itertools.tee( requests )
+
+            # Process all requests w/ the specified pipeline depth, Multiple Service Packet
+            # configuration.  The 'idx' is the EtherNet/IP CIP request packet index; 'i' is the
+            # individual I/O request index (for indexing att/typ/operations).
+            # 
+            # This Thread may block here attempting to gain exclusive access to the cpppo.dfa used
+            # by the cpppo.server.enip.client connector.  This uses a threading.Lock, which will raise
+            # an exception on recursive use, but block appropriately on multi-Thread contention.
+            # 
+            # assert not self.gateway.frame.lock.locked(), \
+            #     "Attempting recursive read on %r" % ( self.gateway.frame, )
+            def harvest():
+                mux		= self.multiplexer
+                if mux is not None:
+                    for res in mux.operate( opr for opr,_ in operations ):
+                        yield res
+                    return
+                log.info( "Acquiring gateway connection: %s",
+                          "locked" if self.gateway.frame.lock.locked() else "available" )
+                with self.gateway as connection: # waits 'til any Thread's txn. completes
+                    for res in connection.operate(
+                            ( opr for opr,_ in operations ) if plan is None else plan,
+                            depth=self.depth, multiple=self.multiple, timeout=self.timeout,
+                            packing=self.packing, fragment_size=self.fragment_size,
+                            coalesce=self.coalesce, tag_types=self.tag_types,
+                            identity=self.identity or self.host ):
+                        yield res
+
+            for i,(idx,dsc,req,rpy,sts,val) in enumerate( harvest() ):
                 log.detail( "%3d (pkt %3d) %16s %-12s: %r ", 
                                 i, idx, dsc, sts or "OK", val )
                 opr,(att,typ,uni) = next( attrtypes )
@@ -644,9 +764,207 @@ class proxy( object ):
                 typ_types	= [t for t,_ in typ_dat] if typ_is_list else typ_dat[0][0]
                 yield res,(sts,(att,typ_types,uni))
 
+        plan			= None
+        if isinstance( attributes, self.compiled ):
+            # Already parsed; supply copies of the operations (consumed by connector.operate)
+            plan		= attributes.plan
+            requests		= ( ( dict( opp ),det ) for opp,det in attributes.requests )
+        else:
+            requests		= self.parse_attributes( attributes )
+        ttls			= self.parameter_ttls()
+        if ttl is None and self.cache_ttl is None and not ttls:
+            for res in operate( requests, plan ):
+                yield res
+            return
+        for res in self.read_cached( list( requests ), operate, ttl=ttl, ttls=ttls ):
+            yield res
+
+    def parameter_ttls( self ):
+        """The { <attribute>: <ttl>, ... } of each PARAMETERS entry specifying a (non-zero) ttl."""
+        return dict( ( p[0], p[3] ) for p in self.PARAMETERS.values() if len( p ) > 3 and p[3] )
+
+    def read_cached( self, requests, operate, ttl=None, ttls=None ):
+        """Satisfy each of the parsed (opp,(att,typ,uni)) requests from self.cache if fresh, or by
+        awaiting another Thread's in-flight read of the same attribute; use operate to perform the
+        remainder (in order), and yield all of their val,(sts,(att,typ,uni)) results in order.
+
+        Each self.cache entry is a dict containing a threading.Event 'done' (set when its read
+        completes), the 'result' (None 'til a successful read completes) and its 'expires' time.
+        The Thread that creates an entry performs its read, and completes (or discards) it.
+
+        """
+        results			= [ None ] * len( requests )
+        keys			= [ None ] * len( requests )
+        mine,theirs		= [],[]		# Indices of requests to perform, or to await
+        owned			= {}		# { <index>: <entry>, ... } we must complete
+        awaited			= {}		# { <index>: <entry>, ... } another Thread will complete
+        now			= cpppo.timer()
+        with self.cache_lock:
+            for i,(opp,(att,typ,uni)) in enumerate( requests ):
+                if 'data' in opp:
+                    # A write; discard any completed reads of the same address
+                    address	= att.split( '=', 1 )[0].strip()
+                    for key in [ k for k,e in self.cache.items()
+                                 if k[0] == address and e['done'].is_set() ]:
+                        del self.cache[key]
+                    mine.append( i )
+                    continue
+                life		= ttl if ttl is not None else ttls.get( att, self.cache_ttl )
+                if not life:
+                    mine.append( i )
+                    continue
+                key = keys[i]	= ( att.strip(), repr( typ ))
+                entry		= self.cache.get( key )
+                if entry and entry['result'] and entry['expires'] > now:
+                    self.cache_stats['hits'] += 1
+                    results[i]	= entry['result']
+                elif entry and not entry['done'].is_set():
+                    self.cache_stats['coalesced'] += 1
+                    awaited[i]	= entry
+                    theirs.append( i )
+                else:
+                    self.cache_stats['misses'] += 1
+                    self.cache[key] = owned[i] = dict(
+                        done=threading.Event(), result=None, expires=None, life=life )
+                    mine.append( i )
+        log.info( "Read %d attributes; %d cached, %d in-flight", len( requests ),
+                  len( requests ) - len( mine ) - len( theirs ), len( theirs ))
+
+        def complete( i, res ):
+            """Complete our own cache entry (if any) w/ a successful result, else discard it."""
+            entry		= owned.pop( i, None )
+            if entry is None:
+                return
+            val,(sts,_)		= res or (None,(None,None))
+            if sts in (0,6) and val not in (True,None):
+                entry['result']	= res
+                entry['expires']= cpppo.timer() + entry['life']
+            elif self.cache.get( keys[i] ) is entry:
+                del self.cache[keys[i]]
+            entry['done'].set()
+
+        try:
+            # Exhaust operate, so it releases the gateway
+            index		= iter( mine )
+            for res in operate( requests[i] for i in mine ):
+                i		= next( index )
+                results[i]	= res
+                with self.cache_lock:
+                    complete( i, res )
+        finally:
+            with self.cache_lock:
+                for i in list( owned ):
+                    complete( i, None )	# Discard any not completed (eg. due to Exception)
+
+        # Await the reads in-flight in other Threads; perform any that didn't succeed
+        retry			= []
+        for i in theirs:
+            entry		= awaited[i]
+            entry['done'].wait( self.timeout )
+            if entry['result']:
+                results[i]	= entry['result']
+            else:
+                retry.append( i )
+        if retry:
+            index		= iter( retry )
+            for res in operate( requests[i] for i in retry ):
+                results[next( index )] = res
+
+        for val,details in results:
+            yield list( val ) if is_listlike( val ) else val,details
+
     # Supply "Tag = <value>" to perform a write.
     write = read
 
+    def write_behind( self, attributes, callback=None ):
+        """Queue the writes in the string or iterable 'attributes' (each a "Tag = <value>", or an
+        (address = <value>, type(s) [, units]) tuple, as for .write), to be performed by the next
+        .flush.  Returns immediately; no I/O is performed.
+
+        A queued write supersedes any write to the same address (Tag or Attribute, and element range)
+        and type(s) still pending; only the latest value is written, in the order the writes were
+        most recently queued.  So, a control loop may write a setpoint at any rate, and the device
+        sees only the final value at each flush.
+
+        If a callback is supplied, it is invoked (in the flushing Thread) with the result of the
+        write: callback( val, (sts,(att,typ,uni)) ); val is True on success, None on failure.  The
+        callbacks of superseded writes are invoked with the result of the write superseding them.
+
+        """
+        if isinstance( attributes, cpppo.type_str_base ):
+            attributes		= [ attributes ]
+        with self.pending_lock:
+            for a in attributes:
+                assert self.is_request( a ), \
+                    "Not a valid write target: %r" % ( a, )
+                att,typ		= ( a[0],a[1] ) if is_listlike( a ) else ( a,None )
+                assert '=' in att, \
+                    "Not a write (no \"= <value>\"): %r" % ( a, )
+                key		= ( att.split( '=', 1 )[0].replace( ' ', '' ), repr( typ ))
+                if key in self.pending:
+                    self.write_stats['superseded'] += 1
+                _,callbacks	= self.pending.pop( key, (None,[]) )
+                if callback:
+                    callbacks.append( callback )
+                self.pending[key] = ( a, callbacks )
+                self.write_stats['queued'] += 1
+            if self.write_interval and self.flusher is None and self.pending:
+                self.flusher	= threading.Thread( target=self.write_behind_flusher,
+                                                    name="%s flusher" % ( self.host, ))
+                self.flusher.daemon = True
+                self.flusher.start()
+
+    def write_behind_flusher( self ):
+        """Flush the pending writes every write_interval, 'til none remain.  Any writes that fail
+        due to an Exception (eg. I/O failure) remain pending, and are retried."""
+        while True:
+            time.sleep( self.write_interval )
+            with self.pending_lock:
+                if not self.pending:
+                    self.flusher= None
+                    return
+            try:
+                self.flush()
+            except Exception as exc:
+                log.warning( "Failed to flush %d writes to %s: %s", len( self.pending ), self.host, exc )
+
+    def flush( self ):
+        """Perform all pending writes queued by write_behind (pipelined, and in Multiple Service
+        Packets if multiple), returning their val,(sts,(att,typ,uni)) results in order, and invoking
+        any callbacks.  If an Exception is raised, the writes (unless superseded by writes queued
+        meanwhile) remain pending, and the gateway is closed.
+
+        """
+        with self.pending_lock:
+            pending		= list( self.pending.items() )
+            self.pending.clear()
+        if not pending:
+            return []
+        try:
+            with self:
+                with contextlib.closing( self.read_details( [ req for _,(req,_) in pending ] )) as writer:
+                    results	= list( writer )
+        except Exception:
+            # Restore the failed writes ahead of any queued meanwhile; the latest value wins, in the
+            # order most recently queued
+            with self.pending_lock:
+                restored	= collections.OrderedDict( pending )
+                for key,(req,callbacks) in self.pending.items():
+                    _,older	= restored.pop( key, (None,[]) )
+                    restored[key] = ( req, older + callbacks )
+                self.pending	= restored
+            raise
+        with self.pending_lock:
+            for val,details in results:
+                self.write_stats['written' if val else 'failed'] += 1
+        for (key,(req,callbacks)),(val,details) in zip( pending, results ):
+            for callback in callbacks:
+                try:
+                    callback( val, details )
+                except Exception as exc:
+                    log.warning( "Write %r callback failed: %s", req, exc )
+        return results
+
 class proxy_simple( proxy ):
     """Monitor/Control a simple non-routing CIP device (eg. an AB MicroLogix, AB PowerFlex AC Drive).
 
@@ -706,7 +1024,7 @@ which is required to carry this Send/Route Path data. """ )
                      help="Use Multiple Service Packet request targeting ~500 bytes (default: False)" )
     ap.add_argument( '-d', '--depth',
                      default=0,
-                     help="Pipelining depth" )
+                     help="Pipelining depth, or 'auto' to adapt it" )
     ap.add_argument( '-t', '--timeout',
                      default=5.0,
                      help="EtherNet/IP timeout (default: 5s)" )
@@ -753,7 +1071,7 @@ which is required to carry this Send/Route Path data. """ )
     addr			= ( str( addr[0] ) if addr[0] else enip.address[0],
                                     int( addr[1] ) if len( addr ) > 1 and addr[1] else enip.address[1] )
     timeout			= float( args.timeout )
-    depth			= int( args.depth )
+    depth			= client.adaptive() if args.depth == 'auto' else int( args.depth )
     multiple			= 500 if args.multiple else 0
     route_path			= json.loads( args.route_path ) if args.route_path \
                                   else [] if args.simple else None # may be None/0/False/[]
@@ -786,7 +1104,7 @@ which is required to carry this Send/Route Path data. """ )
             failures	       += 1 if sts else 0
         elapsed			= cpppo.timer() - start
         log.normal( "%3d requests in %7.3fs at pipeline depth %2s; %7.3f TPS" % (
-            idx+1, elapsed, args.depth, (idx+1) / elapsed ))
+            idx+1, elapsed, depth, (idx+1) / elapsed ))
 
     if profiler:
         s			= StringIO.StringIO()
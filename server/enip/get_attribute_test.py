@@ -0,0 +1,177 @@
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+import logging
+import threading
+import time
+
+import pytest
+
+from . import get_attribute
+from .client_test import simulator
+
+log				= logging.getLogger( "enip.get" )
+
+
+def test_proxy_cache():
+    """Reads are reused for their TTL, coalesced w/ identical in-flight reads, and discarded by writes."""
+    class sensor( get_attribute.proxy_simple ):
+        PARAMETERS		= dict( get_attribute.proxy_simple.PARAMETERS,
+            rated_volts		= get_attribute.proxy_simple.parameter( '@0x93/20/10', 'REAL', 'VAC', 60 ),
+            output_freq		= get_attribute.proxy_simple.parameter( '@0x93/1/10', 'REAL', 'Hz' ),
+        )
+    via				= sensor( 'localhost' )
+    assert via.PARAMETERS['output_freq'].ttl is None
+    assert via.parameter_ttls() == { '@0x93/20/10': 60 }
+
+    performed			= []
+    def operate( requests ):
+        """Simulate the device I/O; each read returns the count of I/Os performed so far."""
+        for opp,(att,typ,uni) in requests:
+            time.sleep( .1 )
+            performed.append( att )
+            yield ( True if 'data' in opp else [ len( performed ) ] ),(0,(att,typ,uni))
+
+    def read( *attributes, **kwds ):
+        requests		= [ ( { 'data': [ 1.0 ] } if '=' in a else {}, ( a, 'REAL', None ))
+                                    for a in attributes ]
+        return list( via.read_cached( requests, operate, ttls=via.parameter_ttls(), **kwds ))
+
+    # Only the rated_volts PARAMETER is cached; repeated reads in the same request are coalesced
+    results			= read( '@0x93/20/10', '@0x93/1/10', '@0x93/20/10' )
+    assert [ v for v,_ in results ] == [ [1], [2], [1] ]
+    assert via.cache_stats == dict( hits=0, misses=1, coalesced=1 )
+    results			= read( '@0x93/20/10', '@0x93/1/10' )
+    assert [ v for v,_ in results ] == [ [1], [3] ]
+    assert via.cache_stats['hits'] == 1
+
+    # A write discards the cached value; an explicit ttl of 0 bypasses the cache
+    read( '@0x93/20/10=1.0' )
+    assert [ v for v,_ in read( '@0x93/20/10' ) ] == [ [5] ]
+    assert [ v for v,_ in read( '@0x93/20/10', ttl=0 ) ] == [ [6] ]
+    assert [ v for v,_ in read( '@0x93/20/10' ) ] == [ [5] ]
+
+    # Concurrent identical reads from several Threads are satisfied by one I/O
+    del performed[:]
+    results			= {}
+    def reader( n ):
+        results[n]		= read( '@0x93/1/10', ttl=1.0 )
+    threads			= [ threading.Thread( target=reader, args=( n, )) for n in range( 5 ) ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert performed == [ '@0x93/1/10' ]
+    assert all( v == [1] for r in results.values() for v,_ in r )
+
+
+def test_proxy_write_behind():
+    """Pending writes to the same address collapse to the latest value, and are flushed together."""
+    class gateway( object ):
+        def __init__( self, **kwds ):
+            pass
+        def close( self ):
+            pass
+
+    class drive( get_attribute.proxy_simple ):
+        failing			= False
+        meanwhile		= None		# Writes queued while a flush is in progress
+        def read_details( self, attributes, ttl=None ):
+            if self.meanwhile:
+                self.write_behind( self.meanwhile )
+            if self.failing:
+                raise IOError( "Simulated I/O failure" )
+            flushed.append( [ a if isinstance( a, str ) else a[0] for a in attributes ] )
+            for a in attributes:
+                att		= a if isinstance( a, str ) else a[0]
+                yield ( None if 'Bad' in att else True ),(0,(att,None,None))
+
+    flushed			= []
+    confirmed			= []
+    via				= drive( 'localhost', gateway_class=gateway, identity_default="Drive" )
+    via.write_behind( "Speed = (REAL)1.0", callback=lambda val,det: confirmed.append( (1,val) ))
+    via.write_behind( [ "Accel=(REAL)2.0", "Speed = (REAL)3.0" ],
+                      callback=lambda val,det: confirmed.append( (3,val) ))
+    via.write_behind( [ ( "@0x93/1/10=(REAL)4.0", "REAL" ) ] )
+    via.write_behind( "Speed=(REAL)5.0" )
+    assert via.write_stats == dict( queued=5, superseded=2, written=0, failed=0 )
+    assert flushed == []
+
+    # Only the latest Speed is written (after Accel), confirming all of its superseded writes
+    results			= via.flush()
+    assert flushed == [ [ "Accel=(REAL)2.0", "@0x93/1/10=(REAL)4.0", "Speed=(REAL)5.0" ] ]
+    assert [ v for v,_ in results ] == [ True, True, True ]
+    assert sorted( confirmed ) == [ (1,True), (3,True), (3,True) ]
+    assert via.flush() == []
+
+    # A failed flush retains its writes (unless superseded), for the next flush
+    via.write_behind( [ "Speed=(REAL)6.0", "Accel=(REAL)7.0" ] )
+    via.failing			= True
+    try:
+        via.flush()
+        assert False, "Expected flush to fail"
+    except IOError:
+        pass
+    via.failing			= False
+    via.write_behind( [ "Accel=(REAL)8.0", "Bad=(REAL)9.0" ] )
+    results			= via.flush()
+    assert flushed[-1] == [ "Speed=(REAL)6.0", "Accel=(REAL)8.0", "Bad=(REAL)9.0" ]
+    assert [ v for v,_ in results ] == [ True, True, None ]
+    assert via.write_stats['failed'] == 1
+
+    # A write queued during a failed flush supersedes the failed one, in its (later) position
+    via.write_behind( [ "Speed=(REAL)6.0", "Accel=(REAL)7.0" ] )
+    via.failing,via.meanwhile	= True,"Speed=(REAL)6.5"
+    with pytest.raises( IOError ):
+        via.flush()
+    via.failing,via.meanwhile	= False,None
+    via.flush()
+    assert flushed[-1] == [ "Accel=(REAL)7.0", "Speed=(REAL)6.5" ]
+
+    # With a write_interval, a Thread flushes the pending writes, and then exits
+    del flushed[:]
+    via.write_interval		= .1
+    via.write_behind( "Speed=(REAL)10.0" )
+    via.write_behind( "Speed=(REAL)11.0" )
+    time.sleep( .5 )
+    assert flushed == [ [ "Speed=(REAL)11.0" ] ]
+    assert via.flusher is None
+
+
+def test_proxy_compile():
+    """Compiled attributes are parsed once, and their plan's requests reused by every read."""
+    sessions			= []
+    class gateway( simulator ):
+        def __init__( self, **kwds ):
+            super( gateway, self ).__init__( **kwds )
+            self.session	= len( sessions ) + 1
+            sessions.append( self )
+
+    parsed			= []
+    class device( get_attribute.proxy ):
+        def parse_attributes( self, attributes ):
+            for req in super( device, self ).parse_attributes( attributes ):
+                parsed.append( req[1][0] )
+                yield req
+
+    via				= device( 'localhost', gateway_class=gateway, identity_default="PLC",
+                                          multiple=500, coalesce=1 )
+    tags			= [ "Tag[0-3]", "Speed = (REAL)1.5", "Tag[4-7]", "Tag[1]" ]
+    expected			= list( via.read( tags ))
+    assert expected == [ [0,1,2,3], True, [4,5,6,7], [1] ]
+    frames			= sessions[0].sent[:]
+    assert len( frames ) == 1				# A Multiple Service Packet, w/ 2 coalesced reads
+
+    plan			= via.compile( tags )
+    assert len( parsed ) == 8
+    del sessions[0].sent[:]
+    for _ in range( 3 ):
+        assert list( via.read( plan )) == expected
+    assert len( parsed ) == 8 and sessions[0].sent == frames * 3
+
+    # The plan remains valid after the gateway is re-opened (w/ a new session)
+    via.close_gateway()
+    assert list( via.read( plan )) == expected
+    assert len( sessions ) == 2 and sessions[1].sent[0][4:8] != frames[0][4:8] \
+        and sessions[1].sent[0][8:] == frames[0][8:]
@@ -0,0 +1,268 @@
+#! /usr/bin/env python3
+
+#
+# Cpppo -- Communication Protocol Python Parser and Originator
+#
+# Copyright (c) 2013, Hard Consulting Corporation.
+#
+# Cpppo is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.  See the LICENSE file at the top of the source tree.
+#
+# Cpppo is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+__author__                      = "Perry Kundert"
+__email__                       = "perry@hardconsulting.com"
+__copyright__                   = "Copyright (c) 2013 Hard Consulting Corporation"
+__license__                     = "Dual License: GPLv3 (or later) and Commercial (see LICENSE)"
+
+
+"""
+enip.implicit	-- Class 0/1 implicit I/O over UDP
+
+    Connections are established by a Forward Open request (via the usual EtherNet/IP CIP TCP/IP
+session), to the Connection Points of Assembly Objects (Class 0x04) backed by tag Attributes; see
+device.Connection_Manager.forward_open.  Thereafter, each connection's T->O data is produced every
+T->O RPI to the originator, and its O->T data is consumed, usually over UDP port 2222.  If no O->T
+data is received within the connection's timeout, the connection is closed.
+
+Each implicit I/O UDP datagram is a CPF list carrying a Sequenced Address item and a Connected Data
+item (see Volume 2: EtherNet/IP Adaptation of CIP, Chapter 2-6):
+
+    | Field              | Type  | Value                                              |
+    |--------------------+-------+----------------------------------------------------|
+    | Item Count         | UINT  | 2                                                  |
+    | Type ID            | UINT  | 0x8002 Sequenced Address item                      |
+    | Length             | UINT  | 8                                                  |
+    | Connection ID      | UDINT | The consumer's connection ID                       |
+    | Sequence Number    | UDINT | Encapsulation sequence number                      |
+    | Type ID            | UINT  | 0x00B1 Connected Data item                         |
+    | Length             | UINT  | Bytes to follow                                    |
+    | Sequence Count     | UINT  | Class 1 only; changes only when the data changes   |
+    | Run/Idle Header    | UDINT | O->T only; bit 0 set when the originator is in Run |
+    | Data               | ...   | The Assembly Data                                  |
+
+Since these datagrams arrive at intervals as short as a few milliseconds, they are encoded/decoded
+directly via struct (instead of via cpppo.automata parsers).
+
+"""
+
+__all__				= ['address', 'produce', 'parse', 'io_srv', 'io_server']
+
+import logging
+import socket
+import struct
+import sys
+import time
+import traceback
+
+import cpppo
+from .. import network
+from . import device
+
+address				= ('', 2222)	# The default EtherNet/IP implicit I/O address
+
+log				= logging.getLogger( "enip.io" )
+
+SEQ_ADDR_ITEM			= 0x8002	# Sequenced Address item
+CONN_DATA_ITEM			= 0x00B1	# Connected Data item
+
+# Item count, Sequenced Address item type/length/connection ID/sequence, Connected Data type/length
+HEADER				= struct.Struct( '<HHHIIHH' )
+COUNT				= struct.Struct( '<H' )
+RUN_IDLE			= struct.Struct( '<I' )
+
+
+def produce( connection_ID, sequence, data, count=None, run_idle=None ):
+    """Encode an implicit I/O datagram carrying data for the given connection ID and 32-bit sequence
+    number.  Class 1 connections supply a 16-bit sequence count; O->T data usually supplies a 32-bit
+    Run/Idle header.
+
+    """
+    payload			= b''
+    if count is not None:
+        payload		       += COUNT.pack( count & 0xFFFF )
+    if run_idle is not None:
+        payload		       += RUN_IDLE.pack( run_idle )
+    payload		       += data
+    return HEADER.pack( 2, SEQ_ADDR_ITEM, 8, connection_ID, sequence & 0xFFFFFFFF,
+                        CONN_DATA_ITEM, len( payload )) + payload
+
+
+def parse( msg ):
+    """Decode an implicit I/O datagram, returning the connection ID, sequence number and the Connected
+    Data item payload (including any sequence count and Run/Idle header).  Raises an Exception if the
+    datagram is not a correctly formatted Sequenced Address and Connected Data item CPF list.
+
+    """
+    assert len( msg ) >= HEADER.size, \
+        "Implicit I/O datagram too short: %d bytes" % ( len( msg ))
+    count,adr_typ,adr_len,connection_ID,sequence,dat_typ,dat_len \
+				= HEADER.unpack_from( msg )
+    assert count == 2 and adr_typ == SEQ_ADDR_ITEM and adr_len == 8 and dat_typ == CONN_DATA_ITEM, \
+        "Implicit I/O datagram CPF items unrecognized"
+    assert len( msg ) == HEADER.size + dat_len, \
+        "Implicit I/O datagram length %d inconsistent w/ Connected Data length %d" % (
+            len( msg ), dat_len )
+    return connection_ID,sequence,msg[HEADER.size:]
+
+
+def consume( connection, sequence, payload, now ):
+    """Consume the O->T payload of a connection, returning True iff new data was delivered to its
+    Assembly.  Stale (out of order) datagrams are ignored; any valid datagram resets the connection's
+    inactivity timer.  A Class 1 connection's data is only delivered when its sequence count changes,
+    and only while the originator is in Run mode.
+
+    """
+    O_T				= connection.O_T
+    if O_T.sequence is not None:
+        ahead			= ( sequence - O_T.sequence ) & 0xFFFFFFFF
+        if not ahead or ahead >= 0x80000000:
+            connection.stale   += 1
+            return False
+    O_T.sequence		= sequence
+    connection.consumed		= now
+    connection.received	       += 1
+
+    if connection.transport == 1:
+        count,			= COUNT.unpack_from( payload )
+        payload			= payload[COUNT.size:]
+        if count == O_T.count:
+            return False			# No new data
+        O_T.count		= count
+    if not O_T.size:
+        return False				# eg. a heartbeat; no data to consume
+    header			= device.Connection_Manager.O_T_HEADER
+    if header:
+        connection.run		= bool( RUN_IDLE.unpack_from( payload )[0] & 0x01 )
+        payload			= payload[header:]
+    assert len( payload ) == O_T.size, \
+        "O->T data size %d; %d expected" % ( len( payload ), O_T.size )
+    if not connection.run:
+        return False				# Idle; Assembly retains its last data
+    O_T.assembly.consume_data( payload )
+    return True
+
+
+def io_srv( conn, server=None, latency=None, port=None, **kwds ):
+    """Service all implicit I/O connections established by Forward Open requests, over the supplied
+    bound UDP/IP socket 'conn', until signalled done via the server.control (and suspended while
+    signalled disable).  Produces
+    each connection's T->O data at its RPI to the originator (at the address its O->T data last
+    arrived from, or the originator's host at the 'port' (default: 2222) until then), and closes
+    connections whose O->T data does not arrive within their timeout.
+
+    Rather than waking every 'latency' (default: 0.1s), we await incoming O->T data only 'til the
+    next T->O production or connection timeout is due.
+
+    """
+    if latency is None:
+        latency			= 0.1
+    if port is None:
+        port			= address[1]
+    CM				= device.Connection_Manager
+    while not ( server and server['control']['done'] ):
+        if server and server['control']['disable']:
+            time.sleep( latency )
+            continue
+        now			= cpppo.timer()
+        wait			= latency
+        with CM.lock:
+            connections		= list( CM.connections.items() )
+        for o_t_id,c in connections:
+            if 'consumed' not in c:
+                # A newly established connection.  Its inactivity timer starts now, and its first
+                # T->O data is produced at once.
+                c.consumed	= now
+                c.received	= 0
+                c.stale		= 0
+                c.produced	= 0
+                c.run		= False
+                c.T_O.sequence	= 0
+                c.T_O.count	= 0
+                c.T_O.deadline	= now
+                c.T_O.address	= ( c.peer[0], port ) if c.peer else None
+
+            # Close the connection if O->T data has not arrived in time.  Initially, the originator
+            # is allowed TIMEOUT_INITIAL seconds (or the timeout, if longer).
+            timeout		= c.timeout if c.O_T.sequence is not None \
+                                  else max( c.timeout, CM.TIMEOUT_INITIAL )
+            if now - c.consumed >= timeout:
+                with CM.lock:
+                    CM.connections.pop( o_t_id, None )
+                log.warning( "Implicit I/O connection O->T 0x%08x (Client %r) timed out after %7.3fs",
+                             o_t_id, c.peer, now - c.consumed )
+                continue
+            wait		= min( wait, c.consumed + timeout - now )
+
+            # Produce the T->O data, if due (and we know where to send it).  If we've fallen more
+            # than an RPI behind, schedule the next production an RPI from now.
+            if c.T_O.address and now >= c.T_O.deadline:
+                data		= c.T_O.assembly.produce_data() if c.T_O.size else b''
+                c.T_O.sequence += 1
+                if c.transport == 1:
+                    c.T_O.count+= 1
+                msg		= produce( c.T_O.connection_ID, c.T_O.sequence, data,
+                                           count=c.T_O.count if c.transport == 1 else None,
+                                           run_idle=0x00000001 if device.Connection_Manager.T_O_HEADER else None )
+                try:
+                    conn.sendto( msg, c.T_O.address )
+                    c.produced += 1
+                except socket.error as exc:
+                    log.detail( "Implicit I/O connection T->O 0x%08x send to %r failed: %s",
+                                c.T_O.connection_ID, c.T_O.address, exc )
+                c.T_O.deadline += c.T_O.RPI
+                if c.T_O.deadline <= now:
+                    c.T_O.deadline = now + c.T_O.RPI
+            if c.T_O.address:
+                wait		= min( wait, c.T_O.deadline - now )
+
+        # Consume all O->T data available 'til the next production/timeout is due
+        msg,frm			= network.recvfrom( conn, maxlen=65535, timeout=max( 0, wait ))
+        while msg:
+            now			= cpppo.timer()
+            try:
+                o_t_id,sequence,payload = parse( msg )
+                with CM.lock:
+                    c		= CM.connections.get( o_t_id )
+                if c is None or 'consumed' not in c:
+                    log.info( "Implicit I/O data from %r for unknown connection O->T 0x%08x", frm, o_t_id )
+                elif c.peer and frm[0] != c.peer[0]:
+                    log.info( "Implicit I/O data from %r for connection O->T 0x%08x of originator %r ignored",
+                              frm, o_t_id, c.peer )
+                elif consume( c, sequence, payload, now ):
+                    c.T_O.address = frm
+                    log.info( "Implicit I/O connection O->T 0x%08x consumed %d bytes from %r",
+                              o_t_id, c.O_T.size, frm )
+                elif c.O_T.sequence == sequence:
+                    c.T_O.address = frm
+            except Exception as exc:
+                log.warning( "Implicit I/O datagram from %r invalid: %s\n%s", frm, exc,
+                             ''.join( traceback.format_exception( *sys.exc_info() )))
+            msg,frm		= network.recvfrom( conn, maxlen=65535 )
+
+
+def io_server( address=None, **kwds ):
+    """Bind a UDP/IP socket to the implicit I/O address (default: ('', 2222)) and service all implicit
+    I/O connections 'til done.  Suitable as a Thread target; pass the server=... control dotdict, to
+    allow termination via server.control.done.
+
+    """
+    if address is None:
+        address			= globals()['address']
+    conn			= socket.socket( socket.AF_INET, socket.SOCK_DGRAM )
+    try:
+        conn.setsockopt( socket.SOL_SOCKET, socket.SO_REUSEADDR, 1 )
+        conn.bind( address )
+        log.normal( "EtherNet/IP Implicit I/O on %r", conn.getsockname() )
+        io_srv( conn, port=address[1], **kwds )
+    finally:
+        conn.close()
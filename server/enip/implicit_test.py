@@ -0,0 +1,198 @@
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+import contextlib
+import logging
+import socket
+import threading
+import time
+
+import cpppo
+from .. import network
+from . import device, logix, parser, implicit
+
+log				= logging.getLogger( "enip.io" )
+
+# Assembly Connection Points, backed by several tag Attributes (Output consumed, Input produced)
+OUT_ATTS			= [ device.Attribute( 'Output_Bits', parser.SINT, default=[0]*4 ),
+                                    device.Attribute( 'Output_Word', parser.INT,  default=[0]*2 ) ]
+INP_ATTS			= [ device.Attribute( 'Input_Real',  parser.REAL, default=[1.5] ),
+                                    device.Attribute( 'Input_Word',  parser.INT,  default=[0]*2 ) ]
+
+
+def assemblies():
+    logix.setup()
+    CM				= device.lookup( 0x06, 1 )
+    if not device.lookup( 0x04, 150 ):
+        device.Assembly( name="Output", instance_id=150, members=OUT_ATTS )
+        device.Assembly( name="Input",  instance_id=151, members=INP_ATTS )
+    return CM
+
+
+def forward_open( CM, serial=1, O_T_size=8, T_O_size=8, path=None, RPI=10000, addr=( '127.0.0.1', 2222 )):
+    """Produce, parse and process a Class 1 Forward Open, returning the parsed reply."""
+    req				= cpppo.dotdict()
+    req.path			= { 'segment': [ cpppo.dotdict( d ) for d in [ {'class': 6}, {'instance': 1} ]]}
+    fo = req.forward_open	= cpppo.dotdict()
+    fo.O_T			= cpppo.dotdict( connection_ID=0, RPI=RPI, NCP=0x4800 | ( O_T_size + 4 + 2 ))
+    fo.T_O			= cpppo.dotdict( connection_ID=0x1234, RPI=RPI, NCP=0x4800 | ( T_O_size + 2 ))
+    fo.connection_serial	= serial
+    fo.O_vendor			= 0x0001
+    fo.O_serial			= 0x12345678
+    fo.connection_timeout_multiplier = 0
+    fo.transport_class_triggers	= 0x01
+    fo.connection_path		= { 'segment': [ cpppo.dotdict( d ) for d in path or [
+        {'class': 4}, {'instance': 1}, {'connection': 150}, {'connection': 151} ]]}
+    return process( CM, device.Connection_Manager.produce( req ), addr )
+
+
+def forward_close( CM, serial=1, addr=( '127.0.0.1', 2222 )):
+    req				= cpppo.dotdict()
+    req.path			= { 'segment': [ cpppo.dotdict( d ) for d in [ {'class': 6}, {'instance': 1} ]]}
+    fc = req.forward_close	= cpppo.dotdict()
+    fc.connection_serial	= serial
+    fc.O_vendor			= 0x0001
+    fc.O_serial			= 0x12345678
+    fc.connection_path		= { 'segment': [ cpppo.dotdict( d ) for d in [
+        {'class': 4}, {'instance': 1}, {'connection': 150}, {'connection': 151} ]]}
+    return process( CM, device.Connection_Manager.produce( req ), addr )
+
+
+def process( CM, encoded, addr ):
+    data			= cpppo.dotdict()
+    data.addr			= addr
+    data.request		= cpppo.dotdict()
+    data.request.input		= bytearray( encoded )
+    CM.request( data )
+    reply			= cpppo.dotdict()
+    with device.Object.parser as machine:
+        with contextlib.closing( machine.run( path='response', source=cpppo.peekable( bytes( data.request.input )),
+                                              data=reply )) as engine:
+            for m,s in engine:
+                pass
+    log.normal( "Reply: %s", parser.enip_format( reply ))
+    return reply.response
+
+
+def test_implicit_forward_open():
+    CM				= assemblies()
+    device.Connection_Manager.connections.clear()
+
+    assert device.lookup( 0x04, 150, 4 ).value == 8
+    assert device.lookup( 0x04, 151, 4 ).value == 8
+
+    rpy				= forward_open( CM )
+    assert rpy.service == 0xD4 and rpy.status == 0
+    assert rpy.forward_open.T_O.connection_ID == 0x1234
+    assert rpy.forward_open.O_T.API == 10000
+    connection			= device.Connection_Manager.connections[rpy.forward_open.O_T.connection_ID]
+    assert connection.O_T.assembly is device.lookup( 0x04, 150 )
+    assert connection.T_O.size == 8
+    assert connection.peer == ( '127.0.0.1', 2222 )
+
+    # Duplicate, bad sizes and paths fail w/ the appropriate extended status
+    for kwds,ext in [
+            ( {},					0x0100 ),
+            ( { 'serial': 2, 'O_T_size': 6 },		0x0127 ),
+            ( { 'serial': 2, 'T_O_size': 10 },		0x0128 ),
+            ( { 'serial': 2, 'RPI': 0 },		0x0111 ),
+            ( { 'serial': 2, 'path': [ {'class': 4}, {'instance': 1}, {'connection': 150}, {'connection': 199} ]},
+                                                        0x0315 ),
+            ( { 'serial': 2, 'path': [ {'class': 2}, {'instance': 1} ]},
+                                                        0x0315 ),
+    ]:
+        rpy			= forward_open( CM, **kwds )
+        assert rpy.status == 0x01 and rpy.status_ext.data == [ ext ], \
+            "Expected ext. status 0x%04x for %r: %s" % ( ext, kwds, parser.enip_format( rpy ))
+        assert rpy.forward_open.connection_serial == kwds.get( 'serial', 1 )
+    assert len( device.Connection_Manager.connections ) == 1
+
+    rpy				= forward_close( CM )
+    assert rpy.service == 0xCE and rpy.status == 0
+    assert not device.Connection_Manager.connections
+    rpy				= forward_close( CM )
+    assert rpy.status == 0x01 and rpy.status_ext.data == [ 0x0107 ]
+
+
+def test_implicit_packet():
+    msg				= implicit.produce( 0xDEADBEEF, 5, b'\x01\x02', count=3, run_idle=1 )
+    assert msg == b'\x02\x00\x02\x80\x08\x00\xef\xbe\xad\xde\x05\x00\x00\x00\xb1\x00\x08\x00' \
+                  b'\x03\x00\x01\x00\x00\x00\x01\x02'
+    assert implicit.parse( msg ) == ( 0xDEADBEEF, 5, b'\x03\x00\x01\x00\x00\x00\x01\x02' )
+    try:
+        implicit.parse( msg[:-1] )
+        assert False, "Should have failed to parse a truncated datagram"
+    except AssertionError as exc:
+        assert "inconsistent" in str( exc )
+
+
+def test_implicit_io():
+    """Establish a Class 1 connection, and exchange I/O data w/ io_srv over UDP/IP loopback 'til we stop
+    producing, and the connection times out."""
+    CM				= assemblies()
+    device.Connection_Manager.connections.clear()
+
+    target			= socket.socket( socket.AF_INET, socket.SOCK_DGRAM )
+    target.bind( ('127.0.0.1', 0) )
+    originator			= socket.socket( socket.AF_INET, socket.SOCK_DGRAM )
+    originator.bind( ('127.0.0.1', 0) )
+
+    control			= cpppo.dotdict( done=False, disable=False )
+    server			= cpppo.dotdict( control=control )
+    thread			= threading.Thread( target=implicit.io_srv, args=( target, ),
+                                    kwargs=dict( server=server, latency=0.05,
+                                                 port=originator.getsockname()[1] ))
+    thread.daemon		= True
+    thread.start()
+    try:
+        rpy			= forward_open( CM, RPI=20000, addr=originator.getsockname() )
+        assert rpy.status == 0
+        o_t_id			= rpy.forward_open.O_T.connection_ID
+        connection		= device.Connection_Manager.connections[o_t_id]
+
+        INP_ATTS[1][0:2]	= [ 1, -2 ]
+        out			= parser.SINT.produce( 1 ) * 4 + parser.INT.produce( 0x0102 ) + parser.INT.produce( -3 )
+        seq			= 0
+        beg			= cpppo.timer()
+        received		= 0
+        while cpppo.timer() - beg < 0.5:
+            # O->T Run, data changes on count 1, 2
+            seq		       += 1
+            originator.sendto( implicit.produce( o_t_id, seq, out, count=min( seq, 2 ), run_idle=1 ),
+                               target.getsockname() )
+            msg,frm		= network.recvfrom( originator, maxlen=1024, timeout=0.05 )
+            if msg:
+                t_o_id,t_o_seq,payload = implicit.parse( msg )
+                assert t_o_id == 0x1234
+                assert payload[2:] == parser.REAL.produce( 1.5 ) + parser.INT.produce( 1 ) + parser.INT.produce( -2 )
+                received       += 1
+            time.sleep( 0.01 )
+        assert received >= 5
+        assert OUT_ATTS[0][0:4] == [ 1, 1, 1, 1 ]
+        assert OUT_ATTS[1][0:2] == [ 0x0102, -3 ]
+        assert connection.run and 0 < connection.received <= seq
+
+        # Data from any host but the originator is ignored.  Stale packets are ignored; stop
+        # producing, and the connection times out (80ms)
+        intruder		= socket.socket( socket.AF_INET, socket.SOCK_DGRAM )
+        try:
+            intruder.bind( ('127.0.0.2', 0) )
+            intruder.sendto( implicit.produce( o_t_id, seq + 100, b'\xff' * len( out ), count=9, run_idle=1 ),
+                             target.getsockname() )
+        finally:
+            intruder.close()
+        originator.sendto( implicit.produce( o_t_id, seq - 1, out, count=3, run_idle=1 ),
+                           target.getsockname() )
+        beg			= cpppo.timer()
+        while o_t_id in device.Connection_Manager.connections and cpppo.timer() - beg < 1.0:
+            time.sleep( 0.01 )
+        assert o_t_id not in device.Connection_Manager.connections
+        assert connection.stale == 1
+        assert OUT_ATTS[0][0:4] == [ 1, 1, 1, 1 ]
+        assert connection.T_O.address[0] == '127.0.0.1'
+    finally:
+        control.done		= True
+        thread.join( 1.0 )
+        target.close()
+        originator.close()
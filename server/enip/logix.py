@@ -38,8 +38,9 @@ import traceback
 
 from ...dotdict import dotdict
 from ... import automata, misc
+from . import metrics
 from .device import ( Object, Attribute,
-                      Message_Router, Connection_Manager, UCMM, Identity, TCPIP,
+                      Message_Router, Connection_Manager, UCMM, Identity, TCPIP, Assembly,
                       resolve_element, resolve_tag, resolve, redirect_tag, lookup )
 from .parser import ( BOOL, UDINT, DINT, UINT, INT, USINT, SINT, REAL, EPATH, typed_data,
                       move_if, octets_drop, octets_noop, enip_format, status )
@@ -576,7 +577,7 @@ def setup( **kwds ):
     None), returning UCMM.  First one in initialize, and don't let anyone else proceed 'til
     complete.  The UCMM isn't really an addressable CIP Object, so we just have to return it.
 
-    If an {identity,message_router,connection_manager,UCMM}_class keyword has been supplied, use it;
+    If an {identity,message_router,connection_manager,assembly,UCMM}_class keyword has been supplied, use it;
     otherwise, use the default Identity (of a *Logix PLC).
 
     If a tags dict (or dotdict) is supplied, its key: { 'attribute': <Attribute>, 'error': <int> }
@@ -596,6 +597,10 @@ def setup( **kwds ):
             cm			= kwds.get( 'connection_manager_class',	Connection_Manager )
             if cm:
                 cm( instance_id=1 )		# Class 0x06, Instance 1
+        if not lookup( 0x04, 0 ):
+            assembly		= kwds.get( 'assembly_class',		Assembly )
+            if assembly:
+                assembly( name='meta-Assembly', instance_id=0 ) # Class 0x04 -- Assembly Instances created by tags @4/<ins>/3
         
         if not lookup( 0x66, 1 ):
             Unknown_Object( instance_id=1 )	# Class 0x66, Instance 1 -- Unknown purpose in Logix Controller
@@ -749,6 +754,7 @@ def process( addr, data, **kwds ):
     """
     ucmm			= setup( **kwds )
 
+    begun			= misc.timer()
     source			= automata.rememberable()
     try:
         # Find the Connection Manager, and use it to parse the encapsulated EtherNet/IP request.  We
@@ -767,6 +773,8 @@ def process( addr, data, **kwds ):
                     #            machine.name_centered(), i, s, source.sent, source.peek(),
                     #            repr( data ) if log.getEffectiveLevel() < logging.DETAIL else misc.reprlib.repr( data ))
                     pass
+            if 'trace' in data:
+                data.trace.mark( 'cip' )
         if log.isEnabledFor( logging.DETAIL ):
             log.detail( "EtherNet/IP CIP Request  (Client %16s): %s", addr, enip_format( data.request ))
 
@@ -801,6 +809,8 @@ def process( addr, data, **kwds ):
         proceed			= ucmm.request( data.response )
         if log.isEnabledFor( logging.DETAIL ):
             log.detail( "EtherNet/IP CIP Response (Client %16s): %s", addr, enip_format( data.response ))
+        if metrics.enabled:
+            metrics.observe( data.response, misc.timer() - begun )
 
         return proceed
     except:
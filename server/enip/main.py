@@ -41,10 +41,13 @@ __all__				= ['main', 'address', 'timeout', 'latency',
 import argparse
 import contextlib
 import fnmatch
+import heapq
+import itertools
 import json
 import logging
 import os
 import random
+import re
 import signal
 import socket
 import sys
@@ -52,9 +55,14 @@ import threading
 import time
 import traceback
 
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
 import cpppo
 from .. import network
-from . import logix, device, parser
+from . import logix, device, parser, implicit, shared, metrics, tracing
 
 # Globals
 latency				=  0.1 	# network I/O polling (should allow several round-trips)
@@ -83,6 +91,11 @@ options				= cpppo.dotdict()
 # The stats for the connections presently open, indexed by <interface>:<port>.   Of particular
 # interest is connections['key'].eof, which will terminate the connection if set to 1
 connections			= cpppo.dotdict()
+connections_lock		= threading.Lock() # Serializes creation of connections entries, UDP stats
+
+# The number of Threads parsing and processing UDP/IP requests (see enip_srv_udp)
+udp_workers			= 4
+subscribe_timeout		= 30.0		# Maximum seconds a web API /subscribe request awaits a change
 
 # All known tags, their CIP Attribute and desired error code
 tags				= cpppo.dotdict()
@@ -97,6 +110,12 @@ try:
 except:
     pass
 
+# The asyncio module (Python 3.4+) is only used if the -A|--asyncio option is specified
+try:
+    import asyncio
+except ImportError:
+    asyncio			= None
+
 # 
 # The Web API, implemented using web.py
 # 
@@ -418,6 +437,75 @@ def api_request( group, match, command, value,
     return accept, response
 
 
+def metrics_request( environ=None, accept=None, framework=None ):
+    """Return the content-type and the server's metrics (see enip.metrics), as a Prometheus-style text
+    exposition (the default), or JSON."""
+    accept		= deduce_encoding( [ "text/plain",
+                                             "application/json" ],
+                                           environ=environ, accept=accept )
+    if accept == "application/json":
+        response	= json.dumps( metrics.report(), sort_keys=True, indent=4 )
+    elif accept == "text/plain":
+        response	= metrics.text()
+    else:
+        message		=  "Invalid encoding: %s, for Accept: %s" % (
+            accept, environ.get( "HTTP_ACCEPT", "*.*" ) if environ else None )
+        raise http_exception( framework, 406, message )
+    return accept, response
+
+
+def subscribe_request( match=None, since=None, timeout=None ):
+    """Return the content-type and a JSON object containing the value of every Tag matching the glob
+    (default: all) changed after the generation cursor 'since' (all, if None).  If none has yet
+    changed, await a change for up to 'timeout' seconds (default: 30).  The returned "cursor" is
+    supplied as 'since' to the next request, to receive only subsequent changes:
+
+        {
+            "cursor":	1234,
+            "tags": {
+                "SCADA": { "changed": 1230, "value": [ 0, 1, ... ] },
+                ...
+            }
+        }
+
+    """
+    timeout		= subscribe_timeout if timeout is None else max( 0, min( timeout, subscribe_timeout ))
+    begun		= cpppo.timer()
+    while True:
+        changed		= {}
+        with device.Attribute.lock: # No change (eg. a batch) is partially complete
+            cursor	= device.Attribute.generation
+            for tag_name,tag_entry in dict.items( tags ):
+                att	= tag_entry.attribute
+                if ( since is not None and att.changed <= since
+                     or match and not fnmatch.fnmatch( tag_name, match )):
+                    continue
+                changed[tag_name] = dict( changed=att.changed,
+                                          value=att.value if att.scalar else list( att.value[0:len( att )] ))
+        remains		= timeout - ( cpppo.timer() - begun )
+        if changed or since is None or remains <= 0:
+            break
+        device.Attribute.await_change( cursor, timeout=remains )
+    return "application/json", json.dumps( dict( cursor=cursor, tags=changed ), sort_keys=True )
+
+
+def traces_request( match=None, environ=None, accept=None, framework=None ):
+    """Return the content-type and the request tracing spans (see enip.tracing) of all connections
+    matching the glob, as JSON lines (the default), or a JSON object of spans by connection."""
+    accept		= deduce_encoding( [ "text/plain",
+                                             "application/json" ],
+                                           environ=environ, accept=accept )
+    if accept == "application/json":
+        response	= json.dumps( tracing.spans( match=match ), sort_keys=True, indent=4 )
+    elif accept == "text/plain":
+        response	= ''.join( tracing.jsonl( match=match ))
+    else:
+        message		=  "Invalid encoding: %s, for Accept: %s" % (
+            accept, environ.get( "HTTP_ACCEPT", "*.*" ) if environ else None )
+        raise http_exception( framework, 406, message )
+    return accept, response
+
+
 # 
 # The web.py url endpoints, and their classes
 # 
@@ -519,10 +607,138 @@ class api:
         return response
 
 
+class metrics_api:
+    def GET( self, suffix ):
+        """Return the server's request metrics; /metrics.json forces JSON, /metrics.txt forces the
+        Prometheus-style text exposition; otherwise, deduced from the Accept: header."""
+        web.header( "Cache-Control", "no-cache" )
+        web.header( "Access-Control-Allow-Origin", "*" )
+        accept			= { ".json": "application/json", ".txt": "text/plain" }.get( suffix )
+        content, response	= metrics_request( environ=web.ctx.environ, accept=accept, framework=web )
+        web.header( "Content-Type", content )
+        return response
+
+
+batch_element			= re.compile( r"^([^\[\]]+)(?:\[(\d+)(?:-(\d+))?\])?$" )
+
+def batch_request( operations ):
+    """Perform a sequence of Tag reads and writes, returning the content-type and a JSON list of their
+    results.  Each operation is a { "tag": <tag>[, "value": <value>] } object; the <tag> may select
+    an element ("SCADA[3]") or an inclusive range of elements ("SCADA[3-5]"), and the <value> (if
+    any) is written to it before it is read; a range requires a list of values.  Each value written
+    retains the type of the current element.  For example:
+
+        [ { "tag": "SCADA[0-2]", "value": [ 1, 2, 3 ] }, { "tag": "Speed" } ]
+
+    yields:
+
+        [ { "tag": "SCADA[0-2]", "success": true, "value": [ 1, 2, 3 ] },
+          { "tag": "Speed", "success": true, "value": 0 } ]
+
+    A failed operation reports "success": false and a "message", and doesn't affect the others.
+
+    All operations are performed while holding device.Attribute.lock, which every Attribute change
+    (eg. an EtherNet/IP CIP write) also holds; so, no other change interleaves with the batch (its
+    reads see only its own writes), and change subscribers (see subscribe_request) observe the
+    batch's writes all at once.  Change notifications are still delivered as each write is made.
+    """
+    results			= []
+    with device.Attribute.lock:
+        for op in operations:
+            result		= dict( tag=op.get( 'tag' ) if isinstance( op, dict ) else op )
+            try:
+                mch		= batch_element.match( result['tag'] or '' )
+                if not mch:
+                    raise KeyError( "Invalid Tag: %r" % ( result['tag'] ))
+                name,beg,end	= mch.groups()
+                if name not in tags:
+                    raise KeyError( "Unknown Tag: %r" % ( name ))
+                att		= tags[name].attribute
+                if beg is None:
+                    key		= slice( 0, len( att ))
+                elif end is None:
+                    key		= int( beg )
+                else:
+                    key		= slice( int( beg ), int( end ) + 1 )
+                if 'value' in op:
+                    value	= op['value']
+                    if isinstance( key, slice ):
+                        # A whole Attribute may be written w/ a scalar value; else, a list of values
+                        if beg is None and att.scalar and not isinstance( value, list ):
+                            value	= [ value ]
+                        cur	= att[key]
+                        if not isinstance( value, list ) or len( value ) != len( cur ):
+                            raise ValueError( "Require a list of %d values" % ( len( cur )))
+                        value	= [ type( c )( v ) for c,v in zip( cur, value ) ]
+                    else:
+                        value	= type( att[key] )( value )
+                    att[key]	= value
+                value		= att[key]
+                result['value']	= value[0] if beg is None and att.scalar else value
+                result['success'] = True
+            except Exception as exc:
+                result['success'] = False
+                result['message'] = "%s failed: %s" % ( result['tag'], exc )
+                log.warning( "Batch %s", result['message'] )
+            results.append( result )
+    return "application/json", json.dumps( results, default=lambda obj: repr( obj ))
+
+
+class subscribe_api:
+    def GET( self, match ):
+        """Long-poll for changes to Tags matching /subscribe/<glob> (default: all), since the ?since=
+        cursor, awaiting a change for up to ?timeout= seconds.  See subscribe_request."""
+        queries			= web.input()
+        web.header( "Cache-Control", "no-cache" )
+        web.header( "Access-Control-Allow-Origin", "*" )
+        try:
+            since		= int( queries['since'] ) if queries.get( 'since' ) else None
+            timeout		= float( queries['timeout'] ) if queries.get( 'timeout' ) else None
+        except ValueError as exc:
+            raise web.BadRequest( "Invalid since/timeout: %s" % ( exc ))
+        content, response	= subscribe_request( match=match[1:] if match else None,
+                                                     since=since, timeout=timeout )
+        web.header( "Content-Type", content )
+        return response
+
+
+class batch_api:
+    def POST( self ):
+        """Perform the Tag reads and writes in the posted JSON list; see batch_request."""
+        web.header( "Cache-Control", "no-cache" )
+        web.header( "Access-Control-Allow-Origin", "*" )
+        try:
+            operations		= json.loads( web.data() )
+            assert isinstance( operations, list ), "Expected a JSON list of operations"
+        except Exception as exc:
+            raise web.BadRequest( "Invalid batch: %s" % ( exc ))
+        content, response	= batch_request( operations )
+        web.header( "Content-Type", content )
+        return response
+
+
+class traces_api:
+    def GET( self, match, suffix ):
+        """Return the request tracing spans of connections matching /traces/<glob> (default: all);
+        /traces.json forces JSON, /traces.jsonl forces JSON lines; otherwise, deduced from the
+        Accept: header."""
+        web.header( "Cache-Control", "no-cache" )
+        web.header( "Access-Control-Allow-Origin", "*" )
+        accept			= { ".json": "application/json", ".jsonl": "text/plain" }.get( suffix )
+        content, response	= traces_request( match=match[1:] if match else None,
+                                                  environ=web.ctx.environ, accept=accept, framework=web )
+        web.header( "Content-Type", content )
+        return response
+
+
 urls				= (
     "(/.*)/",					"trailing_slash",
     "/favicon.ico",				"favicon",
     "/api(/[^/]*)?(/[^/]*)?(/[^/]*)?(/.*)?",	"api",
+    "/metrics(\\.json|\\.txt)?",			"metrics_api",
+    "/traces(/[^/.]*)?(\\.jsonl|\\.json)?",		"traces_api",
+    "/subscribe(/[^/]*)?",			"subscribe_api",
+    "/batch",					"batch_api",
     "/?",					"home",
 )
 
@@ -547,6 +763,7 @@ def web_api( http=None):
 # stats_for	-- Finds/creates the stats entry for a specified peer (if any)
 # enip_srv	-- This function runs in a Thread for each active connection.
 # enip_srv_udp	-- Service multiple UDP/IP peers (limited web interface control)
+# enip_srv_udp_datagram -- Process one UDP/IP datagram request from a peer
 # enip_srv_tcp	-- Service one TCP/IP peer
 # 
 def stats_for( peer ):
@@ -558,17 +775,38 @@ def stats_for( peer ):
     stats			= connections.get( connkey )
     if stats is not None:
         return stats,connkey
-    stats			= cpppo.apidict( timeout=timeout )
-    connections[connkey]	= stats
-    stats['requests']		= 0
-    stats['received']		= 0
-    stats['eof']		= False
-    stats['interface']		= peer[0]
-    stats['port']		= peer[1]
+    with connections_lock:
+        stats			= connections.get( connkey )
+        if stats is not None:
+            return stats,connkey
+        stats			= cpppo.apidict( timeout=timeout )
+        stats['requests']	= 0
+        stats['received']	= 0
+        stats['throttled']	= 0
+        stats['eof']		= False
+        stats['interface']	= peer[0]
+        stats['port']		= peer[1]
+        connections[connkey]	= stats
     return stats,connkey
 
 
-def enip_srv( conn, addr, enip_process=None, delay=None, **kwds ):
+def throttle_for( rate, bucket ):
+    """Returns the number of seconds a session's next request must be delayed, to limit it to an average
+    of rate.value requests per second (in bursts of up to rate.burst), using the session's
+    misc.token_bucket.  We assume the rate may be altered over time (eg. via the web API), so we
+    access it afresh for each use.
+
+    """
+    try:
+        bucket.rate		= float( rate.value if hasattr( rate, 'value' ) else rate )
+        bucket.burst		= int( rate.get( 'burst' ) or 1 ) if hasattr( rate, 'get' ) else 1
+    except Exception as exc:
+        log.detail( "Unable to rate limit; invalid rate: %r", rate )
+        return 0
+    return bucket.take()
+
+
+def enip_srv( conn, addr, enip_process=None, delay=None, rate=None, **kwds ):
     """Serve one Ethernet/IP client 'til EOF; then close the socket.  Parses headers and encapsulated
     EtherNet/IP request data 'til either the parser fails (the Client has submitted an un-parsable
     request), or the request handler fails.  Otherwise, encodes the data.response in an EtherNet/IP
@@ -589,6 +827,10 @@ def enip_srv( conn, addr, enip_process=None, delay=None, **kwds ):
     seconds.  We assume that such a value may be altered over time, so we access it afresh for each
     use.
 
+    Similarly, an optional rate (with .value and optional .burst) limits each TCP/IP session to an
+    average number of requests per second; excess requests are delayed (see throttle_for), so one
+    client cannot monopolize the server.  The number of requests delayed is in stats.throttled.
+
     All remaining keywords are passed along to the supplied enip_process function.
 
     For UDP a socket 'conn', there is no 'addr' (it is None).  For each incoming request, we'll use
@@ -628,111 +870,195 @@ def enip_srv( conn, addr, enip_process=None, delay=None, **kwds ):
         except Exception as exc:
             log.warning( "%s unable to set SO_KEEPALIVE for client %r: %s",
                          name, addr, exc )
-        enip_srv_tcp( conn, addr, name=name, enip_process=enip_process, delay=delay, **kwds )
+        enip_srv_tcp( conn, addr, name=name, enip_process=enip_process, delay=delay, rate=rate, **kwds )
     elif udp:
         enip_srv_udp( conn, name=name, enip_process=enip_process, **kwds )
     else:
         raise NotImplemented( "Unknown socket protocol for EtherNet/IP CIP" )
 
 
-def enip_srv_udp( conn, name, enip_process, **kwds ):
+def enip_srv_udp( conn, name, enip_process, workers=None, **kwds ):
     """Processes UDP packets from multiple clients, as they arrive.  No concept of EOF, but we'll
     respect the setting of 'eof' in stats, and ignore requests from that client.
 
+    This Thread receives each datagram, and dispatches it to one of a pool of 'workers' (default:
+    udp_workers) Threads, each with its own parser, to parse and process it, so requests from many
+    peers (eg. a broadcast List Identity) don't queue up behind each other.  If the bounded queue of
+    datagrams awaiting a worker is full, the datagram is dropped (counted in the peer's
+    stats.dropped).  With 1 (or fewer) workers, each datagram is processed by this Thread.
+
+    If the server.control is an apidict, we await requests indefinitely, and are awakened by any
+    change to it (eg. done/disable).
+
     """
-    with parser.enip_machine( name=name, context='enip' ) as machine:
-        while not kwds['server']['control']['done'] and not kwds['server']['control']['disable']:
-            try:
-                source		= cpppo.rememberable()
-                data		= cpppo.dotdict()
+    if workers is None:
+        workers			= udp_workers
+    pending			= queue.Queue( maxsize=max( 1, workers ) * 16 )
 
-                # If no/partial EtherNet/IP header received, parsing will fail with a NonTerminal
-                # Exception (dfa exits in non-terminal state).  Build data.request.enip:
-                begun		= cpppo.timer() # waiting for next transaction
-                addr,stats	= None,None
-                with contextlib.closing( machine.run(
-                        path='request', source=source, data=data )) as engine:
-                    # PyPy compatibility; avoid deferred destruction of generators
-                    for mch,sta in engine:
-                        if sta is not None:
-                            # No more transitions available.  Wait for input.  
-                            continue
-                        assert not addr, "Incomplete UDP request from client %r" % ( addr )
-                        msg	= None
-                        while msg is None:
-                            # For UDP, we'll allow no input only at the start of a new request parse
-                            # (addr is None); anything else will be considered a failed request Back
-                            # to the trough for more symbols, after having already received a packet
-                            # from a peer?  No go!
-                            wait	= ( kwds['server']['control']['latency']
-                                            if source.peek() is None else 0 )
-                            brx		= cpppo.timer()
-                            msg,frm	= network.recvfrom( conn, timeout=wait )
-                            now		= cpppo.timer()
-                            ( log.detail if msg else log.debug )(
-                                "Transaction receive after %7.3fs (%5s bytes in %7.3f/%7.3fs): %r",
-                                        now - begun, len( msg ) if msg is not None else "None",
-                                        now - brx, wait, stats_for( frm )[0] )
-                            # If we're at a None (can't proceed), and we haven't yet received input,
-                            # then this is where we implement "Blocking"; we just loop for input.
-
-                        # We have received exactly one packet from an identified peer!
-                        begun	= now
-                        addr	= frm
-                        stats,_	= stats_for( addr )
-                        # For UDP, we don't ever receive incoming EOF, or set stats['eof'].
-                        # However, we can respond to a manual eof (eg. from web interface) by
-                        # ignoring the peer's packets.
-                        assert stats and not stats.get( 'eof' ), \
-                            "Ignoring UDP request from client %r: %r" % ( addr, msg )
-                        stats['received']+= len( msg )
-                        if log.getEffectiveLevel() <= logging.DETAIL:
-                            log.detail( "%s recv: %5d: %s", machine.name_centered(),
-                                        len( msg ), cpppo.reprlib.repr( msg ))
-                        source.chain( msg )
+    def worker( number ):
+        machine			= parser.enip_machine( name="%s_%d" % ( name, number ), context='enip' )
+        while True:
+            request		= pending.get()
+            if request is None:
+                break
+            msg,addr		= request
+            enip_srv_udp_datagram( machine, msg, addr, enip_process, conn.sendto, **kwds )
+
+    threads			= []
+    if workers > 1:
+        for number in range( workers ):
+            threads.append( threading.Thread( target=worker, args=( number, )))
+            threads[-1].daemon	= True
+            threads[-1].start()
+
+    machine			= parser.enip_machine( name=name, context='enip' )
+    with network.watching( kwds['server']['control'] ) as wak:
+        try:
+            while not kwds['server']['control']['done'] and not kwds['server']['control']['disable']:
+                msg,addr	= network.recvfrom( conn, maxlen=65535, wakeup=wak,
+                                                    timeout=None if wak is not None
+                                                    else kwds['server']['control']['latency'] )
+                if msg is None:
+                    if wak is not None:
+                        wak.clear()
+                    continue
+                if not threads:
+                    enip_srv_udp_datagram( machine, msg, addr, enip_process, conn.sendto, **kwds )
+                    continue
+                try:
+                    pending.put_nowait( ( msg, addr ))
+                except queue.Full:
+                    stats,_	= stats_for( addr )
+                    with connections_lock:
+                        stats['dropped'] = stats.get( 'dropped', 0 ) + 1
+                    log.warning( "Dropped UDP request from client %r; %d requests awaiting workers",
+                                 addr, pending.qsize() )
+        finally:
+            for _ in threads:
+                pending.put( None )
+            for thread in threads:
+                thread.join( timeout=kwds['server']['control'].get( 'timeout', timeout ))
 
-                # Terminal state and EtherNet/IP header recognized; process and return response
-                assert stats
-                if 'request' in data:
-                    stats['requests'] += 1
-                # enip_process must be able to handle no request (empty data), indicating the
-                # clean termination of the session if closed from this end (not required if
-                # enip_process returned False, indicating the connection was terminated by
-                # request.)
-                if enip_process( addr, data=data, **kwds ):
-                    # Produce an EtherNet/IP response carrying the encapsulated response data.
-                    # If no encapsulated data, ensure we also return a non-zero EtherNet/IP
-                    # status.  A non-zero status indicates the end of the session.
-                    assert 'response.enip' in data, "Expected EtherNet/IP response; none found"
-                    if 'input' not in data.response.enip or not data.response.enip.input:
-                        log.warning( "Expected EtherNet/IP response encapsulated message; none found" )
-                        assert data.response.enip.status, "If no/empty response payload, expected non-zero EtherNet/IP status"
-
-                    rpy		= parser.enip_encode( data.response.enip )
-                    if log.getEffectiveLevel() <= logging.DETAIL:
-                        log.detail( "%s send: %5d: %s", machine.name_centered(),
-                                    len( rpy ), cpppo.reprlib.repr( rpy ))
-                    conn.sendto( rpy, addr )
-
-                log.detail( "Transaction complete after %7.3fs", cpppo.timer() - begun )
-
-                stats['processed']	= source.sent
-            except:
-                # Parsing failure.  Suck out some remaining input to give us some context, but don't re-raise
-                if stats:
-                    stats['processed']= source.sent
-                memory		= bytes( bytearray( source.memory ))
-                pos		= len( source.memory )
-                future		= bytes( bytearray( b for b in source ))
-                where		= "at %d total bytes:\n%s\n%s (byte %d)" % (
-                    stats.get( 'processed', 0 ) if stats else 0,
-                    repr( memory+future ), '-' * ( len( repr( memory ))-1 ) + '^', pos )
-                log.error( "Client %r EtherNet/IP error %s\n\nFailed with exception:\n%s\n", addr, where,
-                             ''.join( traceback.format_exception( *sys.exc_info() )))
-
-
-def enip_srv_tcp( conn, addr, name, enip_process, delay=None, **kwds ):
+
+# A List Identity request's encoded reply, keyed by the request (sans sender_context), w/ the
+# device.UCMM.precomputed_key of the Identity and TCPIP Attributes it was computed from.  Subsequent
+# identical List Identity requests (eg. a discovery broadcast) are answered with a copy (w/ their
+# own sender_context), 'til one of those Attributes is changed (or replaced).
+list_identity_reply		= None
+list_identity_fields		= device.UCMM.LISTIDENT_SOCKADDR + device.UCMM.LISTIDENT_IDENTITY
+
+def enip_srv_udp_datagram( machine, msg, addr, enip_process, sendto, **kwds ):
+    """Parse and process one datagram containing exactly one complete EtherNet/IP request from the
+    peer addr, sending any response via sendto( rpy, addr ), and updating the peer's stats.
+
+    """
+    global list_identity_reply
+    source			= cpppo.rememberable( msg )
+    data			= cpppo.dotdict()
+    stats			= None
+    begun			= cpppo.timer()
+    try:
+        stats,_			= stats_for( addr )
+        assert not stats.get( 'eof' ), \
+            "Ignoring UDP request from client %r: %r" % ( addr, msg )
+        with connections_lock:
+            stats['received']  += len( msg )
+        if log.getEffectiveLevel() <= logging.DETAIL:
+            log.detail( "%s recv: %5d: %s", machine.name_centered(),
+                        len( msg ), cpppo.reprlib.repr( msg ))
+
+        # A List Identity request is a bare 24-byte header w/ command 0x0063.  If we've previously
+        # produced the reply to an identical request, and none of its Attributes has since changed,
+        # use it.
+        key			= None
+        if len( msg ) == 24 and bytes( msg[:2] ) == b'\x63\x00':
+            key			= bytes( msg[:12] + msg[20:] )
+            _,state		= device.UCMM.precomputed_key( list_identity_fields )
+            cached		= list_identity_reply
+            if cached and cached[0] == key and cached[1] == state:
+                rpy		= cached[2][:12] + bytes( msg[12:20] ) + cached[2][20:]
+                with connections_lock:
+                    stats['requests']  += 1
+                    stats['processed']	= len( msg )
+                if metrics.enabled:
+                    metrics.record( 'command', metrics.command_name( 0x0063 ), size=len( rpy ),
+                                    latency=cpppo.timer() - begun )
+                sendto( rpy, addr )
+                log.detail( "Transaction complete after %7.3fs (cached List Identity)", cpppo.timer() - begun )
+                return
+
+        with machine:
+            with contextlib.closing( machine.run(
+                    path='request', source=source, data=data )) as engine:
+                for mch,sta in engine:
+                    if sta is None:
+                        assert source.peek() is not None, \
+                            "Incomplete UDP request from client %r" % ( addr )
+        if 'request' in data:
+            with connections_lock:
+                stats['requests']	+= 1
+        if enip_process( addr, data=data, **kwds ):
+            assert 'response.enip' in data, "Expected EtherNet/IP response; none found"
+            if 'input' not in data.response.enip or not data.response.enip.input:
+                log.warning( "Expected EtherNet/IP response encapsulated message; none found" )
+                assert data.response.enip.status, "If no/empty response payload, expected non-zero EtherNet/IP status"
+            rpy			= parser.enip_encode( data.response.enip )
+            if metrics.enabled:
+                metrics.record_command( data.response.enip, size=len( rpy ),
+                                        latency=cpppo.timer() - begun )
+            if log.getEffectiveLevel() <= logging.DETAIL:
+                log.detail( "%s send: %5d: %s", machine.name_centered(),
+                            len( rpy ), cpppo.reprlib.repr( rpy ))
+            if key and not data.response.enip.status:
+                list_identity_reply = ( key, state, bytes( rpy[:12] ) + b'\0' * 8 + bytes( rpy[20:] ))
+            sendto( rpy, addr )
+        log.detail( "Transaction complete after %7.3fs", cpppo.timer() - begun )
+        stats['processed']	= source.sent
+    except:
+        # Parsing failure.  Suck out some remaining input to give us some context, but don't re-raise
+        if stats:
+            stats['processed']	= source.sent
+        memory			= bytes( bytearray( source.memory ))
+        pos			= len( source.memory )
+        future			= bytes( bytearray( b for b in source ))
+        where			= "at %d total bytes:\n%s\n%s (byte %d)" % (
+            stats.get( 'processed', 0 ) if stats else 0,
+            repr( memory+future ), '-' * ( len( repr( memory ))-1 ) + '^', pos )
+        log.error( "Client %r EtherNet/IP error %s\n\nFailed with exception:\n%s\n", addr, where,
+                   ''.join( traceback.format_exception( *sys.exc_info() )))
+
+
+def enip_srv_tcp( conn, addr, name, enip_process, delay=None, rate=None, **kwds ):
     source			= cpppo.rememberable()
+    bucket			= cpppo.token_bucket( 0 ) if rate else None
+
+    # Delayed responses are scheduled on a heap of (due, sequence, response, span), instead of sleeping
+    # before each send; we continue to receive and parse (pipelined) requests 'til they're due.
+    # Each response is due no earlier than its predecessor, so they are sent in order.
+    pending			= []
+    sequence			= itertools.count()
+    latest			= 0	# The due time of the latest scheduled response
+
+    def transmit( drain=False ):
+        """Send all scheduled responses now due (or all of them, awaiting each, if drain).  Returns
+        the seconds 'til the next response is due, or None if none are pending."""
+        while pending:
+            due,_,rpy,spn	= pending[0]
+            now			= cpppo.timer()
+            if due > now:
+                if not drain:
+                    return due - now
+                time.sleep( due - now )
+            heapq.heappop( pending )
+            try:
+                conn.send( rpy )
+                if spn:
+                    spn.mark( 'sent' )
+            except socket.error as exc:
+                log.detail( "Session ended (client abandoned): %s", exc )
+                stats['eof']	= True
+                del pending[:]
+        return None
     with parser.enip_machine( name=name, context='enip' ) as machine:
         # We can be provided a dotdict() to contain our stats.  If one has been passed in, then this
         # means that our stats for this connection will be available to the web API; it may set
@@ -742,10 +1068,14 @@ def enip_srv_tcp( conn, addr, name, enip_process, delay=None, **kwds ):
         # via the web API thread (eg. stats.eof) are blocking 'til this thread wakes up and reads
         # them.  Thus, the web API will block setting .eof, and won't return to the caller until the
         # thread is actually in the process of shutting down.  Internally, we'll use __setitem__
-        # indexing to change stats values, so we don't block ourself!
+        # indexing to change stats values, so we don't block ourself!  If both the server.control and
+        # our stats are apidicts, any setattr on them notifies our wakeup, so we can await input
+        # indefinitely instead of polling every server.control.latency.
+        wak			= None
         try:
             assert addr, "EtherNet/IP CIP server for TCP/IP must be provided a peer address"
             stats,connkey	= stats_for( addr )
+            wak			= network.watch( kwds['server']['control'], stats )
             while not stats.eof:
                 data		= cpppo.dotdict()
 
@@ -753,6 +1083,7 @@ def enip_srv_tcp( conn, addr, name, enip_process, delay=None, **kwds ):
                 # If no/partial EtherNet/IP header received, parsing will fail with a NonTerminal
                 # Exception (dfa exits in non-terminal state).  Build data.request.enip:
                 begun		= cpppo.timer()
+                first		= begun if source.peek() is not None else None # (pipelined)
                 with contextlib.closing( machine.run(
                         path='request', source=source, data=data )) as engine:
                     # PyPy compatibility; avoid deferred destruction of generators
@@ -763,14 +1094,20 @@ def enip_srv_tcp( conn, addr, name, enip_process, delay=None, **kwds ):
                         # termination.  We will simulate non-blocking by looping on None (so we can
                         # check our options, in case they've been changed).  If we still have input
                         # available to process right now in 'source', we'll just check (0 timeout);
-                        # otherwise, use the specified server.control.latency.
+                        # otherwise, await our wakeup (if any), or use the server.control.latency.
                         msg	= None
                         while msg is None and not stats.eof:
-                            wait=( kwds['server']['control']['latency']
-                                   if source.peek() is None else 0 )
+                            wait=( 0 if source.peek() is not None
+                                   else None if wak is not None
+                                   else kwds['server']['control']['latency'] )
+                            due	= transmit()	# Send any responses due; await the next
+                            if due is not None:
+                                wait = due if wait is None else min( wait, due )
                             brx = cpppo.timer()
-                            msg	= network.recv( conn, timeout=wait )
+                            msg	= network.recv( conn, timeout=wait, wakeup=wak )
                             now = cpppo.timer()
+                            if wak is not None and msg is None:
+                                wak.clear()
                             ( log.detail if msg else log.debug )(
                                 "Transaction receive after %7.3fs (%5s bytes in %7.3f/%7.3fs)",
                                 now - begun, len( msg ) if msg is not None else "None",
@@ -786,6 +1123,8 @@ def enip_srv_tcp( conn, addr, name, enip_process, delay=None, **kwds ):
                                             machine.name_centered() )
                                 stats['eof']	= True
                             if msg is not None:
+                                if first is None and len( msg ):
+                                    first = now
                                 stats['received']+= len( msg )
                                 stats['eof']	= stats['eof'] or not len( msg )
                                 if log.getEffectiveLevel() <= logging.DETAIL:
@@ -806,8 +1145,26 @@ def enip_srv_tcp( conn, addr, name, enip_process, delay=None, **kwds ):
                 log.detail( "Transaction parsed  after %7.3fs", cpppo.timer() - begun )
                 # Terminal state and EtherNet/IP header recognized, or clean EOF (no partial
                 # message); process and return response
+                parsed		= cpppo.timer()
+                throttle	= 0
                 if 'request' in data:
                     stats['requests'] += 1
+                    # If rate limited, delay processing the request (and thus reading subsequent
+                    # requests) 'til it conforms to the session's rate.
+                    throttle	= throttle_for( rate, bucket ) if bucket else 0
+                    if throttle > 0:
+                        stats['throttled'] += 1
+                        log.detail( "%s throttled for %7.3fs", machine.name_centered(), throttle )
+                        time.sleep( throttle )
+                started		= cpppo.timer()	# Processing begins (after any throttling)
+                spn		= None
+                if tracing.depth and 'request' in data:
+                    spn		= tracing.begin( connkey, stats['requests'], first or begun )
+                    spn.mark( 'header', now=parsed )
+                    if throttle > 0:
+                        spn.mark( 'throttled', now=started )
+                    spn.command	= metrics.command_name( data.request.get( 'enip.command' ))
+                    data['trace'] = spn # so enip_process may mark its phases
                 try:
                     # enip_process must be able to handle no request (empty data), indicating the
                     # clean termination of the session if closed from this end (not required if
@@ -818,12 +1175,19 @@ def enip_srv_tcp( conn, addr, name, enip_process, delay=None, **kwds ):
                         # Produce an EtherNet/IP response carrying the encapsulated response data.
                         # If no encapsulated data, ensure we also return a non-zero EtherNet/IP
                         # status.  A non-zero status indicates the end of the session.
+                        if spn:
+                            spn.mark( 'processed' )
                         assert 'response.enip' in data, "Expected EtherNet/IP response; none found"
                         if 'input' not in data.response.enip or not data.response.enip.input:
                             log.warning( "Expected EtherNet/IP response encapsulated message; none found" )
                             assert data.response.enip.status, "If no/empty response payload, expected non-zero EtherNet/IP status"
 
                         rpy	= parser.enip_encode( data.response.enip )
+                        if spn:
+                            spn.mark( 'encoded' )
+                        if metrics.enabled:
+                            metrics.record_command( data.response.enip, size=len( rpy ),
+                                                    latency=cpppo.timer() - started )
                         if log.getEffectiveLevel() <= logging.DETAIL:
                             log.detail( "%s send: %5d: %s %s", machine.name_centered(),
                                         len( rpy ), cpppo.reprlib.repr( rpy ),
@@ -832,16 +1196,12 @@ def enip_srv_tcp( conn, addr, name, enip_process, delay=None, **kwds ):
                             # A delay (anything with a delay.value attribute) == #[.#] (converible
                             # to float) is ok; may be changed via web interface.
                             try:
-                                delayseconds = float( delay.value if hasattr( delay, 'value' ) else delay )
-                                if delayseconds > 0:
-                                    time.sleep( delayseconds )
+                                delayseconds = max( 0, float( delay.value if hasattr( delay, 'value' ) else delay ))
                             except Exception as exc:
                                 log.detail( "Unable to delay; invalid seconds: %r", delay )
-                        try:
-                            conn.send( rpy )
-                        except socket.error as exc:
-                            log.detail( "Session ended (client abandoned): %s", exc )
-                            stats['eof'] = True
+                        latest	= max( latest, cpppo.timer() + delayseconds ) # Never before any prior response
+                        heapq.heappush( pending, ( latest, next( sequence ), rpy, spn ))
+                        transmit()
                         if data.response.enip.status:
                             log.warning( "Session ended (server EtherNet/IP status: 0x%02x == %d)",
                                         data.response.enip.status, data.response.enip.status )
@@ -859,6 +1219,7 @@ def enip_srv_tcp( conn, addr, name, enip_process, delay=None, **kwds ):
                     enip_process( addr, data=cpppo.dotdict() ) # Terminate.
                     raise
 
+            transmit( drain=True )	# Session done; send any delayed responses
             stats['processed']	= source.sent
         except:
             # Parsing failure.  We're done.  Suck out some remaining input to give us some context.
@@ -875,6 +1236,8 @@ def enip_srv_tcp( conn, addr, name, enip_process, delay=None, **kwds ):
             # Not strictly necessary to close (network.server_main will discard the socket,
             # implicitly closing it), but we'll do it explicitly here in case the thread doesn't die
             # for some other reason.  Clean up the connections entry for this connection address.
+            if wak is not None:
+                network.unwatch( wak, kwds['server']['control'], stats )
             connections.pop( connkey, None )
             log.normal( "%s done; processed %3d request%s over %5d byte%s/%5d received (%d connections remain)", name,
                         stats.requests,  " " if stats.requests == 1  else "s",
@@ -884,6 +1247,397 @@ def enip_srv_tcp( conn, addr, name, enip_process, delay=None, **kwds ):
             conn.close()
 
 
+# 
+# The EtherNet/IP CIP asyncio Server
+# 
+# enip_srv_aio		-- Service all TCP/IP (and UDP/IP) peers from one asyncio event loop
+# enip_srv_aio_tcp	-- An asyncio.Protocol serving one TCP/IP peer
+# enip_srv_aio_udp	-- An asyncio.DatagramProtocol serving multiple UDP/IP peers
+# 
+# Instead of a Thread per connection polling network.recv every server.control.latency, all
+# sessions are driven by incoming data on one event loop.  Each session's parser.enip_machine
+# generator is simply suspended when it runs out of input, and resumed when more arrives.  The same
+# enip_process (eg. logix.process) and connections stats (visible to the web API) are used.
+# 
+class enip_srv_aio_tcp( asyncio.Protocol if asyncio else object ):
+    """Serve one EtherNet/IP client 'til EOF; equivalent to enip_srv_tcp, but driven by the asyncio
+    event loop.  Any delayed response is scheduled on the loop (each no earlier than its predecessor,
+    so responses remain in order), rather than blocking; we continue parsing and processing any
+    pipelined requests meanwhile.  If a network.wakeup is supplied, it is notified whenever our stats
+    are changed via setattr (eg. eof).
+
+    If a rate is supplied, any throttling delay is added to the response delay (the request is
+    processed at once, but its response and any further requests are delayed).  If accepting the
+    connection would exceed the 'limit' of concurrent sessions (or 'limit_peer' from its host), it is
+    closed immediately, and counted in server.control.rejected.
+
+    """
+    def __init__( self, loop, sessions, enip_process=None, delay=None, wakeup=None, rate=None,
+                  limit=None, limit_peer=None, **kwds ):
+        assert enip_process is not None, \
+            "Must specify an EtherNet/IP processing function via 'enip_process'"
+        self.loop		= loop
+        self.sessions		= sessions	# All active sessions, checked for stats.eof
+        self.wakeup		= wakeup
+        self.enip_process	= enip_process
+        self.delay		= delay
+        self.rate		= rate
+        self.bucket		= cpppo.token_bucket( 0 ) if rate else None
+        self.limit		= limit
+        self.limit_peer		= limit_peer
+        self.kwds		= kwds
+        self.transport		= None
+        self.addr		= None
+        self.name		= None
+        self.stats		= None
+        self.connkey		= None
+        self.machine		= None
+        self.source		= cpppo.rememberable()
+        self.engine		= None		# The parser.enip_machine generator, if a request is in progress
+        self.data		= None
+        self.begun		= None
+        self.first		= None		# When the first byte of the current request arrived
+        self.pending		= []		# Heap of delayed responses: ( due, sequence, response, span )
+        self.sequence		= itertools.count()
+        self.latest		= 0		# The due time of the latest scheduled response
+        self.closing		= False		# Close once all pending responses are sent
+        self.closed		= False
+        self.scheduled		= None		# The loop.call_at handle for the next due response
+
+    def connection_made( self, transport ):
+        self.transport		= transport
+        self.addr		= transport.get_extra_info( 'peername' )[:2]
+        self.name		= "enip_%s" % ( self.addr[1] )
+        active			= [ session.addr for session in self.sessions ]
+        if ( self.limit and len( active ) >= self.limit
+             or self.limit_peer and sum( a[0] == self.addr[0] for a in active ) >= self.limit_peer ):
+            log.warning( "Rejecting connection from %r; %d connections active (limit %s, %s per peer)",
+                         self.addr, len( active ), self.limit, self.limit_peer )
+            control		= self.kwds.get( 'server', {} ).get( 'control' )
+            if control is not None:
+                control['rejected'] = control.get( 'rejected', 0 ) + 1
+            transport.close()
+            return
+        log.normal( "EtherNet/IP Server %s begins serving peer %s", self.name, self.addr )
+        conn			= transport.get_extra_info( 'socket' )
+        try:
+            conn.setsockopt( socket.IPPROTO_TCP, socket.TCP_NODELAY, 1 )
+        except Exception as exc:
+            log.warning( "%s unable to set TCP_NODELAY for client %r: %s",
+                         self.name, self.addr, exc )
+        try:
+            conn.setsockopt( socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1 )
+        except Exception as exc:
+            log.warning( "%s unable to set SO_KEEPALIVE for client %r: %s",
+                         self.name, self.addr, exc )
+        self.stats,self.connkey	= stats_for( self.addr )
+        if self.wakeup is not None:
+            self.stats._watch( self.wakeup.notify )
+        self.machine		= parser.enip_machine( name=self.name, context='enip' )
+        self.sessions.add( self )
+        self.begin()
+
+    def begin( self ):
+        """Start parsing the next request; it will await input."""
+        self.source.forget()
+        self.data		= cpppo.dotdict()
+        self.begun		= cpppo.timer()
+        self.first		= self.begun if self.source.peek() is not None else None # (pipelined)
+        self.engine		= self.machine.run( path='request', source=self.source, data=self.data )
+
+    def data_received( self, msg ):
+        if self.first is None:
+            self.first		= cpppo.timer()
+        self.stats['received']+= len( msg )
+        if log.getEffectiveLevel() <= logging.DETAIL:
+            log.detail( "%s recv: %5d: %s", self.machine.name_centered(),
+                        len( msg ), cpppo.reprlib.repr( msg ))
+        self.source.chain( msg )
+        self.advance()
+
+    def eof_received( self ):
+        self.stats['eof']	= True
+        self.advance()		# Allow any request in progress to terminate cleanly (or fail)
+        return bool( self.pending ) # ... and close the transport (once any delayed responses are sent)
+
+    def terminate( self ):
+        """End the session (eg. due to stats.eof, or server done/disable); any request awaiting input
+        terminates (cleanly, if no partial request has been received), and the transport is closed."""
+        self.stats['eof']	= True
+        if self.engine is not None:
+            self.advance()
+        self.closed		= True
+        self.transport.close()
+
+    def connection_lost( self, exc ):
+        self.closed		= True
+        if self.stats is None:
+            return			# Rejected by admission control
+        if exc is not None:
+            log.detail( "Session ended (client abandoned): %s", exc )
+        self.stats['eof']	= True
+        if self.engine is not None:
+            self.advance()
+        self.stats['processed']	= self.source.sent
+        self.sessions.discard( self )
+        if self.wakeup is not None:
+            self.stats._unwatch( self.wakeup.notify )
+        connections.pop( self.connkey, None )
+        log.normal( "%s done; processed %3d request%s over %5d byte%s/%5d received (%d connections remain)", self.name,
+                    self.stats.requests,  " " if self.stats.requests == 1  else "s",
+                    self.stats.processed, " " if self.stats.processed == 1 else "s", self.stats.received,
+                    len( connections ))
+
+    def advance( self ):
+        """Run the EtherNet/IP parser over all available input, processing each complete request.  Returns
+        when more input is required, while awaiting a delayed response, or when the session ends.
+
+        """
+        try:
+            with self.machine:
+                while self.engine is not None:
+                    for mch,sta in self.engine:
+                        if sta is None and self.source.peek() is None and not self.stats['eof']:
+                            return	# No more transitions available.  Await input (or EOF).
+                    self.engine	= None
+                    log.detail( "Transaction parsed  after %7.3fs", cpppo.timer() - self.begun )
+                    self.respond()
+        except:
+            # Parsing failure.  We're done.  Suck out some remaining input to give us some context.
+            self.engine		= None
+            self.stats['processed'] = self.source.sent
+            memory		= bytes( bytearray( self.source.memory ))
+            pos			= len( self.source.memory )
+            future		= bytes( bytearray( b for b in self.source ))
+            where		= "at %d total bytes:\n%s\n%s (byte %d)" % (
+                self.stats.processed, repr( memory+future ), '-' * ( len( repr( memory ))-1) + '^', pos )
+            log.error( "EtherNet/IP error %s\n\nFailed with exception:\n%s\n", where,
+                         ''.join( traceback.format_exception( *sys.exc_info() )))
+            self.transport.close()
+
+    def respond( self ):
+        """Process the parsed request (if any), and send (or schedule) its response."""
+        data			= self.data
+        parsed			= cpppo.timer()
+        if 'request' in data:
+            self.stats['requests'] += 1
+        rpy			= None
+        delayseconds		= 0	# response delay (if any)
+        throttle		= 0	# rate limiting delay (if any)
+        if self.bucket and 'request' in data:
+            throttle		= throttle_for( self.rate, self.bucket )
+            if throttle > 0:
+                self.stats['throttled'] += 1
+                log.detail( "%s throttled for %7.3fs", self.machine.name_centered(), throttle )
+        spn			= None
+        if tracing.depth and 'request' in data:
+            spn			= tracing.begin( self.connkey, self.stats['requests'], self.first or self.begun )
+            spn.mark( 'header', now=parsed )
+            if throttle > 0: # The response (and any further requests) are delayed 'til then
+                spn.mark( 'throttled', now=parsed + throttle )
+            spn.command		= metrics.command_name( data.request.get( 'enip.command' ))
+            data['trace']	= spn	# so enip_process may mark its phases
+        try:
+            # enip_process must be able to handle no request (empty data), indicating the clean
+            # termination of the session if closed from this end.
+            if self.enip_process( self.addr, data=data, **self.kwds ):
+                if spn:
+                    spn.mark( 'processed' )
+                assert 'response.enip' in data, "Expected EtherNet/IP response; none found"
+                if 'input' not in data.response.enip or not data.response.enip.input:
+                    log.warning( "Expected EtherNet/IP response encapsulated message; none found" )
+                    assert data.response.enip.status, "If no/empty response payload, expected non-zero EtherNet/IP status"
+
+                rpy		= parser.enip_encode( data.response.enip )
+                if spn:
+                    spn.mark( 'encoded' )
+                if metrics.enabled:
+                    metrics.record_command( data.response.enip, size=len( rpy ),
+                                            latency=cpppo.timer() - parsed )
+                if log.getEffectiveLevel() <= logging.DETAIL:
+                    log.detail( "%s send: %5d: %s %s", self.machine.name_centered(),
+                                len( rpy ), cpppo.reprlib.repr( rpy ),
+                                ("delay: %r" % self.delay) if self.delay else "" )
+                if self.delay:
+                    try:
+                        delayseconds = float( self.delay.value if hasattr( self.delay, 'value' ) else self.delay )
+                    except Exception as exc:
+                        log.detail( "Unable to delay; invalid seconds: %r", self.delay )
+                if data.response.enip.status:
+                    log.warning( "Session ended (server EtherNet/IP status: 0x%02x == %d)",
+                                data.response.enip.status, data.response.enip.status )
+                    self.stats['eof'] = True
+            else:
+                # Session terminated.  No response, just drop connection.
+                if log.getEffectiveLevel() <= logging.DETAIL:
+                    log.detail( "Session ended (client initiated): %s",
+                                parser.enip_format( data ))
+                self.stats['eof'] = True
+        except:
+            log.error( "Failed request: %s", parser.enip_format( data ))
+            self.enip_process( self.addr, data=cpppo.dotdict() ) # Terminate.
+            raise
+
+        if rpy is not None:
+            self.latest		= max( self.latest, self.loop.time() + delayseconds + throttle )
+            heapq.heappush( self.pending, ( self.latest, next( self.sequence ), rpy, spn ))
+            self.transmit()
+        if throttle > 0:
+            # Rate limited; read and process no further requests 'til the session conforms
+            self.transport.pause_reading()
+            self.loop.call_later( throttle, self.complete, delayseconds + throttle, True )
+        else:
+            self.complete( delayseconds )
+
+    def transmit( self ):
+        """Send all scheduled responses now due, and schedule the next; close the transport once all
+        are sent, if the session is closing."""
+        while self.pending:
+            due,_,rpy,spn	= self.pending[0]
+            if due > self.loop.time():
+                if self.scheduled is None: # Responses are due in order; any is no later than this
+                    self.scheduled = self.loop.call_at( due, self.transmit_scheduled )
+                return
+            heapq.heappop( self.pending )
+            if not self.closed:
+                self.transport.write( rpy )
+                if spn:
+                    spn.mark( 'sent' )
+        if self.closing and not self.closed:
+            self.closed		= True
+            self.transport.close()
+
+    def transmit_scheduled( self ):
+        self.scheduled		= None
+        self.transmit()
+
+    def complete( self, delayseconds, resume=False ):
+        """Begin the next request (the response, if any, is sent when due); if throttled, resume reading
+        and processing input."""
+        log.detail( "Transaction complete after %7.3fs (w/ %7.3fs delay)",
+                    cpppo.timer() - self.begun, delayseconds )
+        if self.stats['eof']:
+            self.closing	= True
+            self.transmit()
+            return
+        self.begin()
+        if resume:
+            self.transport.resume_reading()
+            self.advance()
+
+
+class enip_srv_aio_udp( asyncio.DatagramProtocol if asyncio else object ):
+    """Processes UDP packets from multiple clients, as they arrive; equivalent to enip_srv_udp.  Each
+    datagram must contain exactly one complete EtherNet/IP request.  We'll respect the setting of
+    'eof' in a client's stats, and ignore requests from that client.
+
+    """
+    def __init__( self, enip_process=None, delay=None, rate=None, **kwds ):
+        assert enip_process is not None, \
+            "Must specify an EtherNet/IP processing function via 'enip_process'"
+        self.enip_process	= enip_process
+        self.kwds		= kwds
+        self.transport		= None
+        self.machine		= parser.enip_machine( name="enip_UDP", context='enip' )
+
+    def connection_made( self, transport ):
+        self.transport		= transport
+
+    def datagram_received( self, msg, addr ):
+        enip_srv_udp_datagram( self.machine, msg, addr, self.enip_process, self.transport.sendto, **self.kwds )
+
+
+def enip_srv_aio( address, kwargs=None, idle_service=None, reuse=True, tcp=True, udp=False,
+                  backlog=100, limit=None, limit_peer=None ):
+    """An asyncio alternative to network.server_main( ..., target=enip_srv ), serving all EtherNet/IP
+    TCP/IP (and optionally UDP/IP) sessions from a single event loop in the calling Thread, instead
+    of a Thread per session.  The kwargs are passed to each session (and thus on to its
+    enip_process), as for enip_srv.
+
+    Any sessions whose stats.eof has been set (eg. via the web API) are closed, and we return when
+    server.control.done or .disable is signalled (after closing all sessions).  If the server.control
+    (and each session's stats) is a cpppo.apidict, we are awakened immediately by a network.wakeup
+    registered with the event loop; otherwise, these are polled every server.control.latency.  The
+    idle_service function (if any) is invoked every server.control.latency.
+
+    The backlog, limit and limit_peer admission controls are as for network.server_main.
+
+    """
+    assert asyncio is not None, "The asyncio module is required; use Python 3.4+"
+    kwargs			= kwargs or {}
+    control			= kwargs.get( 'server', {} ).get( 'control', {} )
+    loop			= asyncio.new_event_loop()
+    sessions			= set()
+    servers			= []
+    endpoints			= []
+    wak				= network.watch( control )
+    control.setdefault( 'rejected', 0 )
+    log.normal( "enip_srv_aio server PID [%5d] running on %r", os.getpid(), address )
+    try:
+        if udp:
+            transport,_		= loop.run_until_complete( loop.create_datagram_endpoint(
+                lambda: enip_srv_aio_udp( **kwargs ), local_addr=( address[0] or '0.0.0.0', address[1] )))
+            endpoints.append( transport )
+        if tcp:
+            servers.append( loop.run_until_complete( loop.create_server(
+                lambda: enip_srv_aio_tcp( loop=loop, sessions=sessions, wakeup=wak,
+                                          limit=limit, limit_peer=limit_peer, **kwargs ),
+                host=address[0] or None, port=address[1], reuse_address=reuse, backlog=backlog,
+                reuse_port=reuse and hasattr( socket, 'SO_REUSEPORT' ) )))
+
+        def check():
+            """Check our control signals (but don't report them to any external API yet, if an apidict),
+            and close sessions signalled eof.  Reading stats.eof via attribute releases any apidict
+            setter (eg. web API) awaiting its reception.  Returns False iff we're done/disabled."""
+            if control.get( 'done' ) or control.get( 'disable' ):
+                loop.stop()
+                return False
+            for session in list( sessions ):
+                if session.stats.eof:
+                    log.detail( "%s done, due to stats.eof", session.name )
+                    session.terminate()
+            return True
+
+        def awaken():
+            wak.clear()
+            check()
+
+        def service():
+            """Periodically check (if we can't be awakened), and perform any idle_service."""
+            if not check():
+                return
+            if idle_service is not None:
+                idle_service()
+            if wak is None or idle_service is not None:
+                loop.call_later( float( control.get( 'latency', latency )), service )
+
+        if wak is not None:
+            loop.add_reader( wak.fileno(), awaken )
+        loop.call_soon( service )
+        loop.run_forever()
+    except KeyboardInterrupt as exc:
+        log.warning( "enip_srv_aio server termination: %r", exc )
+        control['done']		= True
+    finally:
+        for server in servers:
+            server.close()
+        for transport in endpoints:
+            transport.close()
+        for session in list( sessions ):
+            session.terminate()
+        for server in servers:
+            loop.run_until_complete( server.wait_closed() )
+        loop.call_soon( loop.stop )	# Run pending callbacks (eg. connection_lost), then stop
+        loop.run_forever()
+        if wak is not None:
+            loop.remove_reader( wak.fileno() )
+        loop.close()
+        network.unwatch( wak, control )
+    log.normal( "enip_srv_aio server PID [%5d] shutting down (%s)", os.getpid(),
+                "disabled" if control.get( 'disable' ) else "done" if control.get( 'done' ) else "unknown reason" )
+    return 0
+
+
 # To support re-opening a log file from within a signal handler, we need an atomic method to safely
 # close a FileHandler's self.stream (an open file), while it is certain to not be in use.  Under
 # Python2/3, FileHandler.close acquires locks preventing a race condition with FileHandler.emit.
@@ -903,6 +1657,8 @@ logrotate_signalled		= False
 def logrotate_request( signum, frame ):
     global logrotate_signalled
     logrotate_signalled		= True	
+    if hasattr( srv_ctl.get( 'control' ), '_wake' ):
+        srv_ctl.control._wake()		# Awaken the server, to promptly logrotate_perform
 
 def logrotate_perform():
     global logrotate_signalled
@@ -941,6 +1697,7 @@ def main( argv=None, attribute_class=device.Attribute, idle_service=None, identi
     global srv_ctl
     global latency
     global timeout
+    global udp_workers
 
     ap				= argparse.ArgumentParser(
         description = "Provide an EtherNet/IP Server",
@@ -963,6 +1720,9 @@ def main( argv=None, attribute_class=device.Attribute, idle_service=None, identi
                      help="Enable UDP/IP server (default: True)" )
     ap.add_argument( '-U', '--no-udp', dest="udp", action='store_false',
                      help="Disable UDP/IP server" )
+    ap.add_argument( '--udp-workers', type=int,
+                     default=udp_workers,
+                     help="Number of Threads parsing/processing UDP/IP requests (default: %d)" % ( udp_workers ))
     ap.add_argument( '-t', '--tcp', action='store_true',
                      default=True, 
                      help="Enable TCP/IP server (default: True)" )
@@ -979,9 +1739,28 @@ def main( argv=None, attribute_class=device.Attribute, idle_service=None, identi
                      default="",
                      help="Web API [interface]:[port] to bind to (default: %s, port 80)" % (
                          address[0] ))
+    ap.add_argument( '-i', '--io',
+                     default="",
+                     help="Implicit I/O (UDP) [interface]:[port] to bind to (default: %s, port %d)" % (
+                         address[0], implicit.address[1] ))
     ap.add_argument( '-d', '--delay',
                      default="0.0" ,
                      help="Delay response to each request by a certain number of seconds (default: 0.0)")
+    ap.add_argument( '-r', '--rate',
+                     default=None,
+                     help="Limit each session to a number of requests per second, in bursts of up to /# (eg. 100/10) (default: None)" )
+    ap.add_argument( '--max-connections', type=int,
+                     default=0,
+                     help="Reject TCP/IP connections exceeding this many concurrent sessions (per worker) (default: 0, unlimited)" )
+    ap.add_argument( '--max-peer-connections', type=int,
+                     default=0,
+                     help="Reject TCP/IP connections exceeding this many concurrent sessions from any one host (per worker) (default: 0, unlimited)" )
+    ap.add_argument( '--backlog', type=int,
+                     default=100,
+                     help="Maximum number of TCP/IP connections awaiting acceptance (default: 100)" )
+    ap.add_argument( '--trace', type=int,
+                     default=0,
+                     help="Record the timing of each request's phases, retaining this many per connection (default: 0, disabled)" )
     ap.add_argument( '-s', '--size',
                      help="Limit EtherNet/IP encapsulated request size to the specified number of bytes (default: None)",
                      default=None )
@@ -992,6 +1771,14 @@ def main( argv=None, attribute_class=device.Attribute, idle_service=None, identi
     ap.add_argument( '-S', '--simple', action='store_true',
                      default=False,
                      help="Simulate a simple (non-routing) EtherNet/IP CIP device (eg. MicroLogix)")
+    ap.add_argument( '-A', '--asyncio', action='store_true',
+                     default=False,
+                     help="Serve all sessions from one asyncio event loop, instead of a Thread per session (Python 3.4+)" )
+    ap.add_argument( '-W', '--workers', type=int,
+                     default=1,
+                     help="Fork a number of server processes sharing the address and all Tag values (default: 1); "
+                     "Tags must be of fixed-size types (eg. not SSTRING).  Each process's web API (eg. "
+                     "/subscribe, /metrics) and List Identity cache observe only changes made by that process" )
     ap.add_argument( '-P', '--profile',
                      default=None,
                      help="Output profiling data to a file (default: None)" )
@@ -999,6 +1786,14 @@ def main( argv=None, attribute_class=device.Attribute, idle_service=None, identi
                      help="Any tags, their type (default: INT), and number (default: 1), eg: tag=INT[1000]")
 
     args			= ap.parse_args( argv )
+    udp_workers			= args.udp_workers
+    tracing.depth		= max( 0, args.trace )
+    assert not args.asyncio or asyncio, "Failed to import asyncio module; --asyncio option not available (Python 3.4+ required)"
+    assert args.workers >= 1, "Invalid --workers %r; must be at least 1" % args.workers
+    assert args.workers == 1 or hasattr( os, 'fork' ) and hasattr( socket, 'SO_REUSEPORT' ), \
+        "--workers requires os.fork and SO_REUSEPORT"
+    assert args.workers == 1 or not args.io, \
+        "Implicit I/O (--io) connections cannot be shared by multiple --workers"
 
     # Deduce interface:port address to bind, and correct types (default is address, above)
     bind			= args.address.split(':')
@@ -1088,6 +1883,16 @@ def main( argv=None, attribute_class=device.Attribute, idle_service=None, identi
         mutator.daemon		= True
         mutator.start()
 
+    # Specify a per-session request rate limit #[.#][/#].  Like options.delay, the options.rate is a
+    # dotdict() layer, so its .value (requests per second) and .burst may be changed via the web API.
+    if args.rate:
+        value,_,burst		= args.rate.partition( '/' )
+        options.rate		= cpppo.dotdict()
+        options.rate.value	= float( value )
+        options.rate.burst	= int( burst or 1 )
+        log.normal( "Limiting each session to %r requests/s, in bursts of up to %d",
+                    options.rate.value, options.rate.burst )
+
     # Create all the specified tags/Attributes.  The enip_process function will (somehow) assign the
     # given tag name to reference the specified Attribute.  We'll define an Attribute to print
     # I/O if args.print is specified; reads will only be logged at logging.NORMAL and above.
@@ -1188,9 +1993,17 @@ def main( argv=None, attribute_class=device.Attribute, idle_service=None, identi
             attribute		= device.lookup( cls, ins, att )
             '''
         if not attribute:
-            # No Attribute found
+            # No Attribute found.  If multiple --workers, its values must be in shared memory (and
+            # even scalar Tags must then be vectors of length 1).
+            if args.workers > 1:
+                if not hasattr( tag_class, 'struct_format' ):
+                    ap.error( "Tag %s of variable-length type %s cannot be shared by multiple --workers" % (
+                        tag_name, tag_class.__name__ ))
+                tag_value	= shared.shared_vector( tag_class, count=tag_size, default=tag_default )
+            else:
+                tag_value	= tag_default if tag_size == 1 else [tag_default] * tag_size
             attribute		= ( Attribute_print if args.print else attribute_class )(
-                tag_name, tag_class, default=( tag_default if tag_size == 1 else [tag_default] * tag_size ))
+                tag_name, tag_class, default=tag_value )
             '''
             if tag_address:
                 # We're doing the Tag --> cls/ins/att assignment, and it didn't exist.  Place it in
@@ -1250,6 +2063,32 @@ def main( argv=None, attribute_class=device.Attribute, idle_service=None, identi
     if connection_manager_class:
         options.setdefault( 'connection_manager_class', connection_manager_class )
 
+    # Multiple --workers
+
+    # Fork the additional worker processes, before starting any other Threads.  Each worker binds
+    # its own listening socket to the same address (network.server_main and enip_srv_aio use
+    # SO_REUSEPORT), so the kernel distributes incoming connections between them.  All Tag values
+    # are in shared memory (above), so writes by any worker are seen by all.  Only the original
+    # process (worker 0) serves UDP/IP and the Web API; it terminates the others when done.
+    worker,workers		= 0,[]
+    for w in range( 1, args.workers ):
+        pid			= os.fork()
+        if pid == 0:
+            worker,workers	= w,[]
+            break
+        workers.append( pid )
+    if worker:
+        parent			= os.getppid()
+        def orphaned():
+            if os.getppid() != parent:
+                logging.warning( "EtherNet/IP Server worker %d orphaned; terminating", worker )
+                srv_ctl.control['done'] = True
+        idle_service.append( orphaned )
+        args.udp		= False
+        args.web		= ""
+    elif workers:
+        logging.normal( "EtherNet/IP Server workers: %r", [ os.getpid() ] + workers )
+
     # The Web API
 
     # Deduce web interface:port address to bind, and correct types (default is address, above).
@@ -1269,6 +2108,23 @@ def main( argv=None, attribute_class=device.Attribute, idle_service=None, identi
         webserver.daemon	= True
         webserver.start()
 
+    # Implicit (Class 0/1) I/O
+
+    # Deduce the implicit I/O interface:port address to bind, similarly to the Web API.  Forward
+    # Open requests establishing I/O connections are accepted regardless, but their data is only
+    # produced/consumed if a non-empty --io was provided (usually just --io :, for port 2222).
+    io				= args.io.split( ':', 1 )
+    assert 1 <= len( io ) <= 2, "Invalid --io [<interface>][:<port>]: %s" % args.io
+    io				= ( str( io[0] ) if io[0] else bind[0],
+                                    int( io[1] ) if len( io ) > 1 and io[1] else implicit.address[1] )
+
+    if args.io:
+        logging.normal( "EtherNet/IP Simulator Implicit I/O Server: %r" % ( io, ))
+        ioserver		= threading.Thread( target=implicit.io_server,
+                                                    kwargs={'address': io, 'server': srv_ctl, 'latency': latency} )
+        ioserver.daemon		= True
+        ioserver.start()
+
         
     # The EtherNet/IP Simulator.  Pass all the top-level options keys/values as keywords, and pass
     # the entire tags dotdict as a tags=... keyword.  The server_main server.control signals (.done,
@@ -1276,7 +2132,9 @@ def main( argv=None, attribute_class=device.Attribute, idle_service=None, identi
     # timeout; this will block the web API for several seconds to allow all threads to respond to
     # the signals delivered via the web API.
     logging.normal( "EtherNet/IP Simulator: %r" % ( bind, ))
-    kwargs			= dict( options, latency=latency, size=args.size, tags=tags, server=srv_ctl )
+    # (dict.items, not the dotdict's flattened 'delay.value' keys; option layers like options.delay
+    # must be shared w/ the web API).
+    kwargs			= dict( dict.items( options ), latency=latency, size=args.size, tags=tags, server=srv_ctl )
 
     tf				= network.server_thread
     tf_kwds			= dict()
@@ -1284,19 +2142,39 @@ def main( argv=None, attribute_class=device.Attribute, idle_service=None, identi
         tf			= network.server_thread_profiling
         tf_kwds['filename']	= args.profile
 
+    # Only if we have idle services to perform must the server poll every latency; otherwise, it
+    # awaits I/O indefinitely, awakened via its srv_ctl.control apidict.
+    idle_services		= ( lambda: [ f() for f in idle_service ] ) if idle_service else None
+
     disabled			= False	# Recognize toggling between en/disabled
     while not srv_ctl.control.done:
         if not srv_ctl.control.disable:
             if disabled:
                 logging.detail( "EtherNet/IP Server enabled" )
                 disabled= False
-            network.server_main( address=bind, target=enip_srv, kwargs=kwargs,
-                                 idle_service=lambda: map( lambda f: f(), idle_service ),
-                                 udp=args.udp, tcp=args.tcp, thread_factory=tf, **tf_kwds )
+            if args.asyncio:
+                enip_srv_aio( address=bind, kwargs=kwargs,
+                              idle_service=idle_services,
+                              udp=args.udp, tcp=args.tcp, backlog=args.backlog,
+                              limit=args.max_connections, limit_peer=args.max_peer_connections )
+            else:
+                network.server_main( address=bind, target=enip_srv, kwargs=kwargs,
+                                     idle_service=idle_services,
+                                     udp=args.udp, tcp=args.tcp, backlog=args.backlog,
+                                     limit=args.max_connections, limit_peer=args.max_peer_connections,
+                                     thread_factory=tf, **tf_kwds )
         else:
             if not disabled:
                 logging.detail( "EtherNet/IP Server disabled" )
                 disabled= True
             time.sleep( latency )            # Still disabled; wait a bit
 
+    if worker:
+        os._exit( 0 )			# Forked worker; never return to our caller
+    for pid in workers:
+        try:
+            os.kill( pid, signal.SIGTERM )
+            os.waitpid( pid, 0 )
+        except OSError as exc:
+            logging.warning( "EtherNet/IP Server worker PID [%5d] termination failed: %s", pid, exc )
     return 0
@@ -0,0 +1,189 @@
+#! /usr/bin/env python3
+
+#
+# Cpppo -- Communication Protocol Python Parser and Originator
+#
+# Copyright (c) 2013, Hard Consulting Corporation.
+#
+# Cpppo is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.  See the LICENSE file at the top of the source tree.
+#
+# Cpppo is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+__author__                      = "Perry Kundert"
+__email__                       = "perry@hardconsulting.com"
+__copyright__                   = "Copyright (c) 2013 Hard Consulting Corporation"
+__license__                     = "Dual License: GPLv3 (or later) and Commercial (see LICENSE)"
+
+
+"""
+enip.metrics	-- Request counts, sizes, errors and latency distributions of an EtherNet/IP server
+
+    Each EtherNet/IP encapsulation command processed by a server session (eg. "SendRRData", "List
+Identity") is recorded in the 'command' group, w/ the latency from receipt of the complete request
+'til its response was ready.  Each CIP service request (eg. "Read Tag", "Multiple Service Packet")
+processed by logix.process is recorded in the 'service' group, and in the 'tag' group under the Tag
+(or @class/instance/attribute address) it targets, w/ the latency of the EtherNet/IP request
+carrying it.  Services carried by a Multiple Service Packet are each recorded (w/ the Multiple
+Service Packet's latency), as is the Multiple Service Packet itself.
+
+    For each, the count of requests, their (encoded response) size in bytes, the count of those which
+failed, and a histogram of their latencies are maintained, so percentiles (eg. p99) are available,
+not just totals.  See report (a JSON-compatible dict) and text (a Prometheus-style text exposition);
+both are served by the web API's /metrics endpoint.
+
+"""
+
+__all__				= ['enabled', 'record', 'record_command', 'observe', 'report', 'text', 'reset']
+
+import logging
+import threading
+
+from ... import misc
+from . import device
+
+log				= logging.getLogger( "enip.mtr" )
+
+enabled				= True		# Set False to eliminate all instrumentation overhead
+
+COMMANDS			= {
+    0x0001:	"Legacy",
+    0x0004:	"List Services",
+    0x0063:	"List Identity",
+    0x0064:	"List Interfaces",
+    0x0065:	"Register Session",
+    0x0066:	"Unregister Session",
+    0x006f:	"SendRRData",
+    0x0070:	"SendUnitData",
+}
+
+GROUPS				= ( 'command', 'service', 'tag' )
+
+
+class metric( object ):
+    """The request count, total bytes, error count and latency histogram of one command/service/tag."""
+    def __init__( self ):
+        self.requests		= 0
+        self.bytes		= 0
+        self.errors		= 0
+        self.latency		= misc.histogram()
+
+    def record( self, size=0, error=False, latency=None ):
+        self.requests	       += 1
+        self.bytes	       += size
+        if error:
+            self.errors	       += 1
+        if latency is not None:
+            self.latency.record( latency )
+
+    def summary( self ):
+        return dict( requests=self.requests, bytes=self.bytes, errors=self.errors,
+                     latency=self.latency.summary() )
+
+
+lock				= threading.Lock()
+groups				= dict( ( g, {} ) for g in GROUPS )
+
+
+def reset():
+    with lock:
+        for g in GROUPS:
+            groups[g].clear()
+
+
+def record( group, name, size=0, error=False, latency=None ):
+    """Record one request of the named command/service/tag in group."""
+    with lock:
+        entry			= groups[group].get( name )
+        if entry is None:
+            entry = groups[group][name] = metric()
+        entry.record( size=size, error=error, latency=latency )
+
+
+def command_name( command ):
+    """The name of an EtherNet/IP encapsulation command number"""
+    name			= COMMANDS.get( command )
+    return name if name else "Command 0x%04x" % ( command or 0 )
+
+
+def record_command( enip, size, latency ):
+    """Record the EtherNet/IP encapsulation command processed into the response enip (eg. the
+    data.response.enip of a processed request), w/ the given encoded response size and latency."""
+    record( 'command', command_name( enip.get( 'command' )), size=size,
+            error=bool( enip.get( 'status' )), latency=latency )
+
+
+def service_name( service ):
+    """The name of a CIP service request (or reply) number"""
+    name			= device.Object.service.get( service & 0x7F )
+    return name if name else "Service 0x%02x" % ( service & 0x7F )
+
+
+def tag_name( path ):
+    """The Tag (or @class/instance/attribute address) targeted by a request path, or None."""
+    segments			= path.get( 'segment' ) if path else None
+    if not segments:
+        return None
+    symbols			= [ seg['symbolic'] for seg in segments if 'symbolic' in seg ]
+    if symbols:
+        return '.'.join( symbols )
+    address			= [ str( seg[k] ) for seg in segments for k in ( 'class', 'instance', 'attribute' )
+                                    if k in seg ]
+    return '@' + '/'.join( address ) if address else None
+
+
+def observe( response, latency ):
+    """Record each CIP service request carried by the response (a processed EtherNet/IP request) in
+    the 'service' and 'tag' groups, w/ the given latency."""
+    for item in response.get( 'enip.CIP.send_data.CPF.item', [] ):
+        for key in ( 'unconnected_send.request', 'connection_data.request' ):
+            if key in item:
+                observe_request( item[key], latency )
+
+
+def observe_request( request, latency ):
+    if 'service' not in request:
+        return
+    size			= len( request.get( 'input', b'' ))
+    error			= bool( request.get( 'status' ))
+    record( 'service', service_name( request.service ), size=size, error=error, latency=latency )
+    tag				= tag_name( request.get( 'path' ))
+    if tag:
+        record( 'tag', tag, size=size, error=error, latency=latency )
+    for sub in request.get( 'multiple.request', [] ):
+        observe_request( sub, latency )
+
+
+def report():
+    """A JSON-compatible dict of each group's {name: summary, ...}"""
+    with lock:
+        return dict( ( g, dict( ( n, m.summary() ) for n,m in groups[g].items() )) for g in GROUPS )
+
+
+def text():
+    """A Prometheus-style text exposition of every metric; latencies are in seconds."""
+    lines			= []
+    def label( group, name ):
+        return '%s="%s"' % ( group, str( name ).replace( '\\', '\\\\' ).replace( '"', '\\"' ))
+    for group,entries in sorted( report().items() ):
+        for name,summary in sorted( entries.items() ):
+            lbl			= label( group, name )
+            for field in ( 'requests', 'bytes', 'errors' ):
+                lines.append( 'enip_%s_%s{%s} %d' % ( group, field, lbl, summary[field] ))
+            lat			= summary['latency']
+            for q,key in ( ( '0.5', 'p50' ), ( '0.9', 'p90' ), ( '0.99', 'p99' ), ( '0.999', 'p999' )):
+                if lat[key] is not None:
+                    lines.append( 'enip_%s_latency_seconds{%s,quantile="%s"} %.6f' % (
+                        group, lbl, q, lat[key] ))
+            lines.append( 'enip_%s_latency_seconds_sum{%s} %.6f' % ( group, lbl, lat['total'] ))
+            lines.append( 'enip_%s_latency_seconds_count{%s} %d' % ( group, lbl, lat['count'] ))
+    return '\n'.join( lines ) + '\n'
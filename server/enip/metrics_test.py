@@ -0,0 +1,59 @@
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+import json
+import logging
+
+import cpppo
+from . import device, logix, metrics, parser
+
+log				= logging.getLogger( "enip.mtr" )
+
+
+def test_metrics_observe():
+    """Each CIP service (and any Services in a Multiple Service Packet) is recorded by service and Tag."""
+    device.lookup_reset()
+    Obj				= logix.Logix( instance_id=1 )
+    Obj.attribute['1']		= device.Attribute( 'SCADA', parser.INT, default=[ 0 ] * 10 )
+    device.redirect_tag( 'SCADA', { 'class': Obj.class_id, 'instance': Obj.instance_id, 'attribute': 1 })
+
+    def request( service, path, **kwds ):
+        return cpppo.dotdict( service=service, path={ 'segment': [
+            cpppo.dotdict( d ) for d in path ]}, **kwds )
+    read			= request( Obj.RD_TAG_REQ, [ {'symbolic': 'SCADA'}, {'element': 1} ],
+                                           read_tag=cpppo.dotdict( elements=2 ))
+    bad				= request( Obj.RD_TAG_REQ, [ {'symbolic': 'SCADA'}, {'element': 20} ],
+                                           read_tag=cpppo.dotdict( elements=2 ))
+    ga				= request( Obj.GA_SNG_REQ, [ {'class': Obj.class_id}, {'instance': 1}, {'attribute': 1} ],
+                                           get_attribute_single=True )
+    for req in ( read, bad, ga ):
+        Obj.request( req )
+    assert read.status == 0 and bad.status != 0
+
+    response			= cpppo.dotdict()
+    response['enip.CIP.send_data.CPF.item'] = [ cpppo.dotdict() ] + [
+        cpppo.dotdict( { 'unconnected_send.request': r } ) for r in ( read, bad ) ]
+    metrics.reset()
+    metrics.observe( response, .002 )
+    metrics.observe( cpppo.dotdict( { 'enip.CIP.send_data.CPF.item': [
+        cpppo.dotdict( { 'unconnected_send.request': ga } ) ]} ), .001 )
+    metrics.record_command( cpppo.dotdict( command=0x006f, status=0 ), size=50, latency=.003 )
+
+    report			= metrics.report()
+    log.normal( "Metrics: %s", json.dumps( report, indent=4, sort_keys=True ))
+    svc				= report['service'][Obj.RD_TAG_NAM]
+    assert svc['requests'] == 2 and svc['errors'] == 1
+    assert svc['bytes'] == len( read.input ) + len( bad.input )
+    assert svc['latency']['count'] == 2 and svc['latency']['p99'] == .002
+    assert report['tag']['SCADA']['requests'] == 2
+    assert report['service'][device.Object.GA_SNG_NAM]['requests'] == 1
+    assert report['tag']['@2/1/1']['requests'] == 1 and report['tag']['@2/1/1']['errors'] == 0
+    assert report['command']['SendRRData']['bytes'] == 50
+
+    text			= metrics.text()
+    assert 'enip_service_requests{service="Read Tag"} 2\n' in text
+    assert 'enip_tag_latency_seconds{tag="SCADA",quantile="0.99"} 0.002000\n' in text
+    assert 'enip_command_latency_seconds_count{command="SendRRData"} 1\n' in text
+    metrics.reset()
+    assert not metrics.report()['service']
@@ -1049,6 +1049,242 @@ class unconnected_send( cpppo.dfa ):
         return result
 
 
+class forward_open( cpppo.dfa ):
+    """See CIP Specification, Vol. 1, Chapter 3, 3-5.5.2.  The Connection Manager Forward Open (0x54)
+    request establishes an implicit (eg. Class 1 I/O) or explicit connection.  Following the service
+    code and the (Connection Manager) path, the request payload contains:
+
+        .forward_open.priority_time_tick	USINT
+        .forward_open.timeout_ticks		USINT
+        .forward_open.O_T.connection_ID		UDINT		Chosen by the target (consumer)
+        .forward_open.T_O.connection_ID		UDINT		Chosen by the originator (consumer)
+        .forward_open.connection_serial		UINT
+        .forward_open.O_vendor			UINT		Originator Vendor ID
+        .forward_open.O_serial			UDINT		Originator Serial Number
+        .forward_open.connection_timeout_multiplier USINT	Timeout is RPI * 4 << multiplier
+        				 	USINT[3]	(reserved)
+        .forward_open.O_T.RPI			UDINT		Requested Packet Interval (us)
+        .forward_open.O_T.NCP			WORD		Network Connection Parameters
+        .forward_open.T_O.RPI			UDINT
+        .forward_open.T_O.NCP			WORD
+        .forward_open.transport_class_triggers	USINT
+        .forward_open.connection_path		EPATH		eg. @4/<config>/<O_T point>/<T_O point>
+
+    The Network Connection Parameters WORD contains the connection size (in bytes, including any
+    sequence count and Run/Idle header) in bits 0-8, and the connection type in bits 13-14 (0: Null,
+    1: Multicast, 2: Point-to-point).
+
+    """
+    def __init__( self, name=None, **kwds ):
+        name 			= name or kwds.setdefault( 'context', self.__class__.__name__ )
+
+        prio			= USINT(	context='priority_time_tick' )
+        prio[True]	= timo	= USINT(	context='timeout_ticks' )
+        timo[True]	= otid	= UDINT(	context='O_T',		extension='.connection_ID' )
+        otid[True]	= toid	= UDINT(	context='T_O',		extension='.connection_ID' )
+        toid[True]	= csrl	= UINT(		context='connection_serial' )
+        csrl[True]	= ovnd	= UINT(		context='O_vendor' )
+        ovnd[True]	= osrl	= UDINT(	context='O_serial' )
+        osrl[True]	= tmul	= USINT(	context='connection_timeout_multiplier' )
+        tmul[True]	= rsvd	= octets_drop(	'reserved',	repeat=3 )
+        rsvd[True]	= otrp	= UDINT(	context='O_T',		extension='.RPI' )
+        otrp[True]	= otnc	= WORD(		context='O_T',		extension='.NCP' )
+        otnc[True]	= torp	= UDINT(	context='T_O',		extension='.RPI' )
+        torp[True]	= tonc	= WORD(		context='T_O',		extension='.NCP' )
+        tonc[True]	= trns	= USINT(	context='transport_class_triggers' )
+        trns[True]		= EPATH(	context='connection_path',
+                                                terminal=True )
+
+        super( forward_open, self ).__init__( name=name, initial=prio, **kwds )
+
+    @classmethod
+    def produce( cls, data ):
+        result			= b''
+        result		       += USINT.produce( data.get( 'priority_time_tick', 0x0a ))
+        result		       += USINT.produce( data.get( 'timeout_ticks', 0x0e ))
+        result		       += UDINT.produce( data.get( 'O_T.connection_ID', 0 ))
+        result		       += UDINT.produce( data.get( 'T_O.connection_ID', 0 ))
+        result		       += UINT.produce( data.connection_serial )
+        result		       += UINT.produce( data.O_vendor )
+        result		       += UDINT.produce( data.O_serial )
+        result		       += USINT.produce( data.get( 'connection_timeout_multiplier', 0 ))
+        result		       += b'\x00' * 3
+        result		       += UDINT.produce( data.O_T.RPI )
+        result		       += WORD.produce( data.O_T.NCP )
+        result		       += UDINT.produce( data.T_O.RPI )
+        result		       += WORD.produce( data.T_O.NCP )
+        result		       += USINT.produce( data.get( 'transport_class_triggers', 0x01 ))
+        result		       += EPATH.produce( data.connection_path )
+        return result
+
+
+class forward_open_reply( cpppo.dfa ):
+    """A successful Forward Open (0x54|0x80) reply payload, following the service, reserved and status:
+
+        .forward_open.O_T.connection_ID		UDINT
+        .forward_open.T_O.connection_ID		UDINT
+        .forward_open.connection_serial		UINT
+        .forward_open.O_vendor			UINT
+        .forward_open.O_serial			UDINT
+        .forward_open.O_T.API			UDINT		Actual Packet Interval (us)
+        .forward_open.T_O.API			UDINT
+        .forward_open.application_size		USINT		Application Reply size (in words)
+        					USINT		(reserved)
+        .forward_open.application		words[*]	.application_size
+
+    """
+    def __init__( self, name=None, **kwds ):
+        name 			= name or kwds.setdefault( 'context', 'forward_open' )
+
+        otid			= UDINT(	context='O_T',		extension='.connection_ID' )
+        otid[True]	= toid	= UDINT(	context='T_O',		extension='.connection_ID' )
+        toid[True]	= csrl	= UINT(		context='connection_serial' )
+        csrl[True]	= ovnd	= UINT(		context='O_vendor' )
+        ovnd[True]	= osrl	= UDINT(	context='O_serial' )
+        osrl[True]	= otap	= UDINT(	context='O_T',		extension='.API' )
+        otap[True]	= toap	= UDINT(	context='T_O',		extension='.API' )
+        toap[True]	= apsz	= USINT(	context='application_size' )
+        apsz[True]	= rsvd	= octets_drop(	'reserved',	repeat=1 )
+        rsvd[None]		= cpppo.decide(	'application',
+                            predicate=lambda path=None, data=None, **kwds: data[path+'.application_size'],
+                                                state=words( context='application',
+                                                             repeat='..application_size',
+                                                             terminal=True ))
+        rsvd[None]		= octets_noop(	'done',		terminal=True )
+
+        super( forward_open_reply, self ).__init__( name=name, initial=otid, **kwds )
+
+    @classmethod
+    def produce( cls, data ):
+        application		= octets_encode( data.application.input ) if 'application.input' in data else b''
+        result			= b''
+        result		       += UDINT.produce( data.O_T.connection_ID )
+        result		       += UDINT.produce( data.T_O.connection_ID )
+        result		       += UINT.produce( data.connection_serial )
+        result		       += UINT.produce( data.O_vendor )
+        result		       += UDINT.produce( data.O_serial )
+        result		       += UDINT.produce( data.O_T.API )
+        result		       += UDINT.produce( data.T_O.API )
+        result		       += USINT.produce( len( application ) // 2 )
+        result		       += b'\x00' # reserved
+        result		       += application
+        return result
+
+
+class forward_close( cpppo.dfa ):
+    """See CIP Specification, Vol. 1, Chapter 3, 3-5.5.3.  The Forward Close (0x4E) request closes a
+    connection established by a Forward Open; the connection is identified by the originator's
+    connection serial number, vendor ID and serial number triplet:
+
+        .forward_close.priority_time_tick	USINT
+        .forward_close.timeout_ticks		USINT
+        .forward_close.connection_serial	UINT
+        .forward_close.O_vendor			UINT
+        .forward_close.O_serial			UDINT
+        .forward_close.connection_path		EPATH_padded	(one reserved byte after size)
+
+    """
+    def __init__( self, name=None, **kwds ):
+        name 			= name or kwds.setdefault( 'context', self.__class__.__name__ )
+
+        prio			= USINT(	context='priority_time_tick' )
+        prio[True]	= timo	= USINT(	context='timeout_ticks' )
+        timo[True]	= csrl	= UINT(		context='connection_serial' )
+        csrl[True]	= ovnd	= UINT(		context='O_vendor' )
+        ovnd[True]	= osrl	= UDINT(	context='O_serial' )
+        osrl[True]		= EPATH_padded(	context='connection_path',
+                                                terminal=True )
+
+        super( forward_close, self ).__init__( name=name, initial=prio, **kwds )
+
+    @classmethod
+    def produce( cls, data ):
+        result			= b''
+        result		       += USINT.produce( data.get( 'priority_time_tick', 0x0a ))
+        result		       += USINT.produce( data.get( 'timeout_ticks', 0x0e ))
+        result		       += UINT.produce( data.connection_serial )
+        result		       += UINT.produce( data.O_vendor )
+        result		       += UDINT.produce( data.O_serial )
+        result		       += EPATH_padded.produce( data.get( 'connection_path', {} ))
+        return result
+
+
+class forward_close_reply( cpppo.dfa ):
+    """A successful Forward Close (0x4E|0x80) reply payload, following the service, reserved and status:
+
+        .forward_close.connection_serial	UINT
+        .forward_close.O_vendor			UINT
+        .forward_close.O_serial			UDINT
+        .forward_close.application_size		USINT
+        					USINT		(reserved)
+        .forward_close.application		words[*]	.application_size
+
+    """
+    def __init__( self, name=None, **kwds ):
+        name 			= name or kwds.setdefault( 'context', 'forward_close' )
+
+        csrl			= UINT(		context='connection_serial' )
+        csrl[True]	= ovnd	= UINT(		context='O_vendor' )
+        ovnd[True]	= osrl	= UDINT(	context='O_serial' )
+        osrl[True]	= apsz	= USINT(	context='application_size' )
+        apsz[True]	= rsvd	= octets_drop(	'reserved',	repeat=1 )
+        rsvd[None]		= cpppo.decide(	'application',
+                            predicate=lambda path=None, data=None, **kwds: data[path+'.application_size'],
+                                                state=words( context='application',
+                                                             repeat='..application_size',
+                                                             terminal=True ))
+        rsvd[None]		= octets_noop(	'done',		terminal=True )
+
+        super( forward_close_reply, self ).__init__( name=name, initial=csrl, **kwds )
+
+    @classmethod
+    def produce( cls, data ):
+        application		= octets_encode( data.application.input ) if 'application.input' in data else b''
+        result			= b''
+        result		       += UINT.produce( data.connection_serial )
+        result		       += UINT.produce( data.O_vendor )
+        result		       += UDINT.produce( data.O_serial )
+        result		       += USINT.produce( len( application ) // 2 )
+        result		       += b'\x00' # reserved
+        result		       += application
+        return result
+
+
+class connection_failure( cpppo.dfa ):
+    """An unsuccessful Forward Open/Close reply payload (following a non-zero .status, and its
+    .status_ext), identifying the rejected connection and how much of the connection path was
+    understood (only for Forward Open):
+
+        .<context>.connection_serial		UINT
+        .<context>.O_vendor			UINT
+        .<context>.O_serial			UDINT
+        .<context>.remaining_path_size		USINT		(Forward Open only)
+        					USINT		(reserved)
+
+    """
+    def __init__( self, name=None, **kwds ):
+        name 			= name or kwds.setdefault( 'context', self.__class__.__name__ )
+
+        csrl			= UINT(		context='connection_serial' )
+        csrl[True]	= ovnd	= UINT(		context='O_vendor' )
+        ovnd[True]	= osrl	= UDINT(	context='O_serial' )
+        osrl[True]	= rmsz	= USINT(	context='remaining_path_size' )
+        rmsz[True]		= octets_drop(	'reserved',	repeat=1,
+                                                terminal=True )
+
+        super( connection_failure, self ).__init__( name=name, initial=csrl, **kwds )
+
+    @classmethod
+    def produce( cls, data ):
+        result			= b''
+        result		       += UINT.produce( data.connection_serial )
+        result		       += UINT.produce( data.O_vendor )
+        result		       += UDINT.produce( data.O_serial )
+        result		       += USINT.produce( data.get( 'remaining_path_size', 0 ))
+        result		       += b'\x00' # reserved
+        return result
+
+
 class communications_service( cpppo.dfa ):
     """The ListServices response contains a CPF item list containing one item: a "Communications"
     type_id 0x0100, indicating that the device supports encapsulation of CIP packets.  These CPF
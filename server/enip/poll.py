@@ -54,19 +54,21 @@ PARAMS				= [
     'Motor Velocity',
 ]
 
-def execute( via, params=None, pass_thru=None ):
+def execute( via, params=None, pass_thru=None, compiled=None ):
     """Perform a single poll via the supplied enip.get_attribute 'proxy' instance, yielding the
     parameters and their polled values.
 
     By default, we'll look for the parameters in the module's PARAMS list, which must be recognized
     by the supplied via's parameter_substitutions method, if pass_thru is not Truthy (default:
-    True).
+    True).  If the params have already been compiled (see via.compile), supply them, and they won't
+    be parsed again.
 
     Yields tuples of each of the supplied params, with their polled values.
 
     """
-    with contextlib.closing( via.read(
-            via.parameter_substitution( params or PARAMS, pass_thru=pass_thru ))) as reader:
+    if compiled is None:
+        compiled		= via.parameter_substitution( params or PARAMS, pass_thru=pass_thru )
+    with contextlib.closing( via.read( compiled )) as reader:
         for p,v in zip( params or PARAMS, reader ): # "lazy" zip
             yield p,v
 
@@ -140,6 +142,9 @@ def run( via, process, failure=None, backoff_min=None, backoff_multiplier=None,
     it is assumed that Thread blocking behaviour is performed within the I/O processing code to
     ensure that only one Thread is performing I/O.
 
+    The params are compiled (see enip.get_attribute.proxy.compile) by the first successful poll,
+    and reused for every subsequent poll.
+
     """
     if backoff_min is None:
         backoff_min		= kwds.get( 'cycle' )
@@ -163,6 +168,9 @@ def run( via, process, failure=None, backoff_min=None, backoff_multiplier=None,
             continue
         # Perform a poll.loop and/or increase exponential back-off.
         try:
+            if kwds.get( 'compiled' ) is None:
+                kwds['compiled']= via.compile( via.parameter_substitution(
+                    kwds.get( 'params' ) or PARAMS, pass_thru=kwds.get( 'pass_thru' )))
             lst,dly,res		= loop( via, last_poll=lst, **kwds )
             for p,v in res:
                 process( p, v )
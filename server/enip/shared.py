@@ -0,0 +1,105 @@
+#! /usr/bin/env python3
+
+#
+# Cpppo -- Communication Protocol Python Parser and Originator
+#
+# Copyright (c) 2013, Hard Consulting Corporation.
+#
+# Cpppo is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.  See the LICENSE file at the top of the source tree.
+#
+# Cpppo is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+__author__                      = "Perry Kundert"
+__email__                       = "perry@hardconsulting.com"
+__copyright__                   = "Copyright (c) 2013 Hard Consulting Corporation"
+__license__                     = "Dual License: GPLv3 (or later) and Commercial (see LICENSE)"
+
+
+"""
+enip.shared	-- Tag Attribute values in memory shared between forked server processes
+
+    A shared_vector is supplied as the 'default' of a device.Attribute (see its "remote data"
+interface), and stores the Attribute's values in an anonymous shared memory mapping, encoded using
+the Attribute's fixed-size data type.  Since the mapping is inherited by (and remains shared with)
+processes subsequently created by os.fork, all Tag values written by any process are immediately
+visible to all other processes.  Used by enip_server --workers.
+
+"""
+
+__all__				= ['shared_vector']
+
+import logging
+import mmap
+import multiprocessing
+import struct
+
+from ... import misc
+
+log				= logging.getLogger( "enip.shr" )
+
+
+class shared_vector( object ):
+    """A fixed-length vector of 'count' values of the fixed-size (struct-based) type_cls (eg. an
+    enip.INT), initialized to 'default', stored in shared memory.  Must be created before the
+    processes that share it are forked.  Each access (of any slice) is atomic w.r.t. all other
+    processes.
+
+    Even scalar Tags must be stored as a vector of length 1.
+
+    """
+    def __init__( self, type_cls, count=1, default=0 ):
+        assert hasattr( type_cls, 'struct_format' ), \
+            "Only fixed-size data types may be shared; not %s" % ( type_cls.__name__ )
+        fmt			= type_cls.struct_format
+        self.order,self.code	= ( fmt[0],fmt[1:] ) if fmt[0] in '@=<>!' else ( '<',fmt )
+        self.size		= struct.calcsize( self.order + self.code )
+        self.count		= count
+        self.memory		= mmap.mmap( -1, max( 1, self.size * count )) # MAP_SHARED, anonymous
+        self.lock		= multiprocessing.Lock()
+        self[0:count]		= [ default ] * count
+
+    def format( self, count ):
+        return "%s%d%s" % ( self.order, count, self.code )
+
+    def __len__( self ):
+        return self.count
+
+    def __repr__( self ):
+        return "<%s[%d] @0x%x: %s>" % ( self.__class__.__name__, self.count, id( self ),
+                                        misc.reprlib.repr( self[0:self.count] ))
+
+    def _indices( self, key ):
+        if isinstance( key, slice ):
+            start,stop,stride	= key.indices( self.count )
+            assert stride == 1, "Only simple slices supported: %r" % ( key )
+            return start,max( start, stop )
+        if key < 0:
+            key		       += self.count
+        if not 0 <= key < self.count:
+            raise IndexError( "%s index %r out of range" % ( self.__class__.__name__, key ))
+        return key,key+1
+
+    def __getitem__( self, key ):
+        start,stop		= self._indices( key )
+        with self.lock:
+            values		= struct.unpack_from( self.format( stop - start ), self.memory, start * self.size )
+        return list( values ) if isinstance( key, slice ) else values[0]
+
+    def __setitem__( self, key, value ):
+        start,stop		= self._indices( key )
+        values			= list( value ) if isinstance( key, slice ) else [ value ]
+        assert len( values ) == stop - start, \
+            "Cannot change the length of a %s from %d to %d" % (
+                self.__class__.__name__, stop - start, len( values ))
+        with self.lock:
+            struct.pack_into( self.format( stop - start ), self.memory, start * self.size, *values )
@@ -0,0 +1,57 @@
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+import os
+
+import pytest
+
+from . import device, parser, shared
+
+
+def test_shared_vector():
+    vec				= shared.shared_vector( parser.INT, count=5, default=3 )
+    assert len( vec ) == 5
+    assert vec[0:5] == [3] * 5
+    vec[1:3]			= [ -1, 32767 ]
+    vec[4]			= 9
+    assert vec[:] == [ 3, -1, 32767, 3, 9 ]
+    assert vec[-1] == 9
+    with pytest.raises( AssertionError, match="length" ):
+        vec[0:2]		= [ 1 ]
+    with pytest.raises( IndexError ):
+        vec[5]
+
+    # As the 'default' of an Attribute, a scalar Tag becomes a vector of length 1
+    att				= device.Attribute( 'Shared', parser.REAL,
+                                                    default=shared.shared_vector( parser.REAL, default=1.5 ))
+    assert len( att ) == 1 and att[0] == 1.5 and att[0:1] == [ 1.5 ]
+    att[0:1]			= [ 2.25 ]
+    assert att.produce() == parser.REAL.produce( 2.25 )
+
+
+@pytest.mark.skipif( not hasattr( os, 'fork' ), reason="Needs os.fork" )
+def test_shared_vector_fork():
+    """Values written by a forked process are visible to its parent, and vice versa."""
+    vec				= shared.shared_vector( parser.DINT, count=3 )
+    r,w				= os.pipe()
+    pid				= os.fork()
+    if pid == 0:
+        try:
+            vec[0:3]		= [ 1, 2, 3 ]
+            os.write( w, b'1' )
+        finally:
+            os._exit( 0 )
+    os.read( r, 1 )
+    os.waitpid( pid, 0 )
+    os.close( r )
+    os.close( w )
+    assert vec[0:3] == [ 1, 2, 3 ]
+
+
+def test_shared_workers_variable_length( capsys ):
+    """Tags of variable-length types can't be shared by multiple --workers; a clear error is reported."""
+    from . import main # (the enip_server main function)
+    with pytest.raises( SystemExit ):
+        main( argv=[ '--workers', '2', '--address', 'localhost:12399', 'Name=SSTRING' ] )
+    assert "variable-length type SSTRING cannot be shared" in capsys.readouterr().err
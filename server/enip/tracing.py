@@ -0,0 +1,131 @@
+#! /usr/bin/env python3
+
+#
+# Cpppo -- Communication Protocol Python Parser and Originator
+#
+# Copyright (c) 2013, Hard Consulting Corporation.
+#
+# Cpppo is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.  See the LICENSE file at the top of the source tree.
+#
+# Cpppo is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+__author__                      = "Perry Kundert"
+__email__                       = "perry@hardconsulting.com"
+__copyright__                   = "Copyright (c) 2013 Hard Consulting Corporation"
+__license__                     = "Dual License: GPLv3 (or later) and Commercial (see LICENSE)"
+
+
+"""
+enip.tracing	-- Opt-in timestamping of each EtherNet/IP request's processing phases
+
+    When enabled (by setting a non-zero 'depth', eg. via enip_server --trace <depth>), a span is
+recorded for each request received by a server session, in a fixed-size ring buffer of the most
+recent 'depth' spans of its connection.  Each span records the time its first byte was received
+('begun'), and the seconds thereafter that each phase completed:
+
+    header	-- The EtherNet/IP encapsulation header (and payload) was parsed
+    throttled	-- Any rate limiting delay (see enip_server --rate) ended
+    cip		-- The encapsulated CIP request was parsed (by logix.process)
+    processed	-- The request was processed, producing a response
+    encoded	-- The EtherNet/IP response was encoded
+    sent	-- The response was sent (after any configured delay)
+
+so tail latency may be attributed to parsing, processing or socket time, without verbose logging.
+The rings of the most recent 'retain' connections are kept (including those since closed).  They are
+available via the web API (/traces), and may be dumped as JSON lines.
+
+"""
+
+__all__				= ['depth', 'begin', 'spans', 'jsonl', 'dump']
+
+import collections
+import fnmatch
+import json
+import logging
+import threading
+
+from ... import misc
+
+log				= logging.getLogger( "enip.trc" )
+
+depth				= 0		# Spans retained per connection; 0 disables tracing
+retain				= 100		# Connections' rings retained
+
+lock				= threading.Lock()
+rings				= collections.OrderedDict() # { <connection>: deque( <span>, ... ), ... }
+
+
+class span( object ):
+    """The phases of one request, in seconds since its first byte was received."""
+    __slots__			= ( 'connection', 'request', 'command', 'begun', 'phases' )
+
+    def __init__( self, connection, request, begun ):
+        self.connection		= connection
+        self.request		= request
+        self.command		= None
+        self.begun		= begun
+        self.phases		= {}
+
+    def mark( self, phase, now=None ):
+        self.phases[phase]	= ( misc.timer() if now is None else now ) - self.begun
+
+    def record( self ):
+        result			= dict( self.phases ) # (atomic copy; phases may be marked concurrently)
+        result.update( connection=self.connection, request=self.request, command=self.command,
+                       begun=self.begun )
+        return result
+
+    def __repr__( self ):
+        return "<span %s #%d>" % ( self.connection, self.request )
+
+
+def begin( connection, request, begun ):
+    """If tracing, start a span for the connection's request (first byte received at time 'begun'),
+    adding it to the connection's ring.  Otherwise, returns None."""
+    if not depth:
+        return None
+    spn				= span( connection, request, begun )
+    with lock:
+        ring			= rings.pop( connection, None )
+        if ring is None or ring.maxlen != depth:
+            ring		= collections.deque( ring or [], maxlen=depth )
+        rings[connection]	= ring		# (now the most recently used)
+        ring.append( spn )
+        while len( rings ) > retain:
+            rings.popitem( last=False )
+    return spn
+
+
+def spans( match=None ):
+    """Return { <connection>: [ <span record>, ... ], ... } for connections matching the glob."""
+    with lock:
+        selected		= [ ( c, list( r )) for c,r in rings.items()
+                                    if match is None or fnmatch.fnmatch( c, match ) ]
+    return dict( ( c, [ s.record() for s in r ] ) for c,r in selected )
+
+
+def jsonl( match=None ):
+    """Generate a JSON line for each span of the connections matching the glob."""
+    for connection,records in sorted( spans( match=match ).items() ):
+        for rec in records:
+            yield json.dumps( rec, sort_keys=True ) + '\n'
+
+
+def dump( output, match=None ):
+    """Write each span of the matching connections to the file-like 'output' as JSON lines, returning
+    the number of spans written."""
+    count			= 0
+    for line in jsonl( match=match ):
+        output.write( line )
+        count		       += 1
+    return count
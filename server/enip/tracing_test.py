@@ -0,0 +1,46 @@
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+import json
+import logging
+
+from . import tracing
+
+log				= logging.getLogger( "enip.trc" )
+
+
+def test_tracing_rings():
+    """Each connection retains only its most recent 'depth' spans; only 'retain' connections are kept."""
+    depth,retain		= tracing.depth,tracing.retain
+    tracing.rings.clear()
+    try:
+        tracing.depth		= 0
+        assert tracing.begin( 'a', 1, 0.0 ) is None
+
+        tracing.depth		= 2
+        tracing.retain		= 2
+        for req in range( 1, 4 ):
+            spn			= tracing.begin( 'a', req, 10.0 )
+            spn.command		= 'SendRRData'
+            for phase,now in ( ( 'header', 10.25 ), ( 'cip', 10.5 ), ( 'sent', 11.0 )):
+                spn.mark( phase, now=now )
+        spans			= tracing.spans()
+        assert list( spans ) == [ 'a' ]
+        assert [ s['request'] for s in spans['a'] ] == [ 2, 3 ]
+        assert spans['a'][-1] == dict( connection='a', request=3, command='SendRRData', begun=10.0,
+                                       header=.25, cip=.5, sent=1.0 )
+
+        tracing.begin( 'b', 1, 0.0 )
+        tracing.begin( 'c', 1, 0.0 )	# 'a' (least recently used) is discarded
+        assert sorted( tracing.spans() ) == [ 'b', 'c' ]
+        assert list( tracing.spans( match='c*' )) == [ 'c' ]
+
+        class output( list ):
+            write		= list.append
+        out			= output()
+        assert tracing.dump( out ) == 2
+        assert [ json.loads( line )['connection'] for line in out ] == [ 'b', 'c' ]
+    finally:
+        tracing.depth,tracing.retain = depth,retain
+        tracing.rings.clear()
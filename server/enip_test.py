@@ -1043,6 +1043,47 @@ def test_enip_listinterfaces():
     assert data.list_identity.CPF.count == 0
 
 
+def test_enip_list_precomputed():
+    """List Identity/Services/Interfaces (and Legacy 0x0001) replies are precomputed, and are
+    recomputed only when an Identity or TCPIP Attribute they depend on changes."""
+    ucmm			= logix.setup()
+
+    def request( command, name ):
+        data			= cpppo.dotdict()
+        data.addr		= ( '127.0.0.1', 44818 )
+        data.enip		= cpppo.dotdict()
+        data.enip.command	= command
+        data.enip.CIP		= cpppo.dotdict()
+        data.enip.CIP[name]	= cpppo.dotdict( CPF=cpppo.dotdict() )
+        assert ucmm.request( data )
+        return data
+
+    for command,name in [ ( 0x0001, 'legacy' ), ( 0x0063, 'list_identity' ),
+                          ( 0x0064, 'list_interfaces' ), ( 0x0004, 'list_services' ) ]:
+        first			= request( command, name )
+        again			= request( command, name )
+        assert again.enip.input == first.enip.input
+        assert again.enip.CIP[name].CPF is first.enip.CIP[name].CPF # Not recomputed
+
+    name			= enip.device.lookup( enip.device.Identity.class_id, 1, 7 )
+    original			= name.value
+    cpf				= request( 0x0063, 'list_identity' ).enip.CIP.list_identity.CPF
+    try:
+        # Any other Attribute changing doesn't invalidate the List Identity reply
+        enip.device.lookup( enip.device.Identity.class_id, 1, 9 ).value = 1
+        assert request( 0x0063, 'list_identity' ).enip.CIP.list_identity.CPF is cpf
+        # ... but changing one it depends on does
+        name.value		= 'Something Else'
+        data			= request( 0x0063, 'list_identity' )
+        assert data.enip.CIP.list_identity.CPF is not cpf
+        assert data.enip.CIP.list_identity.CPF.item[0].identity_object.product_name.string == 'Something Else'
+        assert b'Something Else' in data.enip.input
+    finally:
+        name.value		= original
+    data			= request( 0x0063, 'list_identity' )
+    assert data.enip.CIP.list_identity.CPF.item[0].identity_object.product_name.string == original
+
+
 # "17","0.423597000","192.168.222.128","10.220.104.180","CIP CM","124","Unconnected Send: Unknown Service (0x52)"
 readfrag_1_req 			= bytes(bytearray([
     0x52, 0x04, 0x91, 0x05, 0x53, 0x43, 0x41, 0x44, #/* R...SCAD */
@@ -2,12 +2,21 @@ from __future__ import absolute_import
 from __future__ import print_function
 from __future__ import division
 
+import json
 import logging
 import os
+import socket
 import sys
 import threading
 import time
 
+import pytest
+
+try:
+    import asyncio
+    has_asyncio			= True
+except ImportError:
+    has_asyncio			= False
 
 # for @profile, kernprof.py -v -l enip_test.py
 #from line_profiler import LineProfiler
@@ -21,7 +30,7 @@ if __name__ == "__main__":
     #logging.getLogger().setLevel( logging.INFO )
 
 import cpppo
-from   cpppo.server import enip
+from   cpppo.server import enip, network
 from   cpppo.server.enip import logix, client
 
 log				= logging.getLogger( "enip.lgx" )
@@ -715,6 +724,302 @@ def test_logix_remote( count=50 ):
 
     logixthread.join()
 
+@pytest.mark.skipif( not has_asyncio, reason="Needs asyncio (Python 3.4+)" )
+def test_logix_remote_asyncio( count=50 ):
+    """The same Logix simulator, but serving all sessions from one asyncio event loop; also exercise
+    the (non-blocking) response delay.
+
+    """
+    enip.lookup_reset() # Flush out any existing CIP Objects for a fresh start
+    svraddr		        = ('localhost', 12346)
+    kwargs			= {
+        'argv': [
+            #'-v',
+            '--asyncio',
+            '--delay',		'0.001',
+            '--address',	'%s:%d' % svraddr,
+            'SCADA=INT[1000]'
+        ],
+        'server': {
+            'control': cpppo.apidict( enip.timeout, { 
+                'done': False
+            } ),
+        },
+    }
+    logixthread_kwargs		= {
+        'count':		count,
+        'svraddr':		svraddr,
+        'kwargs':		kwargs
+    }
+    logixthread			= threading.Thread( target=logix_remote, kwargs=logixthread_kwargs )
+    logixthread.daemon		= True
+    logixthread.start()
+
+    enip.main( **kwargs )
+
+    logixthread.join()
+
+@pytest.mark.parametrize( "engine", [
+    [],
+    pytest.param( [ '--asyncio' ], marks=pytest.mark.skipif( not has_asyncio, reason="Needs asyncio (Python 3.4+)" )),
+] )
+def test_logix_remote_pipelined_delay( engine, count=5, delay=.25 ):
+    """A response --delay must not delay the processing of pipelined requests; all responses are
+    sent (in order) after about 1 delay, not 'count' delays.
+
+    """
+    enip.lookup_reset() # Flush out any existing CIP Objects for a fresh start
+    svraddr		        = ('localhost', 12348)
+    kwargs			= {
+        'argv': engine + [
+            '--delay',		str( delay ),
+            '--address',	'%s:%d' % svraddr,
+            'SCADA=INT[10]'
+        ],
+        'server': {
+            'control': cpppo.apidict( enip.timeout, {
+                'done': False
+            } ),
+        },
+    }
+    server			= threading.Thread( target=enip.main, kwargs=kwargs )
+    server.daemon		= True
+    server.start()
+    try:
+        time.sleep( .5 ) # Wait for server to be established
+        with client.client( host=svraddr[0], port=svraddr[1] ) as cli:
+            begun		= cpppo.timer()
+            for _ in range( count ):
+                cli.list_identity( timeout=5 )
+            replies		= 0
+            while replies < count and cpppo.timer() - begun < count * delay:
+                response,elapsed= client.await( cli, timeout=count * delay )
+                assert response and response.enip.status == 0
+                replies        += 1
+            elapsed		= cpppo.timer() - begun
+        assert replies == count
+        assert delay <= elapsed < ( count - 1 ) * delay, \
+            "Pipelined responses took %7.3fs; expected ~%7.3fs" % ( elapsed, delay )
+    finally:
+        kwargs['server']['control'].done = True
+        server.join( 5.0 )
+
+
+def test_logix_remote_udp_list_identity( count=20 ):
+    """UDP/IP List Identity requests are processed by a pool of workers; identical requests are answered
+    from the cached reply (w/ their own sender_context), 'til an Identity or TCPIP Attribute changes.
+
+    """
+    enip.lookup_reset() # Flush out any existing CIP Objects for a fresh start
+    svraddr		        = ('localhost', 12349)
+    kwargs			= {
+        'argv': [
+            '--udp-workers',	'3',
+            '--address',	'%s:%d' % svraddr,
+            'SCADA=INT[10]'
+        ],
+        'server': {
+            'control': cpppo.apidict( enip.timeout, {
+                'done': False
+            } ),
+        },
+    }
+    server			= threading.Thread( target=enip.main, kwargs=kwargs )
+    server.daemon		= True
+    server.start()
+    sock			= socket.socket( socket.AF_INET, socket.SOCK_DGRAM )
+    def request( context ):
+        return b'\x63\x00' + b'\x00' * 10 + context + b'\x00' * 4
+    try:
+        time.sleep( .5 ) # Wait for server to be established
+        for i in range( count ):
+            sock.sendto( request( b'%08d' % i ), svraddr )
+        replies			= {}
+        while len( replies ) < count:
+            rpy,_		= network.recvfrom( sock, maxlen=1024, timeout=2.0 )
+            assert rpy
+            replies[rpy[12:20]]	= rpy
+        assert set( replies ) == set( b'%08d' % i for i in range( count ))
+        assert len( set( r[:12] + r[20:] for r in replies.values() )) == 1
+        assert sys.modules['cpppo.server.enip.main'].list_identity_reply is not None
+        assert b'1756-L61/B LOGIX5561' in replies[b'00000000']
+
+        # Changing a Tag's value doesn't invalidate the cached reply.  (One more request first; the
+        # reply may have been cached while the server's CIP Objects were still being created.)
+        sock.sendto( request( b'settled!' ), svraddr )
+        rpy,_			= network.recvfrom( sock, maxlen=1024, timeout=2.0 )
+        assert rpy[12:20] == b'settled!'
+        cached			= sys.modules['cpppo.server.enip.main'].list_identity_reply
+        enip.device.lookup( *enip.device.resolve_tag( 'SCADA' ))[0] = 99
+        sock.sendto( request( b'tagwrite' ), svraddr )
+        rpy,_			= network.recvfrom( sock, maxlen=1024, timeout=2.0 )
+        assert rpy[12:20] == b'tagwrite'
+        assert sys.modules['cpppo.server.enip.main'].list_identity_reply is cached
+
+        # Changing the product name (an Identity Attribute) invalidates the cached reply
+        enip.device.lookup( enip.device.Identity.class_id, 1, 7 ).value = 'Something Else'
+        sock.sendto( request( b'changed!' ), svraddr )
+        rpy,_			= network.recvfrom( sock, maxlen=1024, timeout=2.0 )
+        assert rpy[12:20] == b'changed!' and b'Something Else' in rpy
+    finally:
+        sock.close()
+        kwargs['server']['control'].done = True
+        server.join( 5.0 )
+
+
+@pytest.mark.parametrize( "engine", [
+    [],
+    pytest.param( [ '--asyncio' ], marks=pytest.mark.skipif( not has_asyncio, reason="Needs asyncio (Python 3.4+)" )),
+])
+def test_logix_remote_trace( engine, count=5 ):
+    """With --trace, the phases of each connection's most recent requests are recorded (including
+    the end of any --rate limiting delay)."""
+    enip.lookup_reset() # Flush out any existing CIP Objects for a fresh start
+    tracing			= sys.modules['cpppo.server.enip.tracing']
+    tracing.rings.clear()
+    svraddr		        = ('localhost', 12350)
+    kwargs			= {
+        'argv': engine + [
+            '--trace',		'3',
+            '--rate',		'50/1',
+            '--address',	'%s:%d' % svraddr,
+            'SCADA=INT[10]'
+        ],
+        'server': {
+            'control': cpppo.apidict( enip.timeout, {
+                'done': False
+            } ),
+        },
+    }
+    server			= threading.Thread( target=enip.main, kwargs=kwargs )
+    server.daemon		= True
+    server.start()
+    try:
+        time.sleep( .5 ) # Wait for server to be established
+        with client.client( host=svraddr[0], port=svraddr[1] ) as cli:
+            for _ in range( count ):
+                cli.list_identity( timeout=5 )
+                response,elapsed= client.await( cli, timeout=5 )
+                assert response and response.enip.status == 0
+    finally:
+        kwargs['server']['control'].done = True
+        server.join( 5.0 )
+        depth			= tracing.depth
+        tracing.depth		= 0
+
+    assert depth == 3
+    spans			= tracing.spans()
+    assert len( spans ) == 1
+    records			= next( iter( spans.values() ))
+    assert [ r['request'] for r in records ] == list( range( count - 2, count + 1 ))
+    for r in records:
+        assert r['command'] == 'List Identity'
+        assert 0 <= r['header'] <= r['cip'] <= r['processed'] <= r['encoded'] <= r['sent']
+    assert any( 'throttled' in r for r in records )
+    for r in records:
+        if 'throttled' in r:
+            assert r['header'] < r['throttled'] <= r['sent'] + .005
+
+
+def test_logix_subscribe():
+    """The web API /subscribe reports only the Tags changed since the supplied cursor, awaiting a change."""
+    main			= sys.modules['cpppo.server.enip.main']
+    saved			= dict( dict.items( main.tags ))
+    main.tags.clear()
+    try:
+        for name,default in ( ( 'SCADA', [0] * 10 ), ( 'Speed', 0 ), ( 'Other', [0] * 2 )):
+            main.tags[name]	= cpppo.dotdict( attribute=enip.device.Attribute(
+                name, enip.parser.INT, default=default ), path=None, error=0x00 )
+
+        # No cursor; everything matching is returned immediately, w/ the current generation
+        content,body		= main.subscribe_request( match='S*' )
+        assert content == "application/json"
+        result			= json.loads( body )
+        assert sorted( result['tags'] ) == [ 'SCADA', 'Speed' ]
+        assert result['tags']['SCADA']['value'] == [0] * 10
+        cursor			= result['cursor']
+
+        # Nothing changed since the cursor; times out w/ no Tags
+        begun			= cpppo.timer()
+        result			= json.loads( main.subscribe_request( since=cursor, timeout=.25 )[1] )
+        assert cpppo.timer() - begun >= .2
+        assert result == { 'cursor': cursor, 'tags': {} }
+
+        # A change from another thread wakes the waiting subscriber; only the changed Tag is reported
+        def change():
+            time.sleep( .25 )
+            main.tags.SCADA.attribute[3] = 99
+        changer			= threading.Thread( target=change )
+        changer.start()
+        begun			= cpppo.timer()
+        result			= json.loads( main.subscribe_request( since=cursor, timeout=5 )[1] )
+        changer.join()
+        assert cpppo.timer() - begun < 2
+        assert list( result['tags'] ) == [ 'SCADA' ]
+        assert result['tags']['SCADA']['value'][3] == 99
+        assert result['cursor'] > cursor
+        assert result['tags']['SCADA']['changed'] == result['cursor']
+
+        # Scalar assignment is observed, but excluded by a non-matching glob
+        cursor			= result['cursor']
+        main.tags.Speed.attribute.value = 5
+        result			= json.loads( main.subscribe_request( match='S*', since=cursor, timeout=0 )[1] )
+        assert result['tags'] == { 'Speed': { 'changed': cursor + 1, 'value': 5 }}
+        result			= json.loads( main.subscribe_request( match='O*', since=cursor, timeout=0 )[1] )
+        assert result['tags'] == {}
+
+        # Each scalar element/slice assignment (eg. by a CIP write) is one change
+        cursor			= enip.device.Attribute.generation
+        main.tags.Speed.attribute[0] = 6
+        main.tags.Speed.attribute[0:1] = [ 7 ]
+        assert enip.device.Attribute.generation == cursor + 2
+        assert main.tags.Speed.attribute.changed == cursor + 2 and main.tags.Speed.attribute.value == 7
+    finally:
+        main.tags.clear()
+        dict.update( main.tags, saved )
+
+
+def test_logix_batch():
+    """The web API /batch performs many Tag reads and writes at once, reporting each result."""
+    main			= sys.modules['cpppo.server.enip.main']
+    saved			= dict( dict.items( main.tags ))
+    main.tags.clear()
+    try:
+        for name,default in ( ( 'SCADA', [0] * 10 ), ( 'Speed', 0 ), ( 'Ratio', 0.0 )):
+            main.tags[name]	= cpppo.dotdict( attribute=enip.device.Attribute(
+                name, enip.parser.REAL if name == 'Ratio' else enip.parser.INT, default=default ),
+                                             path=None, error=0x00 )
+        cursor			= enip.device.Attribute.generation
+        content,body		= main.batch_request( [
+            { 'tag': 'SCADA[0-2]', 'value': [ 1, 2, 3 ] },
+            { 'tag': 'SCADA[9]', 'value': 9.0 },		# Retains the element's int type
+            { 'tag': 'Speed', 'value': 5 },
+            { 'tag': 'Ratio', 'value': 1 },			# Retains the float type
+            { 'tag': 'SCADA' },
+            { 'tag': 'SCADA[0-1]', 'value': [ 1 ] },		# Wrong number of values
+            { 'tag': 'SCADA[10]' },				# Beyond the Attribute
+            { 'tag': 'Nope', 'value': 1 },
+        ] )
+        assert content == "application/json"
+        results			= json.loads( body )
+        assert [ r['success'] for r in results ] == [ True ] * 5 + [ False ] * 3
+        assert results[0]['value'] == [ 1, 2, 3 ]
+        assert results[1]['value'] == 9 and isinstance( main.tags.SCADA.attribute[9], int )
+        assert results[2]['value'] == 5 and main.tags.Speed.attribute.value == 5
+        assert results[3]['value'] == 1.0 and isinstance( main.tags.Ratio.attribute.value, float )
+        assert results[4]['value'] == [ 1, 2, 3, 0, 0, 0, 0, 0, 0, 9 ]
+        assert 'Require a list of 2 values' in results[5]['message']
+        assert 'Unknown Tag' in results[7]['message']
+        assert main.tags.SCADA.attribute[0:2] == [ 1, 2 ]
+
+        # Subscribers see each changed Tag
+        result			= json.loads( main.subscribe_request( since=cursor, timeout=0 )[1] )
+        assert sorted( result['tags'] ) == [ 'Ratio', 'SCADA', 'Speed' ]
+    finally:
+        main.tags.clear()
+        dict.update( main.tags, saved )
+
+
 def logix_remote( count, svraddr, kwargs ):
   try:
     time.sleep(.25) # Wait for server to be established
@@ -23,12 +23,14 @@ __email__                       = "perry@hardconsulting.com"
 __copyright__                   = "Copyright (c) 2013 Hard Consulting Corporation"
 __license__                     = "Dual License: GPLv3 (or later) and Commercial (see LICENSE)"
 
+import contextlib
 import errno
 import functools
 import logging
 import os
 import select
 import socket
+import struct
 import sys
 import threading
 import time
@@ -39,34 +41,121 @@ from ..dotdict import dotdict
 
 log				= logging.getLogger( "network" )
 
+try:
+    import fcntl
+except ImportError:
+    fcntl			= None # eg. Windows; no select-able pipes
+
+
+class wakeup( object ):
+    """A self-pipe (or Linux eventfd) control channel.  Its fileno() becomes readable after any
+    notify(), 'til clear()ed, so a Thread may block in select indefinitely on its sockets and a
+    wakeup, and yet be awakened promptly (eg. when its server is signalled done/disable, or its
+    connection stats.eof is set).  A notify() is safe to invoke from a signal handler, and from any
+    Thread.  Check wakeup.supported before creating one.
+
+    """
+    supported			= hasattr( os, 'eventfd' ) or fcntl is not None
+
+    def __init__( self ):
+        if hasattr( os, 'eventfd' ):
+            self.rfd = self.wfd	= os.eventfd( 0, os.EFD_NONBLOCK | os.EFD_CLOEXEC )
+            self.token		= struct.pack( '=Q', 1 )
+        else:
+            self.rfd,self.wfd	= os.pipe()
+            for fd in ( self.rfd, self.wfd ):
+                fcntl.fcntl( fd, fcntl.F_SETFL, fcntl.fcntl( fd, fcntl.F_GETFL ) | os.O_NONBLOCK )
+                fcntl.fcntl( fd, fcntl.F_SETFD, fcntl.fcntl( fd, fcntl.F_GETFD ) | fcntl.FD_CLOEXEC )
+            self.token		= b'\x01'
+
+    def fileno( self ):
+        return self.rfd
+
+    def notify( self ):
+        try:
+            os.write( self.wfd, self.token )
+        except OSError as exc: # A full pipe (EAGAIN) is already readable; a closed one is moot
+            log.debug( "wakeup notify: %r", exc )
+
+    def clear( self ):
+        try:
+            while os.read( self.rfd, 4096 ):
+                pass
+        except OSError as exc: # EAGAIN; nothing (more) to read
+            pass
+
+    def close( self ):
+        os.close( self.rfd )
+        if self.wfd != self.rfd:
+            os.close( self.wfd )
+
+
+def watch( *dicts ):
+    """Return a wakeup notified on any setattr of the supplied cpppo.apidict(s) (eg. a server.control,
+    or a connection's stats), or None if any are not apidicts, or wakeups are not supported.  Once
+    done, unwatch the same dicts.  Threads awaiting I/O may then block indefinitely (rather than
+    waking to poll for changes every 'latency').
+
+    """
+    if not wakeup.supported or not all( hasattr( d, '_watch' ) for d in dicts ):
+        return None
+    wak				= wakeup()
+    for d in dicts:
+        d._watch( wak.notify )
+    return wak
+
+
+def unwatch( wak, *dicts ):
+    if wak is not None:
+        for d in dicts:
+            d._unwatch( wak.notify )
+        wak.close()
+
+
+@contextlib.contextmanager
+def watching( *dicts ):
+    """Context manager yielding a network.watch wakeup (or None) for the supplied dicts."""
+    wak				= watch( *dicts )
+    try:
+        yield wak
+    finally:
+        unwatch( wak, *dicts )
+
+
 def readable( timeout=0, default=None ):
     """Decorates any function( sock, ..., [timeout=...], [...]), and waits for its sock (must be the
     first positional arg) to report readable w/in timeout before executing.  Returns default (None)
     if not readable.  Supply the desired default timeout to the decorator if other than 0, or supply
-    it as an optional keyword argument to the decorated function.
+    it as an optional keyword argument to the decorated function; a timeout of None waits forever.
+
+    If a wakeup=<network.wakeup> keyword is supplied, also returns default as soon as it is notified
+    (the caller must then clear it, and check why it was awakened).
 
     """
     def decorator( function ):
         @functools.wraps( function )
         def wrapper( *args, **kwds ):
             tmo			= kwds.pop( 'timeout', timeout )
+            wak			= kwds.pop( 'wakeup', None )
+            fds			= [ args[0].fileno() ] + ( [ wak.fileno() ] if wak is not None else [] )
             beg			= misc.timer()
             rem			= tmo
             r			= None # In case select raises exception first time thru
             while True:
                 try:
-                    r,_,_	= select.select( [args[0].fileno()], [], [], rem )
+                    r,_,_	= select.select( fds, [], [], rem )
                 except select.error as exc:
                     if ( exc.args[0] if sys.version_info[0] < 3 else exc.errno ) == errno.EINTR:
                         # EINTR.  If the timeout has been exceeded, loop once with a zero timeout
                         # (to reliably detect EOF, in heavily loaded situations with lots of
                         # EINTRs).  Otherwise, recompute the remaining timeout.  In Python >= 3.5,
                         # PEP 475 does this automatically (we shouldn't see EINTR).
-                        rem	= max( 0, beg + tmo - misc.timer() )
+                        if tmo is not None:
+                            rem	= max( 0, beg + tmo - misc.timer() )
                         continue
                     raise		# Not select.error, or not EINTR
                 break			# readable, or timeout expired
-            return function( *args, **kwds ) if r else default
+            return function( *args, **kwds ) if fds[0] in r else default
         return wrapper
     return decorator
 
@@ -101,6 +190,74 @@ def recvfrom( conn, maxlen=1024 ):
     return msg,frm
 
 
+@readable( default=False )
+def ready( conn ):
+    """Non-blocking check via. select that conn is readable, accepts optional timeout= (and wakeup=)
+    keyword parameter.  Returns True iff readable (data or EOF pending) within timeout."""
+    return True
+
+
+class receiver( object ):
+    """Receive data on a connection into a buffer of 'size' bytes (default: receiver.size), allocated
+    once and reused by every receive (via recv_into/recvfrom_into).  Each receive returns a
+    memoryview of the data received, instead of allocating a new bytes object; chain it directly
+    onto a parser's source.  The data is only valid 'til the next receive; so, the source must be
+    consumed before receiving again (as enip.client does), or a copy must be made.
+
+    Each receive (like recv/recvfrom) returns None if no data is received within timeout (default:
+    immediate), or the data received; zero-length data (or socket error) implies EOF.  If the
+    socket is already known to be readable (eg. select has just reported it), supply selected=True
+    to skip the select.  An immediate (timeout=0) receive simply attempts a non-blocking receive
+    (where MSG_DONTWAIT is supported), also avoiding the select.
+
+    """
+    size			= 65536
+    DONTWAIT			= getattr( socket, 'MSG_DONTWAIT', 0 )
+
+    def __init__( self, conn, size=None ):
+        self.conn		= conn
+        self.buffer		= bytearray( self.size if size is None else size )
+        self.view		= memoryview( self.buffer )
+
+    def immediate( self, timeout, selected ):
+        """Determine the flags for a receive w/o a select, or None if a select is required."""
+        if selected:
+            return 0
+        if timeout == 0 and self.DONTWAIT and not self.conn.gettimeout():
+            return self.DONTWAIT	# (a socket w/ a timeout would wait before receiving)
+        return None
+
+    def recv( self, timeout=0, wakeup=None, selected=False ):
+        flags			= self.immediate( timeout, selected )
+        if flags is None:
+            if not ready( self.conn, timeout=timeout, wakeup=wakeup ):
+                return None
+            flags		= 0
+        try:
+            size		= self.conn.recv_into( self.buffer, 0, flags )
+        except socket.error as exc:
+            if flags and exc.errno in ( errno.EAGAIN, errno.EWOULDBLOCK ):
+                return None	# Immediate receive; nothing available
+            log.debug( "recv %s: %r", self.conn, exc )
+            size		= 0	# No connection; same as EOF
+        return self.view[:size]
+
+    def recvfrom( self, timeout=0, wakeup=None, selected=False ):
+        flags			= self.immediate( timeout, selected )
+        if flags is None:
+            if not ready( self.conn, timeout=timeout, wakeup=wakeup ):
+                return None,None
+            flags		= 0
+        try:
+            size,frm		= self.conn.recvfrom_into( self.buffer, 0, flags )
+        except socket.error as exc:
+            if flags and exc.errno in ( errno.EAGAIN, errno.EWOULDBLOCK ):
+                return None,None
+            log.debug( "recv %s: %r", self.conn, exc )
+            size,frm		= 0,None
+        return self.view[:size],frm
+
+
 @readable()
 def accept( conn ):
     return conn.accept()
@@ -211,7 +368,7 @@ class server_thread_profiling( server_thread ):
 
 
 def server_main( address, target=None, kwargs=None, idle_service=None, thread_factory=server_thread,
-                 reuse=True, tcp=True, udp=False, **kwds ):
+                 reuse=True, tcp=True, udp=False, backlog=100, limit=None, limit_peer=None, **kwds ):
     """A generic server main, binding to address (on TCP/IP but not UDP/IP by default), and serving
     each incoming connection with a separate thread_factory (server_thread by default, a
     threading.Thread) instance running the target function (or its overridden run method, if
@@ -242,12 +399,19 @@ def server_main( address, target=None, kwargs=None, idle_service=None, thread_fa
     respond to the server being done/disabled.
 
     If supplied, the 'idle_service' function will be invoked whenever 'latency' passes without an
-    incoming socket being accepted.
+    incoming socket being accepted.  Otherwise, if the server.control is a cpppo.apidict, we block
+    awaiting incoming connections indefinitely, and are awakened (via a network.wakeup) only when
+    the control is changed (eg. done/disable is set).
 
     To successfully handle UDP/IP sessions, the target must be able to handle an 'conn' that is a
     UDP/IP SOCK_DGRAM socket, and an 'addr' which is None (since the peer is not know, and is
     possibly different on each request.)
 
+    Admission control: up to 'backlog' (default: 100) incoming TCP/IP connections may await
+    acceptance.  If a 'limit' on the number of concurrent TCP/IP connections (or a 'limit_peer' on
+    those from any one peer host) would be exceeded, the newly accepted connection is immediately
+    closed (and counted in server.control.rejected), so one client cannot starve the rest.
+
     """
 
     name			= target.__name__ if target else thread_factory.__name__
@@ -275,6 +439,7 @@ def server_main( address, target=None, kwargs=None, idle_service=None, thread_fa
     if 'timeout' not in control:
         control['timeout']	= 2 * control.latency
     control['timeout']		= float( control['timeout'] )
+    control.setdefault( 'rejected', 0 )
 
     def thread_start( conn, addr ):
         """Start a thread_factory Thread instance to service the given I/O 'conn'.  The peer 'addr' is
@@ -283,6 +448,15 @@ def server_main( address, target=None, kwargs=None, idle_service=None, thread_fa
 
         """
         thrd			= None
+        if addr is not None and ( limit or limit_peer ):
+            active		= [ a for a,t in threads.items() if a is not None and t.is_alive() ]
+            if ( limit and len( active ) >= limit
+                 or limit_peer and sum( a[0] == addr[0] for a in active ) >= limit_peer ):
+                log.warning( "Rejecting connection from %r; %d connections active (limit %s, %s per peer)",
+                             addr, len( active ), limit, limit_peer )
+                control['rejected'] += 1
+                conn.close()
+                return
         try:
             thrd		= thread_factory( target=target, args=(conn, addr), kwargs=kwargs,
                                                   **kwds )
@@ -308,15 +482,22 @@ def server_main( address, target=None, kwargs=None, idle_service=None, thread_fa
             if hasattr( socket, 'SO_REUSEPORT' ):
                 tcp_sock.setsockopt( socket.SOL_SOCKET, socket.SO_REUSEPORT, 1 )
         tcp_sock.bind( address )
-        tcp_sock.listen( 100 ) # How may simultaneous unaccepted connection requests
+        tcp_sock.listen( backlog ) # How may simultaneous unaccepted connection requests
 
+    # If the control is an apidict, we can be awakened by any change; only poll if idle_service
+    wak				= watch( control )
     while not control.disable and not control.done: # and report completion to external API (eg. web)
         try:
             acceptable		= None
+            latency		= control['latency'] if wak is None or idle_service is not None else None
             if tcp:
-                acceptable	= accept( tcp_sock, timeout=control['latency'] )
+                acceptable	= accept( tcp_sock, timeout=latency, wakeup=wak )
+            elif wak is not None:
+                select.select( [wak.fileno()], [], [], latency ) # No TCP/IP; just await control
             else:
                 time.sleep( control['latency'] ) # No TCP/IP; just pause
+            if wak is not None:
+                wak.clear()
             if acceptable:
                 conn,addr	= acceptable
                 thread_start( conn, addr )
@@ -331,11 +512,15 @@ def server_main( address, target=None, kwargs=None, idle_service=None, thread_fa
             control['done']	= True
         finally:
             # Tidy up any dead threads (or all, if done/disable).  We detect done/disable here, but
-            # do not report it (yet) to external API if an apidict is used.
+            # do not report it (yet) to external API if an apidict is used.  If we signalled it
+            # ourself (by index), awaken any server threads awaiting I/O indefinitely.
+            if wak is not None and ( control['disable'] or control['done'] ):
+                control._wake()
             for addr in list( threads ):
                 if control['disable'] or control['done'] or not threads[addr].is_alive():
                     threads[addr].join( timeout=control['timeout'] )
                     del threads[addr]
+    unwatch( wak, control )
     if tcp:
         tcp_sock.close()
     log.normal( "%s server PID [%5d] shutting down (%s)", name, os.getpid(),
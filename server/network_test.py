@@ -0,0 +1,118 @@
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+import logging
+import socket
+import threading
+import time
+
+import pytest
+
+import cpppo
+from   cpppo.server import network
+
+log				= logging.getLogger( "network" )
+
+
+@pytest.mark.skipif( not network.wakeup.supported, reason="Needs select-able pipes" )
+def test_network_wakeup():
+    """A recv blocked indefinitely on an idle socket returns its default promptly when a watched
+    apidict is changed (via setattr); the socket's own data is still received normally."""
+    a,b				= socket.socketpair()
+    control			= cpppo.apidict( 1.0, done=False )
+    try:
+        with network.watching( control ) as wak:
+            assert wak is not None
+            def signal():
+                time.sleep( .1 )
+                control.done	= True
+            thread		= threading.Thread( target=signal )
+            thread.start()
+            beg			= cpppo.timer()
+            assert network.recv( a, timeout=None, wakeup=wak ) is None
+            assert cpppo.timer() - beg < .5
+            assert control.done
+            thread.join()
+
+            # Until cleared, the wakeup remains readable
+            assert network.recv( a, timeout=None, wakeup=wak ) is None
+            wak.clear()
+            assert network.recv( a, timeout=.01, wakeup=wak ) is None
+            b.send( b'abc' )
+            assert network.recv( a, timeout=None, wakeup=wak ) == b'abc'
+        assert not control._wch
+
+        # A plain dotdict cannot be watched; callers must poll
+        with network.watching( cpppo.dotdict( done=False )) as wak:
+            assert wak is None
+    finally:
+        a.close()
+        b.close()
+
+
+def test_network_admission():
+    """Connections beyond the limit (overall, or per peer host) are accepted and closed at once."""
+    def hold( conn, addr, server=None ):
+        while network.recv( conn, timeout=.01 ) != b'' and not server['control']['done']:
+            pass
+    address			= ('127.0.0.1', 12347)
+    control			= cpppo.apidict( 1.0, done=False, latency=.05 )
+    server			= cpppo.dotdict( control=control )
+    thread			= threading.Thread( target=network.server_main,
+                                                    kwargs=dict( address=address, target=hold,
+                                                                 kwargs=dict( server=server ),
+                                                                 backlog=5, limit=3, limit_peer=2 ))
+    thread.start()
+    conns			= []
+    try:
+        time.sleep( .25 )
+        for _ in range( 3 ):
+            conns.append( socket.create_connection( address ))
+            time.sleep( .1 )
+        # The 1st and 2nd are held open; the 3rd exceeds the limit per peer host and is closed
+        assert network.recv( conns[0], timeout=.1 ) is None
+        assert network.recv( conns[1], timeout=.1 ) is None
+        assert network.recv( conns[2], timeout=1.0 ) == b''
+        assert control['rejected'] == 1
+        # Once one is closed, another is accepted
+        conns[0].close()
+        time.sleep( .2 )
+        conns.append( socket.create_connection( address ))
+        assert network.recv( conns[-1], timeout=.2 ) is None
+        assert control['rejected'] == 1
+    finally:
+        control.done		= True
+        thread.join()
+        for c in conns:
+            c.close()
+
+
+def test_network_receiver():
+    """Data is received into the receiver's one reusable buffer, and returned as a memoryview."""
+    a,b				= socket.socketpair()
+    try:
+        rcv			= network.receiver( a, size=16 )
+        assert rcv.recv() is None
+        assert rcv.recv( timeout=.01 ) is None
+        b.send( b'abc' )
+        data			= rcv.recv( timeout=1.0 )
+        assert isinstance( data, memoryview ) and data.tobytes() == b'abc'
+        assert rcv.buffer[:3] == b'abc'
+
+        # Large sends are harvested a buffer-full at a time, w/o selecting when known readable
+        b.send( b'0123456789' * 2 )
+        assert network.ready( a, timeout=1.0 )
+        assert rcv.recv( selected=True ).tobytes() == b'0123456789012345'
+        assert rcv.recv().tobytes() == b'6789'
+        assert rcv.recv() is None
+
+        # A socket w/ a timeout is also received immediately
+        a.settimeout( 5.0 )
+        beg			= cpppo.timer()
+        assert rcv.recv() is None
+        assert cpppo.timer() - beg < 1.0
+        b.close()
+        assert len( rcv.recv( timeout=1.0 )) == 0
+    finally:
+        a.close()